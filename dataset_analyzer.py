@@ -150,7 +150,8 @@ class DatasetAnalyzer:
             'count': len(images_in_folder),
             'buckets': dict(buckets),
             'image_dims': image_dims,
-            'mismatches': mismatches # 결과에 미스매치 포함
+            'mismatches': mismatches, # 결과에 미스매치 포함
+            'images': [str(p) for p in images_in_folder]  # 매니페스트 내보내기용
         }
 
     @staticmethod
@@ -6,6 +6,7 @@ import csv
 from pathlib import Path
 from dataset_analyzer import DatasetAnalyzer, DatasetSnapshot
 from utils import ScrollableFrame
+from manifest import ManifestWriter, MANIFEST_EXT, MANIFEST_FILETYPES
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -123,6 +124,9 @@ class DatasetAnalyzerGUI:
 
         self.export_btn = ttk.Button(btn_frame, text="CSV로 출력", command=self.export_to_csv, state=tk.DISABLED)
         self.export_btn.pack(side=tk.LEFT, padx=2)
+
+        self.manifest_btn = ttk.Button(btn_frame, text="매니페스트 저장", command=self.export_manifest, state=tk.DISABLED)
+        self.manifest_btn.pack(side=tk.LEFT, padx=2)
         
         self.mismatch_btn = ttk.Button(btn_frame, text="버킷 미스 매치", command=self.show_mismatch_window, state=tk.DISABLED)
         self.mismatch_btn.pack(side=tk.LEFT, padx=2)
@@ -237,6 +241,7 @@ class DatasetAnalyzerGUI:
         self.search_btn.config(state=tk.DISABLED)
         self.analyze_btn.config(state=tk.DISABLED)
         self.export_btn.config(state=tk.DISABLED)
+        self.manifest_btn.config(state=tk.DISABLED)
         def run():
             num_cores = self.core_var.get() if self.core_var else 1
             
@@ -270,6 +275,7 @@ class DatasetAnalyzerGUI:
         self.search_btn.config(state=tk.NORMAL)
         self.analyze_btn.config(state=tk.NORMAL)
         self.export_btn.config(state=tk.NORMAL)
+        self.manifest_btn.config(state=tk.NORMAL)
         
         total_mismatches = sum(len(r.get('mismatches', [])) for r in self.results)
         if total_mismatches > 0:
@@ -598,6 +604,22 @@ class DatasetAnalyzerGUI:
         except Exception as e:
             messagebox.showerror("오류", f"파일 저장 중 오류가 발생했습니다: {e}")
 
+    # ── 매니페스트 내보내기 ───────────────────────────────────
+    def export_manifest(self):
+        """분석된 모든 폴더의 이미지를 매니페스트로 저장 (항목마다 폴더의 설정 리핏 기록)"""
+        if not self.results: return
+        file_path = filedialog.asksaveasfilename(defaultextension=MANIFEST_EXT, filetypes=MANIFEST_FILETYPES,
+                                                 initialfile=f"dataset{MANIFEST_EXT}")
+        if not file_path: return
+        try:
+            with ManifestWriter(file_path, "analyzer", self.get_active_root_path()) as writer:
+                for r in self.results:
+                    for image in r.get('images', []):
+                        writer.write(image, repeat=r.get('repeat', 1))
+            messagebox.showinfo("완료", f"{writer.count}개 이미지를 매니페스트로 저장했습니다:\n{file_path}")
+        except Exception as e:
+            messagebox.showerror("오류", f"파일 저장 중 오류가 발생했습니다: {e}")
+
     # ── 스냅샷 창 열기 ────────────────────────────────────────
     def show_snapshot_window(self):
         """데이터셋 스냅샷 관리 창을 엽니다."""
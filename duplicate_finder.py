@@ -1,36 +1,131 @@
 import os
+import math
 import hashlib
 from PIL import Image
+from array import array
 from collections import defaultdict
 import threading
-from typing import List, Dict, Tuple, Set, Optional, Any
+import functools
+from typing import List, Dict, Tuple, Set, Optional, Any, Callable, Iterable
 import concurrent.futures
 
+from tag_vocab import TagVocab
+
 # 지원하는 이미지 확장자
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'}
 
+# 중복 정리 시 격리(quarantine) 폴더 이름: 재검색 대상에서 제외
+QUARANTINE_DIR_NAME = "_duplicates_quarantine"
+
+# MD5 다이제스트 길이 (바이트)
+MD5_DIGEST_SIZE = 16
+
+# 스트리밍 처리 시 한 번에 해시를 계산할 최소 파일 수 (비율 구간 묶음 단위)
+STREAM_BATCH_FILES = 2000
+
 class ImageInfo:
-    def __init__(self, path: str):
+    """
+    화면 표시용 이미지 정보.
+    검색 엔진 내부에서는 ImageTable의 행 번호로만 다루며,
+    UI에 보여줄 그룹에 대해서만 ImageTable.info()로 생성한다.
+    """
+    def __init__(self, path: str, size: Optional[int] = None):
         self.path = path
-        self.size = os.path.getsize(path)
+        self.size = os.path.getsize(path) if size is None else size
         self.resolution = (0, 0)
         self.md5_val = None
         self.dhash_val = None # 이제 int형으로 저장
         self.tag_set = None # 태그 집합 (Set[str])
-        
-        # 생성 시에는 메타데이터를 읽지 않음 (병렬 처리를 위해 분리)
 
-class UnionFind:
-    """그룹핑을 위한 유니온-파인드 자료구조"""
-    def __init__(self, elements):
-        self.parent = {e: e for e in elements}
+        # 생성 시에는 메타데이터를 읽지 않음 (병렬 처리를 위해 분리)
 
-    def find(self, k):
-        if self.parent[k] != k:
-            self.parent[k] = self.find(self.parent[k])
-        return self.parent[k]
+class ImageTable:
+    """
+    중복 검색용 컬럼형 저장소.
+    파일마다 Python 객체를 만드는 대신, 폴더 문자열 테이블 + 파일명 리스트와
+    array 컬럼(용량, 너비, 높이, MD5 다이제스트, dHash)으로 보관한다.
+    행 번호(int)가 곧 파일 ID이다.
+    """
+    def __init__(self):
+        # 경로 문자열 테이블: 폴더 경로는 한 번만 저장하고 행에는 폴더 번호만 둠
+        self.dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self.dir_idx = array('I')
+        self.names: List[str] = []
+
+        self.size = array('q')
+        self.width = array('I')
+        self.height = array('I')
+        self.md5 = bytearray()          # 행당 16바이트, 전부 0이면 미계산
+        self.dhash = array('Q')
+        self.has_dhash = bytearray()    # 0/1 플래그
+        self.tag_sets: Dict[int, frozenset] = {}  # 태그 id 집합, 비교 후보에 대해서만 보관 (희소)
+        self.vocab = TagVocab()                   # 태그 문자열 ↔ id (Jaccard 비교를 정수 집합으로)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, dir_path: str, name: str, size: int) -> int:
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = len(self.dirs)
+            self._dir_ids[dir_path] = dir_id
+            self.dirs.append(dir_path)
+        self.dir_idx.append(dir_id)
+        self.names.append(name)
+        self.size.append(size)
+        self.width.append(0)
+        self.height.append(0)
+        self.md5.extend(bytes(MD5_DIGEST_SIZE))
+        self.dhash.append(0)
+        self.has_dhash.append(0)
+        return len(self.names) - 1
+
+    def path(self, idx: int) -> str:
+        return os.path.join(self.dirs[self.dir_idx[idx]], self.names[idx])
+
+    def md5_digest(self, idx: int) -> bytes:
+        offset = idx * MD5_DIGEST_SIZE
+        return bytes(self.md5[offset:offset + MD5_DIGEST_SIZE])
+
+    def set_md5(self, idx: int, digest: bytes):
+        if len(digest) == MD5_DIGEST_SIZE:
+            offset = idx * MD5_DIGEST_SIZE
+            self.md5[offset:offset + MD5_DIGEST_SIZE] = digest
+
+    def set_dhash(self, idx: int, value: Optional[int]):
+        if value is not None:
+            self.dhash[idx] = value
+            self.has_dhash[idx] = 1
+
+    def info(self, idx: int) -> ImageInfo:
+        """행 하나를 UI용 ImageInfo로 구체화"""
+        info = ImageInfo(self.path(idx), size=self.size[idx])
+        info.resolution = (self.width[idx], self.height[idx])
+        digest = self.md5_digest(idx)
+        if any(digest):
+            info.md5_val = digest.hex()
+        if self.has_dhash[idx]:
+            info.dhash_val = self.dhash[idx]
+        tags = self.tag_sets.get(idx)
+        if tags is not None:
+            info.tag_set = set(self.vocab.decode(tags))
+        return info
 
-    def union(self, a, b):
+class UnionFind:
+    """그룹핑을 위한 유니온-파인드 자료구조 (정수 ID 0..n-1 전용, array 기반)"""
+    def __init__(self, n: int):
+        self.parent = array('I', range(n))
+
+    def find(self, k: int) -> int:
+        parent = self.parent
+        # 경로 절반 압축 (재귀 없이 대용량에서도 안전)
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    def union(self, a: int, b: int):
         root_a = self.find(a)
         root_b = self.find(b)
         if root_a != root_b:
@@ -58,16 +153,16 @@ def read_tags_worker(path: str) -> Tuple[str, Set[str]]:
         pass
     return path, set()
 
-def compute_md5_worker(path: str) -> Tuple[str, str]:
-    """MD5 계산 워커"""
+def compute_md5_worker(path: str) -> Tuple[str, bytes]:
+    """MD5 계산 워커 (16바이트 다이제스트 반환, 실패 시 빈 bytes)"""
     hasher = hashlib.md5()
     try:
         with open(path, 'rb') as f:
             for chunk in iter(lambda: f.read(65536), b''):
                 hasher.update(chunk)
-        return path, hasher.hexdigest()
+        return path, hasher.digest()
     except Exception:
-        return path, ""
+        return path, b""
 
 def compute_dhash_worker(path: str, hash_size: int = 8) -> Tuple[str, int]:
     """dHash 계산 워커 (정수형 반환)"""
@@ -76,27 +171,76 @@ def compute_dhash_worker(path: str, hash_size: int = 8) -> Tuple[str, int]:
             img = img.convert("L")
             img = img.resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
             pixels = list(img.getdata())
-            
+
             diff = 0
             width = hash_size + 1
             bit_index = 0
-            
+
             for row in range(hash_size):
                 for col in range(hash_size):
                     if pixels[row * width + col] > pixels[row * width + col + 1]:
                         diff |= (1 << bit_index)
                     bit_index += 1
-            
+
             return path, diff
     except Exception:
         return path, None
 
+def analyze_image_worker(path: str, check_md5: bool, check_tag: bool, check_dhash: bool):
+    """MD5 / 태그 / dHash를 한 번의 작업으로 계산 (구간 단위 스트리밍 처리용)"""
+    digest = compute_md5_worker(path)[1] if check_md5 else None
+    tags = read_tags_worker(path)[1] if check_tag else None
+    dhash_val = compute_dhash_worker(path)[1] if check_dhash else None
+    return path, (digest, tags, dhash_val)
+
+def build_groups_from_edges(*edge_arrays) -> List[List[int]]:
+    """
+    간선 배열들([u0, v0, u1, v1, ...])을 Union-Find로 묶어
+    멤버 2개 이상인 그룹의 행 번호 리스트 반환
+    """
+    touched = set()
+    for edges in edge_arrays:
+        touched.update(edges)
+    if not touched: return []
+
+    # 구간 안의 행만 다루므로 지역 번호로 압축해서 Union-Find 크기를 줄임
+    nodes = sorted(touched)
+    local = {node: k for k, node in enumerate(nodes)}
+    uf = UnionFind(len(nodes))
+    for edges in edge_arrays:
+        for k in range(0, len(edges), 2):
+            uf.union(local[edges[k]], local[edges[k + 1]])
+
+    groups = defaultdict(list)
+    for node in nodes:
+        groups[uf.find(local[node])].append(node)
+    return [members for members in groups.values() if len(members) > 1]
+
+def iter_ratio_window_pairs(log_ratios: List[float], tolerance: float):
+    """
+    비율 기준 후보 쌍 생성 (슬라이딩 윈도우).
+    log_ratios는 오름차순 정렬된 log(w/h) 배열이어야 하며,
+    |log_ratio_i - log_ratio_j| <= tolerance 인 (i, j) 쌍(i < j)만 생성한다.
+    버킷 경계가 없으므로 1.333 / 1.335 처럼 반올림이 갈리는 쌍도 놓치지 않는다.
+    """
+    n = len(log_ratios)
+    for i in range(n):
+        limit = log_ratios[i] + tolerance
+        j = i + 1
+        while j < n and log_ratios[j] <= limit:
+            yield i, j
+            j += 1
+
+def ratio_tolerance_to_log(tolerance_percent: float) -> float:
+    """비율 허용 오차(%)를 log 비율 차이로 변환 (가로/세로 방향에 대칭)"""
+    return math.log1p(max(tolerance_percent, 0.0) / 100.0)
+
 class DuplicateFinder:
     def __init__(self):
         self.stop_event = threading.Event()
         # I/O 바운드 작업(파일 읽기)과 일부 CPU 작업(해시)을 위해 스레드 풀 사용
         # PIL과 hashlib은 GIL을 해제하므로 스레딩 효과가 좋음
-        self.max_workers = min(32, (os.cpu_count() or 1) * 4) 
+        self.max_workers = min(32, (os.cpu_count() or 1) * 4)
 
     def scan_files(self, folder_path: str, recursive: bool = True) -> List[str]:
         image_files = []
@@ -114,8 +258,65 @@ class DuplicateFinder:
                     image_files.append(full_path)
         return image_files
 
-    def find_duplicates(self, 
-                       folder_path: str, 
+    def scan_table(self, folder_path: str) -> ImageTable:
+        """폴더를 재귀 탐색하여 ImageTable 구성 (용량은 scandir stat 재사용)"""
+        table = ImageTable()
+        stack = [folder_path]
+        while stack:
+            if self.stop_event.is_set(): break
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name != QUARANTINE_DIR_NAME:
+                                    stack.append(entry.path)
+                            elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                                table.add(current, entry.name, entry.stat().st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return table
+
+    def _run_parallel(self, func: Callable, table: ImageTable, indices: Iterable[int], total: int,
+                      workers: int, on_result: Callable, progress_callback=None, message: str = ""):
+        """
+        워커 함수를 병렬 실행하되, 동시에 대기 중인 Future 수를 제한하여
+        수백만 파일에서도 메모리가 파일 수에 비례해 늘지 않도록 한다.
+        on_result(idx, result) 형태로 결과 전달.
+        """
+        if total == 0: return
+        if progress_callback: progress_callback(0, total, message)
+        max_pending = max(workers * 4, 16)
+        completed = 0
+        index_iter = iter(indices)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        idx = next(index_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[executor.submit(func, table.path(idx))] = idx
+                if not pending: break
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    idx = pending.pop(future)
+                    on_result(idx, future.result()[1])
+                    completed += 1
+                    if progress_callback and completed % 50 == 0:
+                        progress_callback(completed, total, message)
+                if self.stop_event.is_set():
+                    for future in pending: future.cancel()
+                    break
+
+    def find_duplicates(self,
+                       folder_path: str,
                        check_md5: bool = False,
                        check_dhash: bool = False,
                        check_tag: bool = False,
@@ -124,271 +325,212 @@ class DuplicateFinder:
                        tag_similarity_threshold: int = 100,
                        progress_callback=None,
                        max_workers: int = None,
-                       range_threshold: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+                       range_threshold: Optional[Tuple[int, int]] = None,
+                       ratio_tolerance: float = 1.0,
+                       group_callback: Optional[Callable[[Any, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         range_threshold: (start, end) 튜플. 설정되면 유사도 그룹 검색 모드로 동작하며 반환 구조가 달라짐.
         tag_similarity_threshold: 0~100 (Jaccard Similarity %)
+        ratio_tolerance: match_resolution 사용 시 비교 대상으로 인정할 비율 차이 (%)
+        group_callback: 비율 구간의 비교가 끝날 때마다 확정된 그룹을 전달받는 콜백.
+            group_callback(section, groups) 형태로 호출되며 section은
+            일반 모드에서 None, 범위 검색 모드에서 'md5' 또는 Threshold(int).
+            검색 중지 시에도 이미 전달된 그룹은 유효함.
         """
-        
+
         self.stop_event.clear()
         workers = max_workers if max_workers else self.max_workers
 
-        # 1. 파일 스캔
-        files = self.scan_files(folder_path, recursive=True)
-        total_files = len(files)
+        # 1. 파일 스캔 (컬럼형 테이블)
+        table = self.scan_table(folder_path)
+        total_files = len(table)
         if total_files == 0: return {}
 
         # 2. 메타데이터(해상도) 병렬 로드
-        image_infos_map = {} # path -> ImageInfo
-        
-        if progress_callback: progress_callback(0, total_files, "파일 정보 읽는 중...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-            future_to_path = {executor.submit(process_image_meta, f): f for f in files}
-            
-            completed = 0
-            for future in concurrent.futures.as_completed(future_to_path):
-                if self.stop_event.is_set(): break
-                path, size = future.result()
-                
-                info = ImageInfo(path)
-                info.resolution = size
-                if size != (0, 0):
-                    image_infos_map[path] = info
-                
-                completed += 1
-                if progress_callback and completed % 50 == 0:
-                    progress_callback(completed, total_files, "파일 정보 읽는 중...")
+        def _store_resolution(idx, size):
+            table.width[idx], table.height[idx] = size
+
+        self._run_parallel(process_image_meta, table, range(total_files), total_files, workers,
+                           _store_resolution, progress_callback, "파일 정보 읽는 중...")
 
         if self.stop_event.is_set(): return {}
 
-        image_infos = list(image_infos_map.values())
-        
-        # 3. 그룹화 (비율 기준 1차 필터링)
-        potential_groups = defaultdict(list)
+        # 3. 비율 기준 정렬 (슬라이딩 윈도우 후보 생성을 위해)
+        # 해상도를 읽지 못한 파일은 제외. 비율을 log(w/h)로 다루면 허용 오차가 가로형/세로형에 대칭으로 적용됨
+        valid = [i for i in range(total_files) if table.width[i] and table.height[i]]
         if match_resolution:
-            for info in image_infos:
-                w, h = info.resolution
-                if h == 0: ratio = 0
-                else: ratio = round(w / h, 2)
-                potential_groups[ratio].append(info)
+            ratio_of = array('d', (math.log(table.width[i] / table.height[i]) if table.height[i] else 0.0
+                                   for i in range(total_files)))
+            order = array('I', sorted(valid, key=ratio_of.__getitem__))
+            log_ratios = array('d', (ratio_of[i] for i in order))
+            del ratio_of
+            window = ratio_tolerance_to_log(ratio_tolerance)
         else:
-            potential_groups['all'] = image_infos
+            # 비율 무시: 모든 이미지를 하나의 윈도우로 취급
+            order = array('I', valid)
+            log_ratios = array('d', bytes(8 * len(order)))
+            window = math.inf
+        del valid
+
+        # 비율 구간(Segment) 분할: 인접 간격이 허용 오차를 넘는 지점에서 끊음.
+        # 서로 다른 구간 사이에는 비교 쌍이 생길 수 없으므로 구간 단위로 계산을 끝내고
+        # 완성된 그룹을 바로 내보낼 수 있다. (멤버 1개짜리 구간은 비교 대상 아님)
+        segments = []
+        seg_start = 0
+        for i in range(1, len(order) + 1):
+            if i == len(order) or log_ratios[i] - log_ratios[i - 1] > window:
+                if i - seg_start >= 2:
+                    segments.append((seg_start, i))
+                seg_start = i
+        total_candidates = sum(end - start for start, end in segments)
 
         # ---------------------------------------------------------
-        # 4. 각 검사(MD5, Tag, dHash) 실행 및 데이터 수집
+        # 4~6. 구간 묶음 단위로 해시 계산 → 비교 → 그룹 확정 및 전달
         # ---------------------------------------------------------
-        
-        # --- 4-1. MD5 ---
-        if check_md5:
-            md5_targets = []
-            for group in potential_groups.values():
-                if len(group) >= 2:
-                    md5_targets.extend([info.path for info in group])
-            
-            if md5_targets:
-                if progress_callback: progress_callback(0, len(md5_targets), "완전 중복(MD5) 계산 중...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                    future_to_path = {executor.submit(compute_md5_worker, p): p for p in md5_targets}
-                    completed = 0
-                    for future in concurrent.futures.as_completed(future_to_path):
-                        if self.stop_event.is_set(): break
-                        path, md5 = future.result()
-                        image_infos_map[path].md5_val = md5
-                        completed += 1
-                        if progress_callback and completed % 50 == 0:
-                             progress_callback(completed, len(md5_targets), "완전 중복(MD5) 계산 중...")
-
-        # --- 4-2. Tag ---
-        if check_tag:
-            tag_targets = []
-            for group in potential_groups.values():
-                if len(group) >= 2:
-                    tag_targets.extend([info.path for info in group])
-            
-            if tag_targets:
-                if progress_callback: progress_callback(0, len(tag_targets), "태그 정보 읽는 중...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                    future_to_path = {executor.submit(read_tags_worker, p): p for p in tag_targets}
-                    completed = 0
-                    for future in concurrent.futures.as_completed(future_to_path):
-                        if self.stop_event.is_set(): break
-                        path, tags = future.result()
-                        image_infos_map[path].tag_set = tags
-                        completed += 1
-                        if progress_callback and completed % 50 == 0:
-                            progress_callback(completed, len(tag_targets), "태그 정보 읽는 중...")
-
-        # --- 4-3. dHash ---
-        if check_dhash and not self.stop_event.is_set():
-            dhash_targets = []
-            for group in potential_groups.values():
-                if len(group) >= 2:
-                    dhash_targets.extend([info.path for info in group])
-            
-            if dhash_targets:
-                if progress_callback: progress_callback(0, len(dhash_targets), "유사도(dHash) 계산 중...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                    future_to_path = {executor.submit(compute_dhash_worker, p): p for p in dhash_targets}
-                    completed = 0
-                    for future in concurrent.futures.as_completed(future_to_path):
-                        if self.stop_event.is_set(): break
-                        path, dhash = future.result()
-                        image_infos_map[path].dhash_val = dhash
-                        completed += 1
-                        if progress_callback and completed % 50 == 0:
-                            progress_callback(completed, len(dhash_targets), "유사도(dHash) 계산 중...")
+        limit = range_threshold[1] if range_threshold else similarity_threshold
+        result_type = 'exact' if check_md5 and not check_dhash and not check_tag else 'similar'
+        analyze = functools.partial(analyze_image_worker, check_md5=check_md5,
+                                    check_tag=check_tag, check_dhash=check_dhash)
+
+        def _store_analysis(idx, result):
+            digest, tags, dhash_val = result
+            if digest: table.set_md5(idx, digest)
+            if tags is not None: table.tag_sets[idx] = table.vocab.encode_set(tags)
+            table.set_dhash(idx, dhash_val)
+
+        final_groups = {}
+        md5_only_groups = {}
+        range_results = defaultdict(dict)
+        counters = defaultdict(int)
+
+        def _emit(section, groups_list, group_type):
+            """확정된 그룹을 결과에 누적하고 콜백으로 즉시 전달"""
+            if not groups_list: return
+            if section is None: target = final_groups
+            elif section == 'md5': target = md5_only_groups
+            else: target = range_results[section]
+            batch = {}
+            for members in groups_list:
+                key = f"group_{counters[section]}"
+                counters[section] += 1
+                batch[key] = {'type': group_type, 'items': [table.info(m) for m in members]}
+            target.update(batch)
+            if group_callback: group_callback(section, batch)
+
+        processed = 0
+        seg_pos = 0
+        while seg_pos < len(segments):
+            if self.stop_event.is_set(): break
+            # 작은 구간이 많을 때 스레드 풀 효율을 위해 일정 크기 이상으로 묶어서 처리
+            batch_end = seg_pos
+            batch_size = 0
+            while batch_end < len(segments) and (batch_size < STREAM_BATCH_FILES or batch_end == seg_pos):
+                start, end = segments[batch_end]
+                batch_size += end - start
+                batch_end += 1
+            batch_segments = segments[seg_pos:batch_end]
+            seg_pos = batch_end
+
+            members = (order[i] for start, end in batch_segments for i in range(start, end))
+            message = "분석 중..."
+            def _progress(done, _total, msg, base=processed):
+                if progress_callback: progress_callback(base + done, total_candidates, msg)
+            self._run_parallel(analyze, table, members, batch_size, workers,
+                               _store_analysis, _progress, message)
+            processed += batch_size
+            if self.stop_event.is_set(): break
+
+            for start, end in batch_segments:
+                edges = self._compare_segment(table, order, log_ratios, start, end, window,
+                                              check_md5, check_tag, check_dhash,
+                                              limit, tag_similarity_threshold)
+                md5_edges, tag_edges, dhash_edges, dhash_dists = edges
+
+                # 1) 일반 모드 (Not Range Search): 모든 활성 간선 합치기
+                if not range_threshold:
+                    _emit(None, build_groups_from_edges(md5_edges, tag_edges, dhash_edges), result_type)
+                    continue
+
+                # 2) 범위 검색 모드 (Range Search)
+                # -> 사용자가 "태그 검색"도 켰다면, 태그로 인한 연결은 각 단계에 포함되어야 함.
+                # -> 즉, 각 Threshold 단계마다 (dHash <= Th) U (Tag Edges) U (MD5 Edges) 를 수행.
+                # MD5 전용 결과 (UI에서 "완전 중복" 섹션에 표시됨)
+                _emit('md5', build_groups_from_edges(md5_edges), 'exact')
+                start_th, end_th = range_threshold
+                for th in range(start_th, end_th + 1):
+                    th_edges = array('I')
+                    for k, d in enumerate(dhash_dists):
+                        if d <= th:
+                            th_edges.append(dhash_edges[2 * k])
+                            th_edges.append(dhash_edges[2 * k + 1])
+                    # Tag와 MD5는 "항상 포함" (유사도에 관계없이 매칭된 것이므로)
+                    _emit(th, build_groups_from_edges(th_edges, tag_edges, md5_edges), 'similar')
 
         if self.stop_event.is_set(): return {}
 
-        # ---------------------------------------------------------
-        # 5. 비교 및 그룹핑 (Union-Find)
-        # ---------------------------------------------------------
-        if progress_callback: progress_callback(0, 0, "비교 분석 중...")
-
-        # 모든 간선(Edge) 수집
-        # Edge 타입: ('md5', u, v), ('tag', u, v), ('dhash', u, v, distance)
-        
-        md5_edges = []
-        tag_edges = []
-        dhash_edges = [] # (u, v, dist)
-
-        for group in potential_groups.values():
-            if len(group) < 2: continue
-            
-            # 1) MD5 비교
-            if check_md5:
-                md5_map = defaultdict(list)
-                for info in group:
-                    if info.md5_val: md5_map[info.md5_val].append(info)
-                for items in md5_map.values():
-                    if len(items) > 1:
-                        for i in range(len(items)-1):
-                            md5_edges.append((items[i], items[i+1]))
-
-            # 2) Tag 및 dHash 비교 (N^2 Loop 최적화)
-            # 그룹 내 아이템 리스트
-            items = group
-            n = len(items)
-            
-            # 태그나 dHash 중 하나라도 체크되어 있으면 루프
-            if check_tag or check_dhash:
-                for i in range(n):
-                    for j in range(i + 1, n):
-                        u, v = items[i], items[j]
-                        
-                        # Tag Match Check
-                        if check_tag and u.tag_set and v.tag_set:
-                            # Jaccard Similarity
-                            intersection = len(u.tag_set & v.tag_set)
-                            union = len(u.tag_set | v.tag_set)
-                            if union > 0:
-                                sim = (intersection / union) * 100
-                                if sim >= tag_similarity_threshold:
-                                    tag_edges.append((u, v))
-                        
-                        # dHash Match Check
-                        if check_dhash and u.dhash_val is not None and v.dhash_val is not None:
-                            dist = (u.dhash_val ^ v.dhash_val).bit_count()
-                            
-                            # Range 모드면 최대치까지 수집, 아니면 Threshold 이하만 수집
-                            limit = range_threshold[1] if range_threshold else similarity_threshold
-                            if dist <= limit:
-                                dhash_edges.append((u, v, dist))
-
-        # ---------------------------------------------------------
-        # 6. 결과 생성
-        # ---------------------------------------------------------
-
-        # 공통 함수: 간선 리스트를 받아 그룹 Dict 반환
-        def build_groups_from_edges(nodes, edges):
-            if not edges: return {}
-            uf = UnionFind(nodes)
-            for u, v in edges:
-                uf.union(u, v)
-            
-            groups = defaultdict(list)
-            for node in nodes:
-                root = uf.find(node)
-                groups[root].append(node)
-            
-            res_groups = {}
-            counter = 0
-            for root, items in groups.items():
-                if len(items) > 1:
-                    res_groups[f"group_{counter}"] = {'type': 'similar', 'items': items}
-                    counter += 1
-            return res_groups
-
-        # 전체 노드 집합
-        all_nodes = set(image_infos)
-
-        # 1) 일반 모드 (Not Range Search)
         if not range_threshold:
-            # 모든 활성 간선 합치기
-            active_edges = []
-            active_edges.extend(md5_edges)
-            active_edges.extend(tag_edges)
-            active_edges.extend([(u, v) for u, v, d in dhash_edges]) # 거리 조건은 위에서 이미 필터링됨
-            
-            final_groups = build_groups_from_edges(all_nodes, active_edges)
-            
-            # 결과 타입 마킹 (우선순위: exact > similar)
-            # 여기서는 편의상 통합된 그룹을 'similar'로 퉁치거나, 
-            # MD5만으로 묶인 그룹인지 확인하는 로직이 필요할 수 있으나,
-            # "태그 기반"이 섞이면 'exact'라 부르기 모호함.
-            # 다만 UI 표시를 위해 MD5 only 그룹은 분리하고 싶을 수 있음.
-            # 하지만 사용자가 옵션을 섞어 썼으므로 통합 그룹핑이 맞음.
-            
-            # UI 호환성을 위해 타입 결정 로직 개선:
-            # - MD5 only 체크 시: type='exact'
-            # - 그 외: type='similar'
-            
-            result_type = 'exact' if check_md5 and not check_dhash and not check_tag else 'similar'
-            for key, val in final_groups.items():
-                val['type'] = result_type
-            
             return final_groups
+        # 반환 구조: {'mode': 'range', 'md5': {group...}, 'dhash': {threshold: {group...}}}
+        return {'mode': 'range', 'md5': md5_only_groups,
+                'dhash': {th: groups for th, groups in sorted(range_results.items()) if groups}}
+
+    @staticmethod
+    def _compare_segment(table: ImageTable, order, log_ratios, start: int, end: int, window: float,
+                         check_md5: bool, check_tag: bool, check_dhash: bool,
+                         limit: int, tag_similarity_threshold: int):
+        """
+        비율 구간 하나의 비교 간선 계산.
+        간선은 행 번호 쌍으로 수집: [u0, v0, u1, v1, ...]
+        Returns: (md5_edges, tag_edges, dhash_edges, dhash_dists)
+        """
+        md5_edges = array('I')
+        tag_edges = array('I')
+        dhash_edges = array('I')
+        dhash_dists = array('B') # dhash_edges의 쌍마다 거리 1개
 
-        # 2) 범위 검색 모드 (Range Search)
-        else:
-            # 반환 구조: {'mode': 'range', 'md5': {group...}, 'dhash': {threshold: {group...}}}
-            # 태그 검색 결과는 어떻게? 
-            # -> 사용자가 "태그 검색"도 켰다면, 태그로 인한 연결은 "유사도 0(혹은 현재 Range)"에 포함되어야 함.
-            # -> 논리: "태그가 같으면(유사하면) 시각적 차이가 있어도 그룹핑한다"
-            # -> 즉, 각 Threshold 단계마다 (dHash <= Th) U (Tag Edges) U (MD5 Edges) 를 수행.
-            
-            start_th, end_th = range_threshold
-            range_results = {} 
-            
-            # MD5 결과는 별도로 담기 (UI에서 "완전 중복" 섹션에 표시됨)
-            # 주의: Range 모드에서 MD5는 "0" 거리에 해당하지만, UI 트리가 분리되어 있음.
-            # 태그 에지도 "별도 트리"로 보여주는게 좋을까? 아니면 dHash 트리에 합칠까?
-            # 사용자가 "dHash랑 같이 쓰기 애매할려나?" 했으므로 합치는게 나음.
-            
-            # MD5 전용 결과 (UI 표시용)
-            md5_only_groups = build_groups_from_edges(all_nodes, md5_edges)
-            for v in md5_only_groups.values(): v['type'] = 'exact'
-
-            # Range Loop
-            for th in range(start_th, end_th + 1):
-                # 해당 임계값에 맞는 dHash 에지 + 태그 에지 + MD5 에지
-                current_dhash_edges = [(u, v) for u, v, d in dhash_edges if d <= th]
-                
-                # Tag와 MD5는 "항상 포함" (유사도에 관계없이 매칭된 것이므로)
-                combined_edges = []
-                combined_edges.extend([(u,v) for u,v in current_dhash_edges])
-                combined_edges.extend(tag_edges)
-                combined_edges.extend(md5_edges)
-                
-                if not combined_edges: continue
-                
-                # 그룹핑
-                th_groups = build_groups_from_edges(all_nodes, combined_edges)
-                if th_groups:
-                    range_results[th] = th_groups
-
-            return {'mode': 'range', 'md5': md5_only_groups, 'dhash': range_results}
+        # 1) MD5 비교 (내용이 같으면 비율도 같으므로 해시 기준으로 묶으면 됨)
+        if check_md5:
+            first_by_digest: Dict[bytes, int] = {}
+            for i in range(start, end):
+                idx = order[i]
+                digest = table.md5_digest(idx)
+                if not any(digest): continue
+                first = first_by_digest.setdefault(digest, idx)
+                if first != idx:
+                    md5_edges.append(first)
+                    md5_edges.append(idx)
+
+        # 2) Tag 및 dHash 비교 (비율 윈도우 안의 쌍만 비교)
+        if check_tag or check_dhash:
+            tag_sets = table.tag_sets
+            dhash = table.dhash
+            has_dhash = table.has_dhash
+            for i, j in iter_ratio_window_pairs(log_ratios[start:end], window):
+                u, v = order[start + i], order[start + j]
+
+                # Tag Match Check
+                if check_tag:
+                    u_tags = tag_sets.get(u)
+                    v_tags = tag_sets.get(v)
+                    if u_tags and v_tags:
+                        # Jaccard Similarity
+                        intersection = len(u_tags & v_tags)
+                        union = len(u_tags | v_tags)
+                        if union > 0:
+                            sim = (intersection / union) * 100
+                            if sim >= tag_similarity_threshold:
+                                tag_edges.append(u)
+                                tag_edges.append(v)
+
+                # dHash Match Check (Range 모드면 최대치까지 수집, 아니면 Threshold 이하만 수집)
+                if check_dhash and has_dhash[u] and has_dhash[v]:
+                    dist = (dhash[u] ^ dhash[v]).bit_count()
+                    if dist <= limit:
+                        dhash_edges.append(u)
+                        dhash_edges.append(v)
+                        dhash_dists.append(dist)
+
+        return md5_edges, tag_edges, dhash_edges, dhash_dists
 
     def stop(self):
         self.stop_event.set()
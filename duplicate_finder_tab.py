@@ -6,13 +6,25 @@ import os
 import shutil
 import time
 from duplicate_finder import DuplicateFinder, ImageInfo
+from duplicate_resolver import (DuplicateResolver, KEEPER_POLICIES, RESOLVE_ACTIONS,
+                                plan_resolution)
+from link_utils import LINK_MODES
+from manifest import ManifestWriter, MANIFEST_EXT, MANIFEST_FILETYPES
 from utils import format_number, ScrollableFrame
+from thumbnail_cache import make_thumbnail
+
+# 스트리밍 결과 트리 삽입 설정: 한 번의 after() 호출에서 삽입할 그룹 수와 호출 간격(ms)
+GROUPS_PER_FLUSH = 200
+FLUSH_INTERVAL_MS = 30
 
 class DuplicateFinderGUI:
     def __init__(self, parent, folder_path_var=None, core_var=None):
         self.parent = parent
         self.finder = DuplicateFinder()
+        self.resolver = DuplicateResolver()
+        self._cleanup_running = False   # 일괄 정리/링크 통합 실행 중이면 중지 버튼이 resolver를 멈춤
         self.search_thread = None
+        self.search_folder = None
         self.start_time = 0
         
         # 메인 앱과 폴더 경로 연동
@@ -28,6 +40,7 @@ class DuplicateFinderGUI:
         self.check_tag_search = tk.BooleanVar(value=False) # 태그 검색
         
         self.match_resolution = tk.BooleanVar(value=True)
+        self.ratio_tolerance = tk.DoubleVar(value=1.0) # 비율 허용 오차 (%)
         self.similarity_threshold = tk.IntVar(value=5)
         self.tag_similarity_threshold = tk.IntVar(value=100) # 태그 유사도 (0-100)
         
@@ -39,8 +52,25 @@ class DuplicateFinderGUI:
         # 액션 옵션
         self.delete_pair_txt = tk.BooleanVar(value=False)
         
+        # 일괄 정리 옵션
+        self.resolve_policy = tk.StringVar(value=KEEPER_POLICIES['largest_resolution'])
+        self.resolve_action = tk.StringVar(value=RESOLVE_ACTIONS['quarantine'])
+        self.preferred_folder = tk.StringVar()
+        self.resolve_dest_folder = tk.StringVar()
+        self.resolve_include_txt = tk.BooleanVar(value=True)
+        self.link_mode = tk.StringVar(value=LINK_MODES['auto'])
+        
         self.found_groups = {} 
         self.selected_file_path = None
+        self._preview_key = None   # (경로, 표시 폭, 표시 높이) - 현재 미리보기에 표시된 이미지
+        
+        # 스트리밍 결과 상태 (검색 스레드 → UI 스레드)
+        self._pending_groups = []          # [(section, group_id, data), ...]
+        self._pending_lock = threading.Lock()
+        self._flush_job = None
+        self._section_nodes = {}           # section -> 트리 루트 노드 (범위 검색 모드)
+        self._section_counts = {}          # section -> 표시된 그룹 수
+        self._shown_groups = []            # [(section, type, [ImageInfo, ...]), ...] 일괄 정리 대상
         
         self.create_widgets()
 
@@ -142,8 +172,15 @@ class DuplicateFinderGUI:
         ttk.Separator(opt_group, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
         
         ttk.Checkbutton(opt_group, text="이미지 비율(Aspect Ratio)이 같은 것끼리만 비교", 
-                       variable=self.match_resolution).pack(anchor=tk.W)
+                       variable=self.match_resolution,
+                       command=self.toggle_ui_state).pack(anchor=tk.W)
         ttk.Label(opt_group, text="(크기가 달라도 비율이 같으면 비교)", font=("", 8), foreground="gray").pack(anchor=tk.W, padx=20)
+        
+        self.ratio_frame = ttk.Frame(opt_group, padding=(20, 0, 0, 0))
+        self.ratio_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(self.ratio_frame, text="비율 허용 오차 (%):").pack(side=tk.LEFT)
+        ttk.Spinbox(self.ratio_frame, from_=0.0, to=10.0, increment=0.1,
+                    textvariable=self.ratio_tolerance, width=5).pack(side=tk.LEFT, padx=5)
 
         # 검색 버튼
         self.btn_search = ttk.Button(left_frame, text="중복 이미지 찾기 시작", command=self.start_search)
@@ -215,6 +252,48 @@ class DuplicateFinderGUI:
         ttk.Button(action_frame, text="선택한 파일 이동...", command=self.move_selected).pack(fill=tk.X, pady=2)
         ttk.Button(action_frame, text="선택한 파일이 속한 폴더 열기", command=self.open_folder).pack(fill=tk.X, pady=2)
         
+        # 일괄 정리 (모든 그룹)
+        resolve_group = ttk.LabelFrame(right_frame, text="일괄 정리 (표시된 모든 그룹)", padding="10")
+        resolve_group.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(resolve_group, text="그룹별 보존할 파일:").pack(anchor=tk.W)
+        ttk.Combobox(resolve_group, textvariable=self.resolve_policy, state="readonly",
+                     values=list(KEEPER_POLICIES.values())).pack(fill=tk.X, pady=2)
+        
+        pref_frame = ttk.Frame(resolve_group)
+        pref_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(pref_frame, text="선호 폴더:").pack(side=tk.LEFT)
+        ttk.Entry(pref_frame, textvariable=self.preferred_folder).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(pref_frame, text="선택", width=5,
+                   command=lambda: self._select_folder_into(self.preferred_folder)).pack(side=tk.LEFT)
+        
+        ttk.Label(resolve_group, text="나머지 파일 처리:").pack(anchor=tk.W, pady=(5, 0))
+        ttk.Combobox(resolve_group, textvariable=self.resolve_action, state="readonly",
+                     values=list(RESOLVE_ACTIONS.values())).pack(fill=tk.X, pady=2)
+        
+        dest_frame = ttk.Frame(resolve_group)
+        dest_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(dest_frame, text="이동 폴더:").pack(side=tk.LEFT)
+        ttk.Entry(dest_frame, textvariable=self.resolve_dest_folder).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(dest_frame, text="선택", width=5,
+                   command=lambda: self._select_folder_into(self.resolve_dest_folder)).pack(side=tk.LEFT)
+        
+        ttk.Checkbutton(resolve_group, text="캡션(.txt)도 함께 처리",
+                        variable=self.resolve_include_txt).pack(anchor=tk.W, pady=2)
+        
+        self.btn_resolve = ttk.Button(resolve_group, text="일괄 정리 실행", command=self.start_bulk_resolve)
+        self.btn_resolve.pack(fill=tk.X, pady=2)
+        
+        ttk.Separator(resolve_group, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=5)
+        ttk.Label(resolve_group, text="완전 중복을 링크로 통합 (폴더 구조 유지):").pack(anchor=tk.W)
+        ttk.Combobox(resolve_group, textvariable=self.link_mode, state="readonly",
+                     values=list(LINK_MODES.values())).pack(fill=tk.X, pady=2)
+        self.btn_link = ttk.Button(resolve_group, text="완전 중복 링크로 통합", command=self.start_link_consolidation)
+        self.btn_link.pack(fill=tk.X, pady=2)
+        
+        ttk.Button(resolve_group, text="마지막 일괄 정리 취소", command=self.undo_bulk_resolve).pack(fill=tk.X, pady=2)
+        ttk.Button(resolve_group, text="표시된 그룹 매니페스트 저장...", command=self.export_manifest).pack(fill=tk.X, pady=2)
+        
         self.toggle_ui_state() # 초기 상태 설정
 
     def toggle_ui_state(self):
@@ -234,6 +313,11 @@ class DuplicateFinderGUI:
             for child in self.tag_frame.winfo_children():
                 child.configure(state=tk.DISABLED)
 
+        # 1-1. 비율 허용 오차 UI 상태
+        ratio_state = tk.NORMAL if self.match_resolution.get() else tk.DISABLED
+        for child in self.ratio_frame.winfo_children():
+            child.configure(state=ratio_state)
+
         # 2. dHash UI 상태
         if not self.check_dhash.get():
             for child in self.threshold_frame.winfo_children():
@@ -266,6 +350,11 @@ class DuplicateFinderGUI:
         if folder:
             self.independent_folder_path.set(folder)
 
+    def _select_folder_into(self, var):
+        folder = filedialog.askdirectory()
+        if folder:
+            var.set(folder)
+
     def start_search(self):
         # 경로 결정: 독립 경로 사용 여부에 따라 분기
         if self.use_independent_path.get():
@@ -286,7 +375,11 @@ class DuplicateFinderGUI:
             
         self.tree.delete(*self.tree.get_children())
         self.found_groups = {}
+        self.search_folder = folder
+        self._reset_stream_state()
         self.btn_search.config(state=tk.DISABLED)
+        self.btn_resolve.config(state=tk.DISABLED)
+        self.btn_link.config(state=tk.DISABLED)
         self.btn_stop.config(state=tk.NORMAL)
         self.progress_bar['value'] = 0
         self.start_time = time.time()
@@ -297,7 +390,10 @@ class DuplicateFinderGUI:
         self.search_thread.start()
 
     def stop_search(self):
-        if self.finder:
+        if self._cleanup_running:
+            self.resolver.stop()
+            self.progress_var.set("중지 요청됨...")
+        elif self.finder:
             self.finder.stop()
             self.progress_var.set("중지 요청됨...")
 
@@ -321,6 +417,11 @@ class DuplicateFinderGUI:
                 
                 range_threshold = (s, e)
 
+            try:
+                ratio_tolerance = max(0.0, float(self.ratio_tolerance.get()))
+            except (tk.TclError, ValueError):
+                ratio_tolerance = 1.0
+
             results = self.finder.find_duplicates(
                 folder,
                 check_md5=self.check_md5.get(),
@@ -331,7 +432,9 @@ class DuplicateFinderGUI:
                 tag_similarity_threshold=self.tag_similarity_threshold.get(),
                 progress_callback=self.update_progress,
                 max_workers=max_workers,
-                range_threshold=range_threshold
+                range_threshold=range_threshold,
+                ratio_tolerance=ratio_tolerance,
+                group_callback=self._on_groups_found
             )
             self.parent.after(0, self.search_complete, results)
         except Exception as e:
@@ -344,46 +447,91 @@ class DuplicateFinderGUI:
         self.parent.after(0, lambda: self.progress_var.set(message))
         self.parent.after(0, lambda: self.progress_bar.configure(value=progress))
 
+    # =========================================================================
+    # 스트리밍 결과 처리
+    # =========================================================================
+
+    def _reset_stream_state(self):
+        if self._flush_job:
+            self.parent.after_cancel(self._flush_job)
+            self._flush_job = None
+        with self._pending_lock:
+            self._pending_groups = []
+        self._section_nodes = {}
+        self._section_counts = {}
+        self._shown_groups = []
+
+    def _on_groups_found(self, section, groups):
+        """검색 스레드에서 호출: 확정된 그룹을 대기열에 넣고 UI 스레드에 삽입 예약"""
+        with self._pending_lock:
+            self._pending_groups.extend((section, gid, data) for gid, data in groups.items())
+        self.parent.after(0, self._schedule_flush)
+
+    def _schedule_flush(self):
+        if self._flush_job is None:
+            self._flush_job = self.parent.after(FLUSH_INTERVAL_MS, self._flush_pending_groups)
+
+    def _flush_pending_groups(self, drain=False):
+        """대기 중인 그룹을 GROUPS_PER_FLUSH개씩 트리에 삽입 (drain=True면 전부)"""
+        self._flush_job = None
+        with self._pending_lock:
+            if drain:
+                chunk, self._pending_groups = self._pending_groups, []
+            else:
+                chunk = self._pending_groups[:GROUPS_PER_FLUSH]
+                del self._pending_groups[:GROUPS_PER_FLUSH]
+            remaining = len(self._pending_groups)
+
+        by_section = {}
+        for section, gid, data in chunk:
+            by_section.setdefault(section, {})[gid] = data
+        for section, groups in by_section.items():
+            self._shown_groups.extend((section, data['type'], data['items']) for data in groups.values())
+            parent_node = self._get_section_node(section)
+            self._insert_groups_to_tree(parent_node, groups)
+            self._section_counts[section] = self._section_counts.get(section, 0) + len(groups)
+            self._update_section_label(section)
+
+        if remaining:
+            self._schedule_flush()
+
+    def _get_section_node(self, section):
+        """섹션별 루트 노드 (일반 모드는 트리 루트). MD5 → Threshold 오름차순으로 정렬 삽입"""
+        if section is None:
+            return ""
+        if section not in self._section_nodes:
+            sort_key = lambda sec: -1 if sec == 'md5' else sec
+            position = sum(1 for sec in self._section_nodes if sort_key(sec) < sort_key(section))
+            self._section_nodes[section] = self.tree.insert("", position, text="", open=(section == 'md5'))
+        return self._section_nodes[section]
+
+    def _update_section_label(self, section):
+        if section is None:
+            return
+        count = self._section_counts.get(section, 0)
+        if section == 'md5':
+            text = f"완전 중복 (MD5) - {count}그룹"
+        else:
+            # 최상위 노드: 유사도_N그룹_M개
+            text = f"유사도_{section}그룹_{count}개"
+        self.tree.item(self._section_nodes[section], text=text)
+
     def search_complete(self, results):
         self.found_groups = results
+        # 아직 삽입되지 않은 그룹을 마저 반영
+        self._flush_pending_groups(drain=True)
         self.reset_ui()
         elapsed = time.time() - self.start_time
         
-        # 결과 처리 로직 분기
-        if isinstance(results, dict) and 'mode' in results and results['mode'] == 'range':
+        count_total = sum(self._section_counts.values())
+        if self.finder.stop_event.is_set():
+            self.progress_var.set(f"검색 중지됨: 중지 전까지 {count_total}개의 그룹/쌍 표시 (소요 시간: {elapsed:.2f}초)")
+        elif isinstance(results, dict) and 'mode' in results and results['mode'] == 'range':
             # === 범위 검색 결과 ===
-            md5_results = results.get('md5', {})
-            dhash_results = results.get('dhash', {}) # {threshold: {group_id: ...}}
-            
-            count_total = len(md5_results)
-            for th_res in dhash_results.values():
-                count_total += len(th_res)
-                
             self.progress_var.set(f"검색 완료: 총 {count_total}개의 그룹/쌍 발견 (소요 시간: {elapsed:.2f}초)")
-            
-            # 1. MD5 결과 표시
-            if md5_results:
-                md5_root = self.tree.insert("", tk.END, text=f"완전 중복 (MD5) - {len(md5_results)}그룹", open=True)
-                self._insert_groups_to_tree(md5_root, md5_results)
-            
-            # 2. dHash 결과 표시 (Threshold 별로)
-            # 키(Threshold)를 오름차순 정렬
-            sorted_thresholds = sorted(dhash_results.keys())
-            
-            for th in sorted_thresholds:
-                groups = dhash_results[th]
-                if not groups: continue
-                
-                # 최상위 노드: 유사도_N그룹_M개
-                th_node_text = f"유사도_{th}그룹_{len(groups)}개"
-                th_root = self.tree.insert("", tk.END, text=th_node_text, open=False)
-                
-                self._insert_groups_to_tree(th_root, groups)
-                
         else:
             # === 기존 단일 검색 결과 ===
-            self.progress_var.set(f"검색 완료: {len(results)}개의 중복 그룹/쌍 발견 (소요 시간: {elapsed:.2f}초)")
-            self._insert_groups_to_tree("", results) # Root에 바로 추가
+            self.progress_var.set(f"검색 완료: {count_total}개의 중복 그룹/쌍 발견 (소요 시간: {elapsed:.2f}초)")
 
     def _insert_groups_to_tree(self, parent_node, groups_dict):
         """트리뷰에 그룹 목록을 삽입하는 헬퍼 함수"""
@@ -413,7 +561,10 @@ class DuplicateFinderGUI:
 
     def reset_ui(self):
         self.btn_search.config(state=tk.NORMAL)
-        self.btn_stop.config(state=tk.DISABLED)
+        self.btn_resolve.config(state=tk.NORMAL)
+        self.btn_link.config(state=tk.NORMAL)
+        self.btn_stop.config(state=tk.DISABLED, text="검색 중지")
+        self._cleanup_running = False
         self.progress_bar['value'] = 0
 
     def on_tree_select(self, event):
@@ -435,8 +586,6 @@ class DuplicateFinderGUI:
 
     def show_preview(self, path):
         try:
-            image = Image.open(path)
-            
             # 가용한 영역 크기 확인
             canvas_width = self.preview_label.winfo_width()
             canvas_height = self.preview_label.winfo_height()
@@ -449,20 +598,30 @@ class DuplicateFinderGUI:
             display_width = max(canvas_width - 10, 10)
             display_height = max(canvas_height - 10, 10)
             
-            # 리사이즈 (비율 유지)
+            # 같은 파일을 같은 크기로 이미 표시 중이면 다시 디코딩하지 않음 (Configure 이벤트 반복)
+            preview_key = (path, display_width, display_height)
+            if preview_key == self._preview_key:
+                return
+
+            # 원본 해상도는 헤더만 읽어 확인하고, 표시용 이미지는 영역 크기로 draft 디코딩 (비율 유지)
+            with Image.open(path) as original:
+                original_size = original.size
+            image = make_thumbnail(path, max(display_width, display_height))
             image.thumbnail((display_width, display_height), Image.Resampling.LANCZOS)
             
             photo = ImageTk.PhotoImage(image)
             self.preview_label.config(image=photo, text="")
             self.preview_label.image = photo 
+            self._preview_key = preview_key
             
             stat = os.stat(path)
             info_text = (f"파일명: {os.path.basename(path)}\n"
                         f"경로: {os.path.dirname(path)}\n"
-                        f"크기: {image.size[0]}x{image.size[1]} ({stat.st_size/1024:.1f} KB)")
+                        f"크기: {original_size[0]}x{original_size[1]} ({stat.st_size/1024:.1f} KB)")
             self.info_label.config(text=info_text)
             
         except Exception as e:
+            self._preview_key = None
             self.preview_label.config(image='', text="이미지를 불러올 수 없습니다.")
             self.info_label.config(text=f"오류: {e}")
 
@@ -493,6 +652,7 @@ class DuplicateFinderGUI:
                 self.tree.delete(selected)
                 self.selected_file_path = None
                 self.preview_label.config(image='', text="삭제됨")
+                self._preview_key = None
                 self.info_label.config(text="")
             except Exception as e:
                 messagebox.showerror("오류", f"삭제 실패: {e}")
@@ -519,9 +679,200 @@ class DuplicateFinderGUI:
                 self.tree.delete(selected)
                 self.selected_file_path = None
                 self.preview_label.config(image='', text="이동됨")
+                self._preview_key = None
             except Exception as e:
                 messagebox.showerror("오류", f"이동 실패: {e}")
 
+    # =========================================================================
+    # 일괄 정리
+    # =========================================================================
+
+    @staticmethod
+    def _key_for_label(mapping, label):
+        for key, text in mapping.items():
+            if text == label:
+                return key
+        return next(iter(mapping))
+
+    def export_manifest(self):
+        """표시된 그룹의 파일을 매니페스트로 저장 (항목마다 group 번호와 중복 종류 기록)"""
+        if not self._shown_groups or not self.search_folder:
+            messagebox.showwarning("경고", "먼저 중복 검색을 실행해주세요.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="매니페스트 저장", defaultextension=MANIFEST_EXT, filetypes=MANIFEST_FILETYPES,
+            initialfile=f"duplicates{MANIFEST_EXT}")
+        if not path:
+            return
+        try:
+            with ManifestWriter(path, "duplicates", self.search_folder) as writer:
+                for group_no, (_, group_type, items) in enumerate(self._shown_groups, 1):
+                    for item in items:
+                        if os.path.exists(item.path):
+                            writer.write(item.path, group=group_no, match=group_type)
+        except Exception as e:
+            print(f"매니페스트 저장 실패: {e}")
+            messagebox.showerror("오류", f"매니페스트 저장 실패:\n{e}")
+            return
+        messagebox.showinfo("완료", f"{writer.count}개 파일을 매니페스트로 저장했습니다.\n{path}")
+
+    def _build_plan(self, exact_only=False):
+        """표시된 그룹으로 보존/정리 계획 생성. 조건이 맞지 않으면 경고 후 None"""
+        if not self._shown_groups or not self.search_folder:
+            messagebox.showwarning("경고", "먼저 중복 검색을 실행해주세요.")
+            return None
+        
+        policy = self._key_for_label(KEEPER_POLICIES, self.resolve_policy.get())
+        preferred = self.preferred_folder.get().strip() or None
+        if policy == 'preferred_folder' and not preferred:
+            messagebox.showwarning("경고", "선호 폴더를 선택해주세요.")
+            return None
+        
+        # 완전 중복(MD5) 그룹부터 계획에 반영, 개별 삭제/이동으로 사라진 파일은 제외
+        ordered = sorted(self._shown_groups, key=lambda g: -1 if g[0] in (None, 'md5') else g[0])
+        if exact_only:
+            ordered = [g for g in ordered if g[1] == 'exact']
+            if not ordered:
+                messagebox.showinfo("알림", "완전 중복(MD5) 그룹이 없습니다.\n'완전 중복 (MD5 해시)'만 선택하거나 범위 검색으로 다시 검색해주세요.")
+                return None
+        groups = [[it for it in items if os.path.exists(it.path)] for _, _, items in ordered]
+        plan = plan_resolution(groups, policy, preferred)
+        if not any(losers for _, losers in plan):
+            messagebox.showinfo("알림", "정리할 파일이 없습니다.")
+            return None
+        return plan, policy
+
+    def _set_cleanup_running(self):
+        self._cleanup_running = True
+        self.btn_search.config(state=tk.DISABLED)
+        self.btn_resolve.config(state=tk.DISABLED)
+        self.btn_link.config(state=tk.DISABLED)
+        self.btn_stop.config(state=tk.NORMAL, text="정리 중지")
+
+    def start_bulk_resolve(self):
+        action = self._key_for_label(RESOLVE_ACTIONS, self.resolve_action.get())
+        dest = self.resolve_dest_folder.get().strip() or None
+        if action == 'move' and not dest:
+            messagebox.showwarning("경고", "이동할 폴더를 선택해주세요.")
+            return
+        
+        built = self._build_plan()
+        if not built:
+            return
+        plan, policy = built
+        loser_count = sum(len(losers) for _, losers in plan)
+        
+        msg = (f"{len(plan)}개 그룹에서 {loser_count}개 파일을 '{RESOLVE_ACTIONS[action]}' 처리합니다.\n"
+               f"보존 기준: {KEEPER_POLICIES[policy]}")
+        if action == 'delete':
+            msg += "\n\n삭제는 실행 취소할 수 없습니다."
+        if not messagebox.askyesno("일괄 정리 확인", msg):
+            return
+        
+        self._set_cleanup_running()
+        thread = threading.Thread(target=self.run_bulk_resolve, args=(plan, action, dest))
+        thread.daemon = True
+        thread.start()
+
+    def run_bulk_resolve(self, plan, action, dest):
+        try:
+            max_workers = self.core_var.get() if self.core_var else None
+            success, fail, logs, done_paths = self.resolver.execute(
+                plan, action, self.search_folder,
+                dest_folder=dest,
+                include_caption=self.resolve_include_txt.get(),
+                max_workers=max_workers,
+                progress_callback=self.update_progress
+            )
+            self.parent.after(0, self.bulk_resolve_complete, success, fail, logs, done_paths)
+        except Exception as e:
+            print(f"Error: {e}")
+            self.parent.after(0, self.reset_ui)
+
+    def bulk_resolve_complete(self, success, fail, logs, done_paths):
+        self.reset_ui()
+        self._remove_paths_from_tree(set(done_paths))
+        self.progress_var.set(logs[0] if logs else "일괄 정리 완료")
+        
+        detail = "\n".join(logs[:20])
+        if len(logs) > 20:
+            detail += f"\n... 외 {len(logs) - 20}건"
+        if fail:
+            messagebox.showwarning("일괄 정리 완료", detail)
+        else:
+            messagebox.showinfo("일괄 정리 완료", detail)
+
+    def start_link_consolidation(self):
+        built = self._build_plan(exact_only=True)
+        if not built:
+            return
+        plan, policy = built
+        mode = self._key_for_label(LINK_MODES, self.link_mode.get())
+        link_count = sum(len(losers) for _, losers in plan)
+        
+        msg = (f"{len(plan)}개 완전 중복 그룹에서 {link_count}개 파일을 원본에 대한 "
+               f"'{LINK_MODES[mode]}'(으)로 교체합니다.\n"
+               f"원본 기준: {KEEPER_POLICIES[policy]}\n\n"
+               "폴더 구조와 파일명은 유지되며, 교체 전 내용이 같은지 다시 확인합니다.\n"
+               "하드링크된 파일은 한쪽을 수정하면 다른 쪽도 함께 바뀝니다.")
+        if not messagebox.askyesno("링크 통합 확인", msg):
+            return
+        
+        self._set_cleanup_running()
+        thread = threading.Thread(target=self.run_link_consolidation, args=(plan, mode))
+        thread.daemon = True
+        thread.start()
+
+    def run_link_consolidation(self, plan, mode):
+        try:
+            max_workers = self.core_var.get() if self.core_var else None
+            success, fail, logs, _ = self.resolver.consolidate(
+                plan, self.search_folder, mode=mode,
+                max_workers=max_workers,
+                progress_callback=self.update_progress
+            )
+            # 링크된 파일은 제자리에 남으므로 트리는 그대로 둠
+            self.parent.after(0, self.bulk_resolve_complete, success, fail, logs, [])
+        except Exception as e:
+            print(f"Error: {e}")
+            self.parent.after(0, self.reset_ui)
+
+    def _remove_paths_from_tree(self, paths):
+        """처리된 파일 행을 트리와 일괄 정리 목록에서 제거"""
+        if not paths:
+            return
+        def walk(node):
+            for child in self.tree.get_children(node):
+                values = self.tree.item(child)['values']
+                if values and len(values) > 3 and values[3] in paths:
+                    self.tree.delete(child)
+                else:
+                    walk(child)
+        walk("")
+        self._shown_groups = [(section, group_type, [it for it in items if it.path not in paths])
+                              for section, group_type, items in self._shown_groups]
+        if self.selected_file_path in paths:
+            self.selected_file_path = None
+            self.preview_label.config(image='', text="정리됨")
+            self._preview_key = None
+            self.info_label.config(text="")
+
+    def undo_bulk_resolve(self):
+        folder = self.search_folder or (self.independent_folder_path.get() if self.use_independent_path.get()
+                                        else self.folder_path_var.get())
+        if not folder:
+            messagebox.showwarning("경고", "작업 폴더가 없습니다.")
+            return
+        if not messagebox.askyesno("확인", "마지막 일괄 정리를 취소하시겠습니까?"):
+            return
+        
+        success, fail, logs = DuplicateResolver.undo_last_resolution(folder)
+        if success == 0 and fail == 0:
+            messagebox.showinfo("알림", logs[0] if logs else "실행 취소할 내역이 없습니다.")
+            return
+        detail = "\n".join(logs[:20])
+        messagebox.showinfo("실행 취소 완료", f"복구 성공: {success}개, 실패: {fail}개\n{detail}")
+
     def open_folder(self):
         if self.selected_file_path:
             try:
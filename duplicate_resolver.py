@@ -0,0 +1,504 @@
+"""
+중복 정리 모듈 - 그룹별 보존 파일(keeper) 선택 규칙과 나머지 파일 일괄 처리
+"""
+import os
+import json
+import shutil
+import threading
+import concurrent.futures
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Callable, Iterable
+from duplicate_finder import QUARANTINE_DIR_NAME
+from link_utils import LINK_MODES, files_identical, is_same_file, link_replace
+
+# 실행 취소 파일 저장 경로
+UNDO_DIR = Path("logs/undo")
+
+# 보존 파일 선택 규칙 (key -> UI 표시명)
+KEEPER_POLICIES = {
+    'largest_resolution': "해상도가 가장 큰 파일",
+    'largest_file': "용량이 가장 큰 파일",
+    'smallest_file': "용량이 가장 작은 파일",
+    'has_caption': "캡션(.txt)이 있는 파일",
+    'newest': "가장 최근 수정된 파일",
+    'preferred_folder': "선호 폴더에 있는 파일",
+}
+
+# 나머지 파일 처리 방식 (key -> UI 표시명)
+RESOLVE_ACTIONS = {
+    'delete': "삭제",
+    'move': "지정 폴더로 이동",
+    'quarantine': "격리 폴더로 이동",
+}
+
+
+def _caption_path(image_path: str) -> str:
+    return os.path.splitext(image_path)[0] + '.txt'
+
+
+def _is_under(path: str, folder: str) -> bool:
+    try:
+        return os.path.commonpath([os.path.abspath(path), os.path.abspath(folder)]) == os.path.abspath(folder)
+    except ValueError:
+        # 드라이브가 다른 경우 (Windows)
+        return False
+
+
+def _policy_key(item, policy: str, preferred_folder: Optional[str]):
+    """규칙별 1차 정렬 키. 값이 클수록 보존 우선"""
+    if policy == 'largest_file':
+        return item.size
+    if policy == 'smallest_file':
+        return -item.size
+    if policy == 'has_caption':
+        return 1 if os.path.exists(_caption_path(item.path)) else 0
+    if policy == 'newest':
+        try:
+            return os.path.getmtime(item.path)
+        except OSError:
+            return 0.0
+    if policy == 'preferred_folder':
+        return 1 if preferred_folder and _is_under(item.path, preferred_folder) else 0
+    # largest_resolution (기본)
+    return item.resolution[0] * item.resolution[1]
+
+
+def choose_keeper(items: List, policy: str, preferred_folder: Optional[str] = None) -> int:
+    """
+    그룹에서 보존할 파일의 인덱스 반환.
+    1차: 규칙 키, 2차: 해상도(면적), 3차: 용량, 그래도 같으면 목록 앞쪽 파일.
+    """
+    def sort_key(idx):
+        item = items[idx]
+        area = item.resolution[0] * item.resolution[1]
+        return (_policy_key(item, policy, preferred_folder), area, item.size, -idx)
+
+    return max(range(len(items)), key=sort_key)
+
+
+def plan_resolution(groups: Iterable[List], policy: str,
+                    preferred_folder: Optional[str] = None) -> List[Tuple[object, List]]:
+    """
+    그룹 목록에서 (keeper, [정리 대상, ...]) 계획을 만든다.
+    범위 검색처럼 같은 파일이 여러 그룹에 나올 수 있으므로,
+    한 번 보존으로 정해진 파일은 다른 그룹에서도 정리하지 않고
+    이미 정리 대상인 파일은 이후 그룹의 keeper 후보에서 제외한다.
+    """
+    keepers = set()
+    losers = set()
+    plan = []
+
+    for items in groups:
+        candidates = []
+        seen = set()
+        for item in items:
+            if item.path in losers or item.path in seen:
+                continue
+            seen.add(item.path)
+            candidates.append(item)
+        if len(candidates) < 2:
+            continue
+
+        keep = candidates[choose_keeper(candidates, policy, preferred_folder)]
+        keepers.add(keep.path)
+        group_losers = [it for it in candidates if it is not keep and it.path not in keepers]
+        if not group_losers:
+            continue
+        for it in group_losers:
+            losers.add(it.path)
+        plan.append((keep, group_losers))
+
+    return plan
+
+
+def _assign_destinations(paths: List[str], action: str, root_folder: str,
+                         dest_folder: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    병렬 실행 전에 이미지별 목적지를 미리 확정한다 (스레드 간 이름 충돌 방지).
+    move: 지정 폴더에 평탄하게, 이름이 겹치면 _{n} 접미사
+    quarantine: 격리 폴더 아래에 검색 루트 기준 상대 경로 유지
+    delete: None
+    """
+    if action == 'delete':
+        return {p: None for p in paths}
+
+    reserved = set()
+    result = {}
+
+    if action == 'quarantine':
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(root_folder, QUARANTINE_DIR_NAME, timestamp)
+        for p in paths:
+            try:
+                rel = os.path.relpath(p, root_folder)
+            except ValueError:
+                rel = os.path.basename(p)
+            if rel.startswith('..'):
+                rel = os.path.basename(p)
+            result[p] = os.path.join(base, rel)
+        return result
+
+    for p in paths:
+        name = os.path.basename(p)
+        stem, ext = os.path.splitext(name)
+        candidate = os.path.join(dest_folder, name)
+        counter = 1
+        # 캡션도 같은 이름으로 옮겨지므로 .txt 이름까지 함께 비어 있어야 함
+        while (candidate.lower() in reserved or os.path.exists(candidate)
+               or os.path.exists(_caption_path(candidate))):
+            candidate = os.path.join(dest_folder, f"{stem}_{counter}{ext}")
+            counter += 1
+        reserved.add(candidate.lower())
+        result[p] = candidate
+    return result
+
+
+def _resolve_one(src: str, dst: Optional[str], include_caption: bool) -> Dict:
+    """
+    이미지 1개(+캡션) 처리. 실행 취소 기록용 항목 반환.
+    이미지 처리가 실패하면 예외, 이미지는 처리됐는데 캡션만 실패하면 record["error"]에 사유를 담아 반환
+    (이미 옮긴 이미지도 실행 취소 기록에 남아야 하므로)
+    """
+    record = {"image": [src, dst], "caption": None}
+    txt_src = _caption_path(src)
+    has_txt = include_caption and os.path.exists(txt_src)
+
+    if dst is None:
+        os.remove(src)
+    else:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.move(src, dst)
+
+    if has_txt:
+        txt_dst = _caption_path(dst) if dst is not None else None
+        try:
+            if txt_dst is None:
+                os.remove(txt_src)
+            else:
+                shutil.move(txt_src, txt_dst)
+            record["caption"] = [txt_src, txt_dst]
+        except Exception as e:
+            record["error"] = f"캡션 처리 실패: {e}"
+    return record
+
+
+def _break_link(path: str):
+    """하드링크를 같은 내용의 독립 파일로 교체 (임시 사본 → os.replace)"""
+    if os.stat(path).st_nlink <= 1:
+        return # 리플링크이거나 이미 분리됨
+    folder, name = os.path.split(path)
+    tmp_path = os.path.join(folder, f".{name}.unlinktmp")
+    shutil.copy2(path, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class _UndoJournal:
+    """
+    중복 정리 실행 취소 기록 (logs/undo/undo_dedup_<시각>.jsonl).
+    첫 줄은 헤더 {"type", "action", "folder_path", "timestamp"}, 이후 처리가 끝난 항목을 한 줄씩 바로 추가(flush)하므로
+    실행 도중 프로그램이 종료돼도 그때까지 옮긴 파일은 복구할 수 있다. 첫 항목을 기록할 때 파일을 만든다.
+    """
+    def __init__(self, folder_path: str, action: str):
+        self.folder_path = str(Path(folder_path).absolute())
+        self.action = action
+        self.path: Optional[Path] = None
+        self._file = None
+        self._failed = False
+
+    def append(self, record: Dict):
+        if self._failed:
+            return
+        try:
+            if self._file is None:
+                self._open()
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write('\n')
+            self._file.flush()
+        except Exception as e:
+            self._failed = True
+            print(f"중복 정리 실행 취소 파일 저장 실패: {e}")
+
+    def _open(self):
+        UNDO_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = UNDO_DIR / f"undo_dedup_{timestamp}.jsonl"
+        self._file = open(self.path, 'w', encoding='utf-8')
+        header = {
+            "type": "dedup",
+            "action": self.action,
+            "folder_path": self.folder_path,
+            "timestamp": datetime.now().isoformat(),
+        }
+        self._file.write(json.dumps(header, ensure_ascii=False))
+        self._file.write('\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _read_undo_file(path: Path) -> Dict:
+    """실행 취소 기록 → {"action", "folder_path", "history", ...}. 이전 형식(.json 한 덩어리)도 읽음"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == '.json':
+            return json.load(f)
+        data = json.loads(f.readline())
+        history = []
+        for line in f:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                break # 기록 도중 종료되어 잘린 마지막 줄
+        data["history"] = history
+        return data
+
+
+class DuplicateResolver:
+    def __init__(self):
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def execute(self, plan: List[Tuple[object, List]], action: str, root_folder: str,
+                dest_folder: Optional[str] = None, include_caption: bool = True,
+                max_workers: Optional[int] = None,
+                progress_callback: Optional[Callable[[int, int, str], None]] = None
+                ) -> Tuple[int, int, List[str], List[str]]:
+        """
+        계획의 정리 대상 파일에 action을 병렬 적용.
+        반환: (성공 수, 실패 수, 로그, 처리된 이미지 경로 목록)
+        """
+        self.stop_event.clear()
+        if action not in RESOLVE_ACTIONS:
+            return 0, 0, [f"알 수 없는 처리 방식: {action}"], []
+        if action == 'move' and not dest_folder:
+            return 0, 0, ["이동할 폴더가 지정되지 않았습니다."], []
+
+        paths = [item.path for _, group_losers in plan for item in group_losers]
+        total = len(paths)
+        if total == 0:
+            return 0, 0, ["정리할 파일이 없습니다."], []
+
+        destinations = _assign_destinations(paths, action, root_folder, dest_folder)
+        # 파일 I/O 위주이므로 스레드 사용 (CPU 코어 수보다 넉넉하게)
+        workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) * 2)
+        # 대량 그룹에서도 Future가 한꺼번에 쌓이지 않고 중지 요청이 바로 반영되도록 묶음 단위로 제출
+        max_pending = max(workers * 4, 16)
+
+        success = 0
+        fail = 0
+        logs = []
+        done_paths = []
+
+        with _UndoJournal(root_folder, action) as journal, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            path_iter = iter(paths)
+            count = 0
+            while True:
+                while len(pending) < max_pending and not self.stop_event.is_set():
+                    p = next(path_iter, None)
+                    if p is None:
+                        break
+                    pending[executor.submit(self._guarded_resolve, p, destinations[p], include_caption)] = p
+                if not pending:
+                    break
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    src = pending.pop(future)
+                    count += 1
+                    if progress_callback and (count % 50 == 0 or count == total):
+                        progress_callback(count, total, f"중복 정리 중... ({count}/{total})")
+                    try:
+                        record = future.result()
+                        if record is None:
+                            continue # 중지 요청으로 건너뜀
+                        error = record.pop("error", None)
+                        journal.append(record)
+                        done_paths.append(src)
+                        if error:
+                            # 이미지는 처리됨 (실행 취소 기록 유지), 캡션만 원래 자리에 남음
+                            logs.append(f"[일부 실패] {os.path.basename(src)}: {error}")
+                            fail += 1
+                        else:
+                            success += 1
+                    except Exception as e:
+                        logs.append(f"[실패] {os.path.basename(src)}: {e}")
+                        fail += 1
+
+        if self.stop_event.is_set():
+            logs.append(f"중지됨: {success}개 처리 후 나머지는 건너뜀")
+
+        label = RESOLVE_ACTIONS[action]
+        logs.insert(0, f"{label}: 성공 {success}개, 실패 {fail}개 (그룹 {len(plan)}개)")
+        return success, fail, logs, done_paths
+
+    def consolidate(self, plan: List[Tuple[object, List]], root_folder: str, mode: str = 'auto',
+                    max_workers: Optional[int] = None,
+                    progress_callback: Optional[Callable[[int, int, str], None]] = None
+                    ) -> Tuple[int, int, List[str], List[str]]:
+        """
+        완전 중복 그룹의 나머지 파일을 keeper(원본)에 대한 하드링크/리플링크로 교체.
+        폴더 구조와 파일명은 그대로 두고 디스크 공간만 회수한다.
+        링크 전 바이트 단위로 동일한지 다시 확인하며, 캡션(.txt)은 건드리지 않는다.
+        반환: (성공 수, 실패 수, 로그, 링크된 이미지 경로 목록)
+        """
+        self.stop_event.clear()
+        if mode not in LINK_MODES:
+            return 0, 0, [f"알 수 없는 링크 방식: {mode}"], []
+
+        tasks = [(keep.path, item.path) for keep, group_losers in plan for item in group_losers]
+        total = len(tasks)
+        if total == 0:
+            return 0, 0, ["링크할 파일이 없습니다."], []
+
+        workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) * 2)
+        # 대량 그룹에서도 Future가 한꺼번에 쌓이지 않도록 묶음 단위로 제출
+        max_pending = max(workers * 4, 16)
+
+        success = 0
+        fail = 0
+        skipped = 0
+        reclaimed = 0
+        logs = []
+        done_paths = []
+
+        with _UndoJournal(root_folder, 'link') as journal, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            task_iter = iter(tasks)
+            count = 0
+            while True:
+                while len(pending) < max_pending and not self.stop_event.is_set():
+                    task = next(task_iter, None)
+                    if task is None:
+                        break
+                    pending[executor.submit(self._link_one, task[0], task[1], mode)] = task
+                if not pending:
+                    break
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    canonical, target = pending.pop(future)
+                    count += 1
+                    try:
+                        used, size = future.result()
+                        if used is None:
+                            skipped += 1
+                            continue
+                        journal.append({"image": [target, canonical], "caption": None, "link": used})
+                        done_paths.append(target)
+                        reclaimed += size
+                        success += 1
+                    except Exception as e:
+                        logs.append(f"[실패] {os.path.basename(target)}: {e}")
+                        fail += 1
+                if progress_callback:
+                    progress_callback(count, total, f"링크로 교체 중... ({count}/{total})")
+
+        if self.stop_event.is_set():
+            logs.append(f"중지됨: {success}개 처리 후 나머지는 건너뜀")
+
+        logs.insert(0, f"링크로 교체: 성공 {success}개, 실패 {fail}개, 건너뜀 {skipped}개 "
+                       f"(회수 용량 {reclaimed / (1024 * 1024):.1f} MB)")
+        return success, fail, logs, done_paths
+
+    @staticmethod
+    def _link_one(canonical: str, target: str, mode: str) -> Tuple[Optional[str], int]:
+        """반환: (사용된 링크 방식 | 이미 링크됨이면 None, 회수 용량)"""
+        if is_same_file(canonical, target):
+            return None, 0
+        if not files_identical(canonical, target):
+            raise ValueError("원본과 내용이 다릅니다 (바이트 비교 불일치)")
+        size = os.path.getsize(target)
+        return link_replace(canonical, target, mode), size
+
+    def _guarded_resolve(self, src: str, dst: Optional[str], include_caption: bool) -> Optional[Dict]:
+        if self.stop_event.is_set():
+            return None
+        return _resolve_one(src, dst, include_caption)
+
+    @staticmethod
+    def undo_last_resolution(folder_path: str) -> Tuple[int, int, List[str]]:
+        """
+        마지막 중복 정리 실행 취소 (이동/격리 복구, 링크는 독립 사본으로 분리)
+        """
+        if not UNDO_DIR.exists():
+            return 0, 0, ["실행 취소 폴더가 없습니다."]
+
+        files = sorted(UNDO_DIR.glob("undo_dedup_*.json*"), reverse=True)
+        current_path = Path(folder_path).absolute()
+
+        target_file = None
+        data = None
+        for file_path in files:
+            try:
+                candidate = _read_undo_file(file_path)
+                if Path(candidate.get("folder_path", "")) == current_path:
+                    target_file, data = file_path, candidate
+                    break
+            except Exception:
+                continue
+
+        if not target_file:
+            return 0, 0, ["실행 취소할 중복 정리 내역이 없습니다."]
+
+        if data.get("action") == 'delete':
+            return 0, 0, ["마지막 중복 정리는 삭제 작업이라 복구할 수 없습니다."]
+
+        success = 0
+        fail = 0
+        logs = []
+
+        history = data.get("history", [])
+        if data.get("action") == 'link':
+            for record in history:
+                path = record["image"][0]
+                try:
+                    _break_link(path)
+                    success += 1
+                except Exception as e:
+                    logs.append(f"링크 분리 실패 {os.path.basename(path)}: {e}")
+                    fail += 1
+        else:
+            for record in reversed(history):
+                pairs = [record["image"]]
+                if record.get("caption"):
+                    pairs.append(record["caption"])
+                for src, dst in pairs:
+                    try:
+                        if not dst or not os.path.exists(dst):
+                            raise FileNotFoundError(dst)
+                        if os.path.exists(src):
+                            raise FileExistsError(src)
+                        os.makedirs(os.path.dirname(src), exist_ok=True)
+                        shutil.move(dst, src)
+                        success += 1
+                        if data.get("action") == 'quarantine':
+                            # 비어버린 격리 하위 폴더 정리
+                            try:
+                                os.removedirs(os.path.dirname(dst))
+                            except OSError:
+                                pass
+                    except Exception as e:
+                        logs.append(f"복구 실패 {os.path.basename(src)}: {e}")
+                        fail += 1
+
+        try:
+            target_file.unlink()
+            logs.append(f"실행 취소 파일 삭제됨: {target_file.name}")
+        except Exception as e:
+            logs.append(f"실행 취소 파일 삭제 실패: {e}")
+
+        return success, fail, logs
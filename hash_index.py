@@ -0,0 +1,215 @@
+"""
+이미지 해시 색인 모듈 - 파일별 dHash(64비트)를 디스크에 보관하고 이미지 mtime 기준으로 증분 갱신
+"""
+import os
+import pickle
+import hashlib
+import threading
+import concurrent.futures
+from array import array
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+
+from search_index import CACHE_DIR
+from duplicate_finder import compute_dhash_worker
+
+# 저장 형식 버전 (구조가 바뀌면 올려서 기존 색인을 버리고 다시 생성)
+INDEX_VERSION = 1
+
+# 삭제된 항목 비율이 이 값을 넘으면 저장 시 id를 다시 매겨 압축
+COMPACT_RATIO = 0.3
+
+# 유사 이미지 검색 기본 최대 거리 (64비트 중 다른 비트 수)
+DEFAULT_MAX_DISTANCE = 10
+
+
+def hash_image(path: str) -> Optional[int]:
+    """이미지 하나의 dHash (중복 찾기 탭과 같은 계산). 읽기 실패 시 None"""
+    return compute_dhash_worker(path)[1]
+
+
+class HashIndex:
+    """
+    데이터셋 폴더 하나에 대한 dHash 컬럼 (cache/dhash_index_<폴더 해시>.pkl).
+
+      keys    - id -> 폴더 기준 상대 경로 (삭제된 항목은 None)
+      mtimes  - array('d') 이미지 수정 시각 (증분 갱신 판단용)
+      hashes  - array('Q') dHash
+      valid   - bytearray 1이면 hashes 값이 유효 (0: 읽기 실패/삭제)
+    유사 이미지 검색은 컬럼 전체에 대해 XOR + popcount로 Hamming 거리를 계산한다.
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.keys: List[Optional[str]] = []
+        self.mtimes = array('d')
+        self.hashes = array('Q')
+        self.valid = bytearray()
+        self.ids: Dict[str, int] = {}
+        self.dirty = False
+
+    # ------------------------------------------------------------------
+    # 저장 / 불러오기
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def index_path(root: str) -> Path:
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+        return CACHE_DIR / f"dhash_index_{digest}.pkl"
+
+    @classmethod
+    def load(cls, root: str) -> "HashIndex":
+        """저장된 색인을 불러옴. 없거나 손상/버전 불일치면 빈 색인 반환"""
+        index = cls(root)
+        path = cls.index_path(root)
+        if not path.exists():
+            return index
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != INDEX_VERSION or data.get('root') != index.root:
+                return index
+            index.keys = data['keys']
+            index.mtimes = data['mtimes']
+            index.hashes = data['hashes']
+            index.valid = data['valid']
+        except Exception as e:
+            print(f"해시 색인 불러오기 실패 (새로 생성): {e}")
+            return cls(root)
+        index.ids = {key: i for i, key in enumerate(index.keys) if key is not None}
+        return index
+
+    def save(self):
+        """변경된 경우에만 저장 (임시 파일 → os.replace)"""
+        if not self.dirty:
+            return
+        dead = len(self.keys) - len(self.ids)
+        if self.keys and dead / len(self.keys) > COMPACT_RATIO:
+            self._compact()
+
+        path = self.index_path(self.root)
+        data = {
+            'version': INDEX_VERSION,
+            'root': self.root,
+            'keys': self.keys,
+            'mtimes': self.mtimes,
+            'hashes': self.hashes,
+            'valid': self.valid,
+        }
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self.dirty = False
+        except Exception as e:
+            print(f"해시 색인 저장 실패: {e}")
+
+    def _compact(self):
+        """삭제된 항목을 제거하고 id를 0부터 다시 매김"""
+        live = [i for i, key in enumerate(self.keys) if key is not None]
+        self.keys = [self.keys[i] for i in live]
+        self.mtimes = array('d', (self.mtimes[i] for i in live))
+        self.hashes = array('Q', (self.hashes[i] for i in live))
+        self.valid = bytearray(self.valid[i] for i in live)
+        self.ids = {key: i for i, key in enumerate(self.keys)}
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+
+    def key_for(self, path: str) -> str:
+        """절대 경로 → 색인 키 (폴더 기준 상대 경로)"""
+        prefix = self.root + os.sep
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        return os.path.relpath(path, self.root)
+
+    def path_for(self, file_id: int) -> str:
+        return os.path.join(self.root, self.keys[file_id])
+
+    def refresh(self, images: Iterable[Tuple[str, float]], recursive: bool = True,
+                num_cores: int = 1,
+                progress_callback: Optional[Callable[[int, int], None]] = None,
+                stop_event: Optional[threading.Event] = None) -> int:
+        """
+        스캔된 이미지 목록 [(절대 경로, mtime), ...]과 색인을 비교해
+        새로 생겼거나 mtime이 바뀐 이미지만 dHash를 다시 계산하고, 사라진 이미지는 제거.
+        recursive=False 스캔에서는 최상위 폴더의 이미지만 제거 대상으로 본다.
+        해시 계산은 비싸므로 중지해도 그때까지 계산한 값은 반영한다 (save()로 저장 가능).
+        반환: 다시 계산한 이미지 수 (중지 시 -1)
+        """
+        seen = set()
+        changed: List[Tuple[str, float]] = []
+        for path, mtime in images:
+            key = self.key_for(path)
+            seen.add(key)
+            file_id = self.ids.get(key)
+            if file_id is None or self.mtimes[file_id] != mtime:
+                changed.append((key, mtime))
+
+        for key in [k for k in self.ids if k not in seen and (recursive or os.sep not in k)]:
+            file_id = self.ids.pop(key)
+            self.keys[file_id] = None
+            self.valid[file_id] = 0
+            self.dirty = True
+
+        total = len(changed)
+        if not total:
+            return 0
+
+        paths = [os.path.join(self.root, key) for key, _ in changed]
+        if num_cores > 1 and total > 1:
+            ex = concurrent.futures.ThreadPoolExecutor(max_workers=num_cores)
+            results = ex.map(hash_image, paths, chunksize=16)
+        else:
+            ex = None
+            results = map(hash_image, paths)
+        try:
+            for done, ((key, mtime), value) in enumerate(zip(changed, results), 1):
+                self._store(key, mtime, value)
+                if progress_callback and (done % 200 == 0 or done == total):
+                    progress_callback(done, total)
+                if stop_event and stop_event.is_set():
+                    return -1
+        finally:
+            if ex is not None:
+                ex.shutdown(wait=False, cancel_futures=True)
+        return total
+
+    def _store(self, key: str, mtime: float, value: Optional[int]):
+        file_id = self.ids.get(key)
+        if file_id is None:
+            file_id = len(self.keys)
+            self.keys.append(key)
+            self.mtimes.append(mtime)
+            self.hashes.append(value or 0)
+            self.valid.append(1 if value is not None else 0)
+            self.ids[key] = file_id
+        else:
+            self.mtimes[file_id] = mtime
+            self.hashes[file_id] = value or 0
+            self.valid[file_id] = 1 if value is not None else 0
+        self.dirty = True
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def hash_of(self, path: str) -> Optional[int]:
+        """색인에 있는 이미지면 저장된 해시, 아니면 새로 계산"""
+        file_id = self.ids.get(self.key_for(os.path.abspath(path)))
+        if file_id is not None and self.valid[file_id]:
+            return self.hashes[file_id]
+        return hash_image(path)
+
+    def nearest(self, query_hash: int, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Hamming 거리가 max_distance 이하인 항목을 [(거리, id), ...] 거리 순으로 반환.
+        컬럼 전체를 한 번 훑는 선형 스캔 (항목당 XOR 1회 + bit_count 1회).
+        """
+        hashes, valid = self.hashes, self.valid
+        hits = [(d, i) for i, d in enumerate((h ^ query_hash).bit_count() for h in hashes)
+                if d <= max_distance and valid[i]]
+        hits.sort()
+        return hits
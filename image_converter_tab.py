@@ -10,6 +10,7 @@ import image_converter_engine as converter_engine
 from app_logger import logger, setup_gui_logging_handler
 from image_utils import RateLimiter
 from utils import ScrollableFrame
+from manifest import ManifestError, MANIFEST_FILETYPES, manifest_images, manifest_root
 
 class ImageConverterGUI:
     def __init__(self, parent, core_var=None, is_standalone=True):
@@ -149,6 +150,16 @@ class ImageConverterGUI:
         self.suffix_entry.pack(side=tk.LEFT, padx=5)
         ttk.Label(suffix_frame, text="(예: image_converted.png)").pack(side=tk.LEFT)
 
+        # --- 매니페스트 입력 (지정하면 입력 폴더를 스캔하지 않고 매니페스트의 이미지를 변환) ---
+        self.manifest_path_var = tk.StringVar()
+        ttk.Label(self.io_frame, text="매니페스트:").grid(row=5, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(self.io_frame, textvariable=self.manifest_path_var, width=40).grid(row=5, column=1, sticky=tk.EW, padx=5)
+        manifest_btns = ttk.Frame(self.io_frame)
+        manifest_btns.grid(row=5, column=2)
+        ttk.Button(manifest_btns, text="찾아보기", command=self.select_manifest).pack(side=tk.LEFT)
+        ttk.Button(manifest_btns, text="해제", width=4,
+                   command=lambda: self.manifest_path_var.set("")).pack(side=tk.LEFT, padx=(2, 0))
+
         self.io_frame.columnconfigure(1, weight=1)
 
         # 초기 상태 반영
@@ -281,6 +292,11 @@ class ImageConverterGUI:
         if folder:
             self.source_folder_var.set(folder)
 
+    def select_manifest(self):
+        path = filedialog.askopenfilename(filetypes=MANIFEST_FILETYPES)
+        if path:
+            self.manifest_path_var.set(path)
+
     def select_target_folder(self):
         folder = filedialog.askdirectory()
         if folder:
@@ -405,6 +421,15 @@ class ImageConverterGUI:
     def start_conversion(self):
         self.save_settings_from_gui()
 
+        manifest_path = self.manifest_path_var.get().strip()
+        if manifest_path and not self.settings['input_settings']['source_folder']:
+            # 매니페스트만 지정한 경우 입력 폴더 검사는 매니페스트 기준 폴더로 대신함
+            try:
+                self.settings['input_settings']['source_folder'] = manifest_root(manifest_path)
+            except ManifestError as e:
+                messagebox.showerror("매니페스트 오류", str(e))
+                return
+
         # output_to_input 모드면 validate용 target_folder를 source로 임시 대입
         if self.settings['output_settings'].get('output_to_input', False):
             self.settings['output_settings']['target_folder'] = self.settings['input_settings']['source_folder']
@@ -426,7 +451,15 @@ class ImageConverterGUI:
         logger.info(f"변환 대상 확장자: {', '.join(supported_formats)}")
         logger.info(f"사용 코어 수: {self.settings['processing_settings']['max_workers']}")
         
-        file_list = file_manager.scan_directory(source_folder, supported_formats)
+        if manifest_path:
+            try:
+                file_list = manifest_images(manifest_path, supported_formats)
+            except ManifestError as e:
+                messagebox.showerror("매니페스트 오류", str(e))
+                return
+            logger.info(f"매니페스트 입력: {manifest_path} ({len(file_list)}개)")
+        else:
+            file_list = file_manager.scan_directory(source_folder, supported_formats)
 
         if not file_list:
             messagebox.showinfo("정보", "선택된 폴더에서 변환할 파일을 찾을 수 없습니다.\n입력 필터 설정을 확인해주세요.")
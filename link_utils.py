@@ -0,0 +1,146 @@
+"""
+파일 링크 유틸리티 - 동일 파일을 하드링크/리플링크로 대체
+"""
+import os
+import sys
+import errno
+import shutil
+
+# 내용 비교 시 한 번에 읽을 크기
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl 번호 (_IOW(0x94, 9, int)): btrfs, xfs(reflink=1) 등에서 지원
+FICLONE = 0x40049409
+
+# 링크 방식 (key -> UI 표시명)
+LINK_MODES = {
+    'auto': "자동 (리플링크 우선, 불가 시 하드링크)",
+    'hardlink': "하드링크",
+    'reflink': "리플링크 (CoW 복제)",
+}
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # Windows
+
+_clonefile = None
+if sys.platform == 'darwin':
+    try:
+        import ctypes
+        _libc = ctypes.CDLL("libc.dylib", use_errno=True)
+        _clonefile = _libc.clonefile
+        _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+        _clonefile.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _clonefile = None
+
+
+def files_identical(path_a: str, path_b: str) -> bool:
+    """크기 비교 후 청크 단위로 바이트 단위 동일 여부 확인"""
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, 'rb') as fa, open(path_b, 'rb') as fb:
+        while True:
+            chunk_a = fa.read(COMPARE_CHUNK_SIZE)
+            chunk_b = fb.read(COMPARE_CHUNK_SIZE)
+            if chunk_a != chunk_b:
+                return False
+            if not chunk_a:
+                return True
+
+
+def is_same_file(path_a: str, path_b: str) -> bool:
+    """이미 같은 inode를 가리키는지 (하드링크 완료 상태)"""
+    try:
+        return os.path.samefile(path_a, path_b)
+    except OSError:
+        return False
+
+
+def reflink(src: str, dst: str):
+    """
+    src를 dst로 CoW 복제 (데이터 블록 공유, 이후 수정 시 분리).
+    지원하지 않는 파일시스템/OS에서는 OSError 발생. dst는 존재하지 않아야 함.
+    """
+    if _clonefile is not None:
+        if _clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), dst)
+        return
+
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, "이 운영체제에서는 리플링크를 지원하지 않습니다.", dst)
+
+    with open(src, 'rb') as fsrc:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, fsrc.fileno())
+        except OSError:
+            os.close(fd)
+            os.remove(dst)
+            raise
+        os.close(fd)
+    try:
+        shutil.copystat(src, dst)
+    except OSError:
+        pass
+
+
+def link_replace(canonical: str, target: str, mode: str = 'auto') -> str:
+    """
+    target을 canonical에 대한 링크로 교체.
+    같은 폴더의 임시 경로에 링크를 만든 뒤 os.replace로 원자적으로 바꿔치기하므로
+    실패해도 target 원본은 그대로 남는다.
+    반환: 실제 사용된 방식 ('hardlink' | 'reflink')
+    """
+    folder, name = os.path.split(target)
+    tmp_path = os.path.join(folder, f".{name}.linktmp")
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    used = None
+    if mode in ('auto', 'reflink'):
+        try:
+            reflink(canonical, tmp_path)
+            used = 'reflink'
+        except OSError:
+            if mode == 'reflink':
+                raise
+    if used is None:
+        os.link(canonical, tmp_path)
+        used = 'hardlink'
+
+    try:
+        os.replace(tmp_path, target)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return used
+
+
+def link_new(src: str, dst: str, mode: str = 'auto', same_device: bool = True) -> str:
+    """
+    dst(존재하지 않아야 함)에 src의 링크를 새로 만듦.
+    mode: 'reflink' | 'hardlink' | 'auto'(리플링크 우선, 불가 시 하드링크)
+    다른 장치이거나 파일시스템이 지원하지 않으면 일반 복사로 대체.
+    반환: 실제 사용된 방식 ('reflink' | 'hardlink' | 'copy')
+    """
+    if same_device:
+        if mode in ('auto', 'reflink'):
+            try:
+                reflink(src, dst)
+                return 'reflink'
+            except OSError:
+                pass
+        if mode in ('auto', 'hardlink'):
+            try:
+                os.link(src, dst)
+                return 'hardlink'
+            except OSError:
+                pass
+    shutil.copy2(src, dst)
+    return 'copy'
@@ -6,9 +6,13 @@ import multiprocessing
 import json
 
 from file_manager import FileManager
-from tag_processor import TagProcessor
+from tag_processor import TagProcessor, TagRuleSet
+from tag_rules import RuleFileError, RULE_FILETYPES, load_rule_file, rules_from_options, save_rule_file
+from tag_alias import TagAliasError, ALIAS_FILETYPES, load_tag_alias_map
 from rename_processor import RenameProcessor
 from utils import get_paired_files, ScrollableFrame
+from manifest import (ManifestError, MANIFEST_FILETYPES, read_header,
+                      manifest_pairs, manifest_root)
 
 from image_converter_tab import ImageConverterGUI
 from duplicate_finder_tab import DuplicateFinderGUI
@@ -35,6 +39,7 @@ class DatasetOrganizerGUI:
         
         self.folder_path = ""
         self.folder_path_var = tk.StringVar() # For linking with tabs
+        self.manifest_path = ""               # 이름 변경/태그 처리 대상 매니페스트 (비어 있으면 작업 폴더 스캔)
         self.num_cores = multiprocessing.cpu_count()
         
         # UI 변수 초기화 (설정 로드 전 기본값)
@@ -64,6 +69,15 @@ class DatasetOrganizerGUI:
         self.csv_add_pos = tk.StringVar(value="prefix")
         self.csv_input_text = tk.StringVar()
 
+        # 태그 별칭 / 함의 변수
+        self.use_tag_alias = tk.BooleanVar(value=False)
+        self.alias_file_path = tk.StringVar()
+        self.implication_file_path = tk.StringVar()
+
+        # 규칙 파일 (여러 단계를 파일마다 한 번에 적용)
+        self.use_tag_rule_file = tk.BooleanVar(value=False)
+        self.tag_rule_file_path = tk.StringVar()
+
         self.use_add = tk.BooleanVar(value=False)
         self.use_conditional_add = tk.BooleanVar(value=False) # 조건부 추가
         
@@ -100,6 +114,15 @@ class DatasetOrganizerGUI:
         core_spin = ttk.Spinbox(top_frame, from_=1, to=multiprocessing.cpu_count(), 
                                 textvariable=self.core_var, width=5)
         core_spin.pack(side=tk.LEFT)
+
+        # 매니페스트 - 지정하면 이름 변경/태그 처리가 폴더를 스캔하지 않고 매니페스트의 파일 쌍을 대상으로 함
+        manifest_frame = ttk.Frame(self.root, padding=(5, 0, 5, 0))
+        manifest_frame.pack(fill=tk.X)
+        ttk.Label(manifest_frame, text="매니페스트:").pack(side=tk.LEFT)
+        self.manifest_label = ttk.Label(manifest_frame, text="사용 안 함 (작업 폴더 스캔)", relief=tk.SUNKEN, width=50)
+        self.manifest_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(manifest_frame, text="불러오기", command=self.select_manifest).pack(side=tk.LEFT)
+        ttk.Button(manifest_frame, text="해제", command=self.clear_manifest).pack(side=tk.LEFT, padx=(5, 0))
         
         # 노트북 (탭)
         notebook = ttk.Notebook(self.root)
@@ -218,6 +241,14 @@ class DatasetOrganizerGUI:
         frame_top = ttk.Frame(container)
         frame_top.pack(anchor=tk.W, fill=tk.X, pady=(0, 5))
         ttk.Checkbutton(frame_top, text="하위 폴더 포함 검색", variable=self.tag_find_subdirs).pack(side=tk.LEFT)
+
+        # --- 규칙 파일: 사용 시 아래 옵션 대신 파일의 단계를 순서대로 적용 ---
+        group_rules = ttk.LabelFrame(container, text="규칙 파일 (사용 시 아래 옵션 대신 파일의 단계를 순서대로 한 번에 적용)", padding="5")
+        group_rules.pack(fill=tk.X, pady=(0, 5))
+        ttk.Checkbutton(group_rules, text="사용", variable=self.use_tag_rule_file).pack(side=tk.LEFT)
+        ttk.Entry(group_rules, textvariable=self.tag_rule_file_path, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(group_rules, text="파일 선택", command=self.select_tag_rule_file).pack(side=tk.LEFT)
+        ttk.Button(group_rules, text="현재 옵션을 규칙 파일로 저장", command=self.save_tag_rule_file).pack(side=tk.LEFT, padx=5)
         
         # --- 옵션 1: 인원수 태그 이동 & Solo 태그 이동 ---
         frame_person = ttk.Frame(container)
@@ -247,6 +278,23 @@ class DatasetOrganizerGUI:
         missing_count_cb['values'] = ("1", "2", "3", "4", "5", "6+")
         missing_count_cb.pack(side=tk.LEFT)
 
+        # --- 옵션 1.2: 태그 별칭 / 함의 (Danbooru 형식 CSV) ---
+        group_alias = ttk.LabelFrame(container, text="태그 별칭 / 함의 (별칭은 대표 태그로 치환, 함의 태그는 뒤에 추가)", padding="5")
+        group_alias.pack(fill=tk.X, pady=5)
+
+        frame_alias_file = ttk.Frame(group_alias)
+        frame_alias_file.pack(fill=tk.X, pady=2)
+        ttk.Checkbutton(frame_alias_file, text="사용", variable=self.use_tag_alias).pack(side=tk.LEFT)
+        ttk.Label(frame_alias_file, text="별칭 CSV:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Entry(frame_alias_file, textvariable=self.alias_file_path, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(frame_alias_file, text="파일 선택", command=lambda: self.select_alias_file(self.alias_file_path)).pack(side=tk.LEFT)
+
+        frame_impl_file = ttk.Frame(group_alias)
+        frame_impl_file.pack(fill=tk.X, pady=2)
+        ttk.Label(frame_impl_file, text="함의 CSV:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Entry(frame_impl_file, textvariable=self.implication_file_path, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(frame_impl_file, text="파일 선택", command=lambda: self.select_alias_file(self.implication_file_path)).pack(side=tk.LEFT)
+
         # --- 옵션 1.5: 태그 추가 (New) ---
         group_add = ttk.LabelFrame(container, text="태그 추가 (인원수/solo 뒤에 자동 삽입)", padding="5")
         group_add.pack(fill=tk.X, pady=5)
@@ -459,36 +507,83 @@ class DatasetOrganizerGUI:
             self.folder_path_var.set(folder)
             self.folder_label.config(text=folder)
 
+    def select_manifest(self):
+        path = filedialog.askopenfilename(filetypes=MANIFEST_FILETYPES)
+        if not path:
+            return
+        try:
+            header = read_header(path)
+        except ManifestError as e:
+            messagebox.showerror("오류", str(e))
+            return
+        self.manifest_path = path
+        self.manifest_label.config(text=f"{os.path.basename(path)}  ({header.get('source', '')})")
+
+    def clear_manifest(self):
+        self.manifest_path = ""
+        self.manifest_label.config(text="사용 안 함 (작업 폴더 스캔)")
+
+    def check_work_target(self):
+        """이름 변경/태그 처리 대상 확인 (매니페스트 또는 작업 폴더)"""
+        if self.manifest_path:
+            return True
+        return self.check_folder()
+
+    def get_work_root(self) -> str:
+        """실행 취소 기록 기준 폴더 (매니페스트 사용 시 매니페스트의 기준 폴더)"""
+        if self.manifest_path:
+            try:
+                return manifest_root(self.manifest_path)
+            except ManifestError as e:
+                messagebox.showerror("오류", str(e))
+                return ""
+        return self.folder_path
+
+    def get_work_pairs(self, recursive: bool = False):
+        """이미지-캡션 쌍 목록. 매니페스트가 있으면 폴더를 스캔하지 않고 매니페스트에서 읽음"""
+        if self.manifest_path:
+            try:
+                return manifest_pairs(self.manifest_path)
+            except ManifestError as e:
+                messagebox.showerror("오류", str(e))
+                return []
+        return get_paired_files(self.folder_path, recursive=recursive)
+
     def select_csv_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
         if file_path:
             self.csv_file_path.set(file_path)
 
-    def load_csv_tags(self) -> set:
-        """CSV 파일을 읽어 선택된 카테고리에 해당하는 태그 세트 반환"""
-        csv_path = self.csv_file_path.get()
-        if not csv_path or not os.path.exists(csv_path):
-            return set()
-            
-        category_id = self.csv_category.get().strip()
-        tags_set = set()
-        
-        import csv
+    def select_alias_file(self, target_var):
+        file_path = filedialog.askopenfilename(filetypes=ALIAS_FILETYPES)
+        if file_path:
+            target_var.set(file_path)
+
+    def select_tag_rule_file(self):
+        file_path = filedialog.askopenfilename(filetypes=RULE_FILETYPES)
+        if file_path:
+            self.tag_rule_file_path.set(file_path)
+
+    def save_tag_rule_file(self):
+        """현재 태그 옵션을 규칙 파일로 저장 (단계를 더 추가해 여러 작업을 한 번에 실행하는 출발점)"""
+        rules = rules_from_options(self.get_tag_options())
+        if not rules:
+            messagebox.showwarning("경고", "최소한 하나의 기능을 선택해주세요.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=RULE_FILETYPES)
+        if not file_path:
+            return
         try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) >= 2:
-                        # 첫 번째 열: 태그, 두 번째 열: 카테고리
-                        # 정규화: 소문자화 및 언더바를 공백으로 치환하여 비교 효율 증대
-                        tag = row[0].strip().lower().replace('_', ' ')
-                        cat = row[1].strip()
-                        if cat == category_id:
-                            tags_set.add(tag)
+            save_rule_file(file_path, rules, Path(file_path).stem)
         except Exception as e:
-            print(f"CSV 로드 오류: {e}")
-            
-        return tags_set
+            messagebox.showerror("오류", f"규칙 파일 저장 실패: {e}")
+            return
+        self.tag_rule_file_path.set(file_path)
+        messagebox.showinfo("완료", f"{len(rules)}단계 규칙 파일을 저장했습니다.\n{file_path}")
+
+    def load_csv_tags(self) -> set:
+        """CSV 파일을 읽어 선택된 카테고리에 해당하는 태그 세트 반환"""
+        return TagProcessor.load_csv_tags(self.csv_file_path.get(), self.csv_category.get())
 
     def check_folder(self):
         if not self.folder_path:
@@ -497,14 +592,14 @@ class DatasetOrganizerGUI:
         return True
     
     def undo_tags(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
             
         result = messagebox.askyesno("확인", "마지막 태그 처리 작업을 취소하시겠습니까?")
         if not result:
             return
             
-        success, fail, logs = TagProcessor.undo_last_processing(self.folder_path)
+        success, fail, logs = TagProcessor.undo_last_processing(self.get_work_root())
         
         self.tag_text.delete(1.0, tk.END)
         self.tag_text.insert(tk.END, f"복구 성공: {success}개, 실패: {fail}개\n\n")
@@ -518,7 +613,7 @@ class DatasetOrganizerGUI:
              messagebox.showerror("오류", "실행 취소 중 오류가 발생했습니다.")
 
     def preview_rename(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
         
         try:
@@ -531,7 +626,8 @@ class DatasetOrganizerGUI:
                 return
             
             preview = RenameProcessor.preview_rename(
-                self.folder_path, base_name, start_num, digits, preview_count=10
+                self.get_work_root(), base_name, start_num, digits, preview_count=10,
+                paired_files=self.get_work_pairs() if self.manifest_path else None
             )
             
             self.rename_text.delete(1.0, tk.END)
@@ -541,7 +637,7 @@ class DatasetOrganizerGUI:
             messagebox.showerror("오류", "시작 번호와 자릿수는 숫자여야 합니다.")
     
     def execute_rename(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
         
         try:
@@ -558,8 +654,13 @@ class DatasetOrganizerGUI:
                 return
             
             success, fail, logs = RenameProcessor.rename_file_pairs(
-                self.folder_path, base_name, start_num, digits
+                self.get_work_root(), base_name, start_num, digits,
+                paired_files=self.get_work_pairs() if self.manifest_path else None
             )
+            if self.manifest_path and success:
+                # 파일 이름이 바뀌어 매니페스트의 경로가 더 이상 맞지 않음
+                self.clear_manifest()
+                logs.insert(0, "파일 이름이 바뀌어 매니페스트 사용을 해제했습니다.\n")
             
             self.rename_text.delete(1.0, tk.END)
             self.rename_text.insert(tk.END, f"성공: {success}개, 실패: {fail}개\n\n")
@@ -571,14 +672,14 @@ class DatasetOrganizerGUI:
             messagebox.showerror("오류", "시작 번호와 자릿수는 숫자여야 합니다.")
     
     def undo_rename(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
         
         result = messagebox.askyesno("확인", "마지막 이름 변경을 취소하시겠습니까?")
         if not result:
             return
         
-        success, fail, logs = RenameProcessor.undo_rename(self.folder_path)
+        success, fail, logs = RenameProcessor.undo_rename(self.get_work_root())
         
         self.rename_text.delete(1.0, tk.END)
         self.rename_text.insert(tk.END, f"복구 성공: {success}개, 실패: {fail}개\n\n")
@@ -682,6 +783,11 @@ class DatasetOrganizerGUI:
             'neighbor_add_pos': self.neighbor_add_pos.get(),
             'neighbor_text': self.neighbor_text.get(),
             
+            # 태그 별칭 / 함의 옵션
+            'use_tag_alias': self.use_tag_alias.get(),
+            'alias_file_path': self.alias_file_path.get().strip(),
+            'implication_file_path': self.implication_file_path.get().strip(),
+
             # CSV 기반 특수 처리 옵션
             'use_csv_process': self.use_csv_process.get(),
             'csv_file_path': self.csv_file_path.get(),
@@ -699,25 +805,54 @@ class DatasetOrganizerGUI:
         }
         return options
 
+    def get_tag_job(self):
+        """규칙 파일 사용 시 TagRuleSet, 아니면 옵션 딕셔너리. 오류/기능 미선택 시 경고 후 None"""
+        if self.use_tag_rule_file.get():
+            rule_path = self.tag_rule_file_path.get().strip()
+            if not rule_path or not os.path.isfile(rule_path):
+                messagebox.showwarning("경고", "규칙 파일을 선택해주세요.")
+                return None
+            try:
+                return load_rule_file(rule_path)
+            except RuleFileError as e:
+                messagebox.showerror("규칙 파일 오류", str(e))
+                return None
+
+        options = self.get_tag_options()
+        
+        # 옵션 유효성 검사
+        if not any([options['use_move_person'], options['use_move_solo'], options['use_move_custom'], 
+                   options['use_replace'], options['use_delete'], options['use_add'], options['use_missing_tag'],
+                   options['use_neighbor_modify'], options['use_csv_process'], options['use_tag_alias']]):
+            messagebox.showwarning("경고", "최소한 하나의 기능을 선택해주세요.")
+            return None
+
+        if options['use_tag_alias']:
+            if not options['alias_file_path'] and not options['implication_file_path']:
+                messagebox.showwarning("경고", "별칭 또는 함의 CSV 파일을 선택해주세요.")
+                return None
+            try:
+                # 큰 표는 여기서 한 번 읽어 캐시를 만들어 두고, 작업자 프로세스는 캐시만 읽게 함
+                load_tag_alias_map(options['alias_file_path'], options['implication_file_path'])
+            except TagAliasError as e:
+                messagebox.showerror("오류", str(e))
+                return None
+        return options
+
     def preview_tags(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
         
         # txt 파일 가져오기
-        paired_files = get_paired_files(self.folder_path, recursive=self.tag_find_subdirs.get())
+        paired_files = self.get_work_pairs(recursive=self.tag_find_subdirs.get())
         text_files = [txt for _, txt in paired_files]
         
         if not text_files:
             messagebox.showinfo("알림", "처리할 txt 파일이 없습니다.")
             return
         
-        options = self.get_tag_options()
-        
-        # 옵션 유효성 검사
-        if not any([options['use_move_person'], options['use_move_solo'], options['use_move_custom'], 
-                   options['use_replace'], options['use_delete'], options['use_add'], options['use_missing_tag'],
-                   options['use_neighbor_modify'], options['use_csv_process']]):
-            messagebox.showwarning("경고", "최소한 하나의 기능을 선택해주세요.")
+        options = self.get_tag_job()
+        if options is None:
             return
             
         preview = TagProcessor.preview_tag_processing(text_files, options, preview_count=10)
@@ -726,16 +861,23 @@ class DatasetOrganizerGUI:
         self.tag_text.insert(tk.END, "\n".join(preview))
     
     def process_tags(self):
-        if not self.check_folder():
+        if not self.check_work_target():
             return
         
-        options = self.get_tag_options()
-        
-        # 옵션 유효성 검사
-        if not any([options['use_move_person'], options['use_move_solo'], options['use_move_custom'], 
-                   options['use_replace'], options['use_delete'], options['use_add'], options['use_missing_tag'],
-                   options['use_neighbor_modify'], options['use_csv_process']]):
-            messagebox.showwarning("경고", "최소한 하나의 기능을 선택해주세요.")
+        options = self.get_tag_job()
+        if options is None:
+            return
+
+        if isinstance(options, TagRuleSet):
+            confirm_msg = (f"규칙 파일 '{options.name}'의 {len(options.steps)}단계를 파일마다 한 번에 적용합니다.\n"
+                           "(실행 취소 기록은 전체 실행에 대해 하나만 남습니다)\n\n")
+            confirm_msg += "\n".join(f"{no}. {step.label}" for no, step in enumerate(options.steps[:20], 1))
+            if len(options.steps) > 20:
+                confirm_msg += f"\n... 외 {len(options.steps) - 20}단계"
+            confirm_msg += "\n\n계속하시겠습니까?"
+            if not messagebox.askyesno("확인", confirm_msg):
+                return
+            self._run_tag_processing(options)
             return
 
         confirm_msg = "선택한 옵션으로 태그 처리를 진행하시겠습니까?\n\n"
@@ -758,9 +900,12 @@ class DatasetOrganizerGUI:
         result = messagebox.askyesno("확인", confirm_msg)
         if not result:
             return
-        
+        self._run_tag_processing(options)
+
+    def _run_tag_processing(self, options):
+        """태그 처리 실행 (옵션 딕셔너리 또는 규칙 파일)"""
         # txt 파일 가져오기
-        paired_files = get_paired_files(self.folder_path, recursive=self.tag_find_subdirs.get())
+        paired_files = self.get_work_pairs(recursive=self.tag_find_subdirs.get())
         text_files = [txt for _, txt in paired_files]
         
         if not text_files:
@@ -768,7 +913,7 @@ class DatasetOrganizerGUI:
             return
         
         num_cores = self.core_var.get()
-        success, fail, logs = TagProcessor.process_folder(text_files, options, num_cores, folder_path=self.folder_path)
+        success, fail, logs = TagProcessor.process_folder(text_files, options, num_cores, folder_path=self.get_work_root())
         
         self.tag_text.delete(1.0, tk.END)
         self.tag_text.insert(tk.END, f"성공: {success}개, 실패: {fail}개\n\n")
@@ -815,10 +960,21 @@ class DatasetOrganizerGUI:
             "csv_mode": self.csv_mode.get(),
             "csv_add_pos": self.csv_add_pos.get(),
             "csv_input_text": self.csv_input_text.get(),
+            "use_tag_alias": self.use_tag_alias.get(),
+            "alias_file_path": self.alias_file_path.get(),
+            "implication_file_path": self.implication_file_path.get(),
+            "use_tag_rule_file": self.use_tag_rule_file.get(),
+            "tag_rule_file_path": self.tag_rule_file_path.get(),
 
             # 중복 찾기 탭 설정
             "dup_use_independent": self.duplicate_gui.use_independent_path.get(),
             "dup_independent_path": self.duplicate_gui.independent_folder_path.get(),
+            "dup_ratio_tolerance": self.duplicate_gui.ratio_tolerance.get(),
+            "dup_resolve_policy": self.duplicate_gui.resolve_policy.get(),
+            "dup_resolve_action": self.duplicate_gui.resolve_action.get(),
+            "dup_preferred_folder": self.duplicate_gui.preferred_folder.get(),
+            "dup_resolve_dest": self.duplicate_gui.resolve_dest_folder.get(),
+            "dup_link_mode": self.duplicate_gui.link_mode.get(),
 
             # 데이터셋 분석 탭 설정
             "ana_use_independent": self.analyzer_gui.use_independent_path.get(),
@@ -846,6 +1002,11 @@ class DatasetOrganizerGUI:
             "sf_res_max_h": self.search_filter_gui.res_max_h.get(),
             "sf_tag_mode": self.search_filter_gui.tag_mode.get(),
             "sf_tag_query": self.search_filter_gui.tag_query.get(),
+            "sf_use_tag_index": self.search_filter_gui.use_tag_index.get(),
+            "sf_similar_mode": self.search_filter_gui.similar_mode.get(),
+            "sf_similar_image": self.search_filter_gui.similar_image.get(),
+            "sf_similar_distance": self.search_filter_gui.similar_distance.get(),
+            "sf_query": self.search_filter_gui.query_text.get(),
             "sf_target_type": self.search_filter_gui.target_type.get(),
 
             "use_delete": self.use_delete.get(),
@@ -938,12 +1099,29 @@ class DatasetOrganizerGUI:
             if "csv_mode" in settings: self.csv_mode.set(settings["csv_mode"])
             if "csv_add_pos" in settings: self.csv_add_pos.set(settings["csv_add_pos"])
             if "csv_input_text" in settings: self.csv_input_text.set(settings["csv_input_text"])
+            if "use_tag_alias" in settings: self.use_tag_alias.set(settings["use_tag_alias"])
+            if "alias_file_path" in settings: self.alias_file_path.set(settings["alias_file_path"])
+            if "implication_file_path" in settings: self.implication_file_path.set(settings["implication_file_path"])
+            if "use_tag_rule_file" in settings: self.use_tag_rule_file.set(settings["use_tag_rule_file"])
+            if "tag_rule_file_path" in settings: self.tag_rule_file_path.set(settings["tag_rule_file_path"])
 
             if "dup_use_independent" in settings:
                 self.duplicate_gui.use_independent_path.set(settings["dup_use_independent"])
                 self.duplicate_gui.toggle_ui_state()
             if "dup_independent_path" in settings:
                 self.duplicate_gui.independent_folder_path.set(settings["dup_independent_path"])
+            if "dup_ratio_tolerance" in settings:
+                self.duplicate_gui.ratio_tolerance.set(settings["dup_ratio_tolerance"])
+            if "dup_resolve_policy" in settings:
+                self.duplicate_gui.resolve_policy.set(settings["dup_resolve_policy"])
+            if "dup_resolve_action" in settings:
+                self.duplicate_gui.resolve_action.set(settings["dup_resolve_action"])
+            if "dup_preferred_folder" in settings:
+                self.duplicate_gui.preferred_folder.set(settings["dup_preferred_folder"])
+            if "dup_resolve_dest" in settings:
+                self.duplicate_gui.resolve_dest_folder.set(settings["dup_resolve_dest"])
+            if "dup_link_mode" in settings:
+                self.duplicate_gui.link_mode.set(settings["dup_link_mode"])
 
             # 데이터셋 분석 탭 로드
             if "ana_use_independent" in settings:
@@ -990,6 +1168,16 @@ class DatasetOrganizerGUI:
                 self.search_filter_gui.tag_mode.set(settings["sf_tag_mode"])
             if "sf_tag_query" in settings:
                 self.search_filter_gui.tag_query.set(settings["sf_tag_query"])
+            if "sf_use_tag_index" in settings:
+                self.search_filter_gui.use_tag_index.set(settings["sf_use_tag_index"])
+            if "sf_similar_mode" in settings:
+                self.search_filter_gui.similar_mode.set(settings["sf_similar_mode"])
+            if "sf_similar_image" in settings:
+                self.search_filter_gui.similar_image.set(settings["sf_similar_image"])
+            if "sf_similar_distance" in settings:
+                self.search_filter_gui.similar_distance.set(settings["sf_similar_distance"])
+            if "sf_query" in settings:
+                self.search_filter_gui.query_text.set(settings["sf_query"])
             if "sf_target_type" in settings:
                 self.search_filter_gui.target_type.set(settings["sf_target_type"])
 
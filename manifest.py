@@ -0,0 +1,230 @@
+"""
+매니페스트 모듈 - 작업 대상 파일 목록(JSONL)을 내보내고 읽어, 다른 도구가 폴더를 다시 스캔하지 않고 같은 파일 집합을 처리하게 함
+"""
+import os
+import json
+import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable
+
+from utils import TEXT_EXTENSION
+
+# 형식 버전 (구조가 바뀌면 올리고 read_header에서 구버전 처리)
+MANIFEST_VERSION = 1
+MANIFEST_EXT = ".jsonl"
+MANIFEST_FILETYPES = [("매니페스트 (JSONL)", f"*{MANIFEST_EXT}"), ("모든 파일", "*.*")]
+
+
+class ManifestError(ValueError):
+    """매니페스트 형식 오류"""
+
+
+@dataclass
+class ManifestItem:
+    """
+    매니페스트 한 줄 (경로는 절대 경로로 복원된 상태).
+      image/caption - 이미지 / 캡션(.txt) 경로 (없으면 None)
+      size/mtime    - 내보낼 때의 이미지(없으면 캡션) 크기와 수정 시각
+      extra         - 내보낸 도구가 덧붙인 값 (예: 중복 그룹 번호)
+    """
+    image: Optional[str]
+    caption: Optional[str]
+    size: int = 0
+    mtime: float = 0.0
+    extra: Dict = field(default_factory=dict)
+
+    @property
+    def has_pair(self) -> bool:
+        return bool(self.image and self.caption)
+
+    def is_stale(self) -> bool:
+        """내보낸 뒤 파일이 사라졌거나 바뀌었는지 (stat 1회)"""
+        try:
+            st = os.stat(self.image or self.caption)
+        except (OSError, TypeError):
+            return True
+        return st.st_size != self.size or st.st_mtime != self.mtime
+
+
+class ManifestWriter:
+    """
+    매니페스트를 한 줄씩 기록 (결과 전체를 메모리에 모으지 않음).
+    첫 줄은 헤더 {"manifest", "source", "root", "created_at"}, 이후 항목 한 줄씩.
+    root 아래 경로는 상대 경로로 저장해 파일 크기를 줄인다. 임시 파일에 쓰고 close()에서 교체.
+
+        with ManifestWriter(path, "search", root) as writer:
+            writer.write(image_path, caption_path)
+    """
+    def __init__(self, path: str, source: str, root: str = ""):
+        self.path = str(path)
+        self.root = os.path.abspath(root) if root else ""
+        self.count = 0
+        self._prefix = self.root + os.sep if self.root else None
+        self._tmp_path = self.path + ".tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._write_line({
+            'manifest': MANIFEST_VERSION,
+            'source': source,
+            'root': self.root,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        })
+
+    def _write_line(self, data: dict):
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        self._file.write('\n')
+
+    def _rel(self, path: Optional[str]) -> Optional[str]:
+        if not path:
+            return None
+        path = os.path.abspath(str(path))
+        if self._prefix and path.startswith(self._prefix):
+            return path[len(self._prefix):]
+        return path
+
+    def write(self, image: Optional[str], caption: Optional[str] = None,
+              size: Optional[int] = None, mtime: Optional[float] = None, **extra):
+        """
+        항목 하나 기록. caption을 생략하면 같은 이름의 .txt가 있을 때 짝으로 기록.
+        size/mtime을 생략하면 stat으로 채운다. 둘 다 없는 파일은 건너뜀.
+        """
+        base = image or caption
+        if not base:
+            return
+        if image and caption is None:
+            txt = os.path.splitext(str(image))[0] + TEXT_EXTENSION
+            caption = txt if os.path.exists(txt) else None
+        if size is None or mtime is None:
+            try:
+                st = os.stat(base)
+            except OSError:
+                return
+            size, mtime = st.st_size, st.st_mtime
+        data = {'image': self._rel(image), 'caption': self._rel(caption), 'size': size, 'mtime': mtime}
+        data.update(extra)
+        self._write_line(data)
+        self.count += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_manifest(path: str, items: Iterable[Tuple[Optional[str], Optional[str]]],
+                   source: str, root: str = "") -> int:
+    """[(이미지, 캡션), ...]을 매니페스트로 저장하고 기록한 항목 수 반환"""
+    with ManifestWriter(path, source, root) as writer:
+        for image, caption in items:
+            writer.write(image, caption)
+    return writer.count
+
+
+# ---------------------------------------------------------------------------
+# 읽기
+# ---------------------------------------------------------------------------
+
+def read_header(path: str) -> dict:
+    """헤더 줄. 매니페스트가 아니거나 지원하지 않는 버전이면 ManifestError"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"매니페스트를 읽을 수 없습니다: {e}")
+    if not isinstance(header, dict) or 'manifest' not in header:
+        raise ManifestError("매니페스트 파일이 아닙니다.")
+    version = header['manifest']
+    if not isinstance(version, int) or isinstance(version, bool) or version > MANIFEST_VERSION:
+        raise ManifestError(f"지원하지 않는 매니페스트 버전입니다: {version!r}")
+    return header
+
+
+def iter_manifest(path: str, check_exists: bool = False) -> Iterator[ManifestItem]:
+    """
+    항목을 한 줄씩 읽어 반환 (헤더 제외). 상대 경로는 헤더의 root 기준으로 복원.
+    check_exists=True면 이미 사라진 파일은 None으로 바꾸고, 이미지·캡션이 모두 없는 항목은 건너뜀.
+    """
+    root = read_header(path).get('root', "")
+    with open(path, 'r', encoding='utf-8') as f:
+        f.readline()
+        for line_no, line in enumerate(f, 2):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                raise ManifestError(f"{line_no}번째 줄을 해석할 수 없습니다.")
+            image = data.pop('image', None)
+            caption = data.pop('caption', None)
+            if root:
+                image = os.path.join(root, image) if image else None
+                caption = os.path.join(root, caption) if caption else None
+            if check_exists:
+                image = image if image and os.path.exists(image) else None
+                caption = caption if caption and os.path.exists(caption) else None
+                if not image and not caption:
+                    continue
+            yield ManifestItem(image, caption, data.pop('size', 0), data.pop('mtime', 0.0), data)
+
+
+def manifest_root(path: str) -> str:
+    """헤더의 root (없으면 매니페스트 파일이 있는 폴더). 실행 취소 기록 기준 폴더로 사용"""
+    return read_header(path).get('root') or str(Path(path).resolve().parent)
+
+
+def _ext_filter(extensions: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    if extensions is None:
+        return None
+    return tuple('.' + ext.lower().lstrip('.') for ext in extensions)
+
+
+def manifest_images(path: str, extensions: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    이미지 경로 목록 (매니페스트 순서). extensions를 주면 해당 확장자만 ('png' / '.png' 모두 허용).
+    image_file_utils.scan_directory 대신 사용.
+    """
+    allowed = _ext_filter(extensions)
+    return [item.image for item in iter_manifest(path)
+            if item.image and (allowed is None or item.image.lower().endswith(allowed))]
+
+
+def manifest_pairs(path: str) -> List[Tuple[Path, Path]]:
+    """
+    이미지-캡션 쌍 목록 (매니페스트 순서, 현재 둘 다 존재하는 것만).
+    utils.get_paired_files 대신 사용.
+    """
+    return [(Path(item.image), Path(item.caption))
+            for item in iter_manifest(path, check_exists=True) if item.has_pair]
+
+
+def manifest_folders(path: str, extensions: Optional[Iterable[str]] = None) -> "OrderedDict[str, List[Path]]":
+    """폴더 → 그 폴더의 이미지 목록 (폴더는 처음 나온 순서). XY표 행/열 구성용"""
+    folders: "OrderedDict[str, List[Path]]" = OrderedDict()
+    for image in manifest_images(path, extensions):
+        image = Path(image)
+        folders.setdefault(str(image.parent), []).append(image)
+    return folders
@@ -0,0 +1,317 @@
+"""
+메타데이터 색인 모듈 - AI 생성 정보(프롬프트/모델/샘플러/시드 등)를 SQLite FTS5에 저장하고 mtime 기준으로 증분 갱신
+"""
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import concurrent.futures
+from pathlib import Path
+from typing import List, Dict, Set, Optional, Callable, Iterable, Tuple
+
+from search_index import CACHE_DIR
+from metadata_utils import read_ai_metadata
+from search_query import QueryError
+
+# 저장 형식 버전 (스키마가 바뀌면 올려서 기존 색인을 버리고 다시 생성)
+SCHEMA_VERSION = 1
+
+# 한 트랜잭션에 기록할 파일 수
+COMMIT_BATCH_SIZE = 500
+
+# 스텔스 PNG 정보 확인 여부 (텍스트 청크가 없는 PNG는 픽셀을 디코딩해야 하므로 첫 색인이 느려짐)
+INDEX_STEALTH_INFO = True
+
+# FTS 검색 대상 필드 → 컬럼 ('meta'는 전체 컬럼)
+FTS_FIELDS = {
+    'prompt': 'prompt',
+    'negative': 'negative',
+    'meta': None,
+}
+# 값 목록이 작아 고유값을 먼저 거르는 필드
+VALUE_FIELDS = ('model', 'sampler')
+# 숫자 필드 → 컬럼 (시드는 64비트 부호 없는 값이 있어 문자열로 보관)
+NUMBER_FIELDS = {'seed': 'seed', 'steps': 'steps', 'cfg': 'cfg'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id      INTEGER PRIMARY KEY,
+    key     TEXT UNIQUE NOT NULL,
+    mtime   REAL NOT NULL,
+    tool    TEXT,
+    model   TEXT,
+    sampler TEXT,
+    seed    TEXT,
+    steps   INTEGER,
+    cfg     REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_model ON files(model);
+CREATE INDEX IF NOT EXISTS idx_files_seed ON files(seed);
+CREATE VIRTUAL TABLE IF NOT EXISTS meta_fts USING fts5(prompt, negative, model, sampler);
+"""
+
+
+def _read_file_metadata(path: str) -> Optional[Dict]:
+    try:
+        return read_ai_metadata(path, INDEX_STEALTH_INFO)
+    except Exception:
+        return None
+
+
+def _fts_phrases(value: str) -> str:
+    """사용자 입력 → FTS5 질의. 단어마다 큰따옴표로 감싸 AND, 끝의 *는 접두어 검색"""
+    terms = []
+    for word in value.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' AND '.join(terms)
+
+
+class MetadataIndex:
+    """
+    데이터셋 폴더 하나에 대한 AI 생성 정보 색인 (cache/meta_index_<폴더 해시>.sqlite).
+
+      files    - 파일별 키(폴더 기준 상대 경로), mtime, 도구, 모델, 샘플러, 시드, 스텝, CFG
+      meta_fts - FTS5 (prompt, negative, model, sampler), rowid = files.id
+    AI 정보가 없는 파일도 files에 mtime을 남겨 다음 갱신 때 다시 읽지 않는다.
+    같은 조건의 조회 결과는 인스턴스 안에서 캐시한다 (스트리밍 검색의 배치마다 재사용).
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.conn: Optional[sqlite3.Connection] = None
+        self._cache: Dict[tuple, Set[str]] = {}
+
+    @staticmethod
+    def index_path(root: str) -> Path:
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+        return CACHE_DIR / f"meta_index_{digest}.sqlite"
+
+    # ------------------------------------------------------------------
+    # 열기 / 닫기
+    # ------------------------------------------------------------------
+
+    def open(self) -> "MetadataIndex":
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = self.index_path(self.root)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.conn.close()
+            os.remove(path)
+            self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def key_for(self, path: str) -> str:
+        """절대 경로 → 색인 키 (폴더 기준 상대 경로)"""
+        prefix = self.root + os.sep
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        return os.path.relpath(path, self.root)
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+
+    def refresh(self, images: Iterable[Tuple[str, float]], recursive: bool = True,
+                num_cores: int = 1,
+                progress_callback: Optional[Callable[[int, int], None]] = None,
+                stop_event: Optional[threading.Event] = None) -> int:
+        """
+        스캔된 이미지 목록 [(절대 경로, mtime), ...]과 색인을 비교해
+        새로 생겼거나 mtime이 바뀐 이미지만 메타데이터를 다시 읽고, 사라진 이미지는 제거.
+        recursive=False 스캔에서는 최상위 폴더의 이미지만 제거 대상으로 본다.
+        중지해도 그때까지 읽은 결과는 저장되어 다음 갱신에서 이어서 진행한다.
+        반환: 다시 읽은 이미지 수 (중지 시 -1)
+        """
+        conn = self.conn
+        known = {key: (file_id, mtime) for file_id, key, mtime
+                 in conn.execute("SELECT id, key, mtime FROM files")}
+        seen = set()
+        changed: List[Tuple[str, float]] = []
+        for path, mtime in images:
+            key = self.key_for(path)
+            seen.add(key)
+            old = known.get(key)
+            if old is None or old[1] != mtime:
+                changed.append((key, mtime))
+
+        removed = [file_id for key, (file_id, _) in known.items()
+                   if key not in seen and (recursive or os.sep not in key)]
+        if removed:
+            with conn:
+                conn.executemany("DELETE FROM meta_fts WHERE rowid = ?", ((i,) for i in removed))
+                conn.executemany("DELETE FROM files WHERE id = ?", ((i,) for i in removed))
+
+        if not changed:
+            if removed:
+                self._cache.clear()
+            return 0
+        self._cache.clear()
+
+        total = len(changed)
+        paths = [os.path.join(self.root, key) for key, _ in changed]
+        pending = []
+
+        def _flush():
+            with conn:
+                for (key, mtime), meta in pending:
+                    self._store(key, mtime, meta)
+            pending.clear()
+
+        if num_cores > 1 and total > 1:
+            ex = concurrent.futures.ThreadPoolExecutor(max_workers=num_cores)
+            results = ex.map(_read_file_metadata, paths, chunksize=16)
+        else:
+            ex = None
+            results = map(_read_file_metadata, paths)
+        try:
+            for done, (item, meta) in enumerate(zip(changed, results), 1):
+                pending.append((item, meta))
+                if len(pending) >= COMMIT_BATCH_SIZE:
+                    _flush()
+                if progress_callback and (done % 200 == 0 or done == total):
+                    progress_callback(done, total)
+                if stop_event and stop_event.is_set():
+                    _flush()
+                    return -1
+            _flush()
+        finally:
+            if ex is not None:
+                ex.shutdown(wait=False, cancel_futures=True)
+        return total
+
+    def _store(self, key: str, mtime: float, meta: Optional[Dict]):
+        params = (meta or {}).get('parameters', {})
+        seed = params.get('seed')
+        row = (
+            mtime,
+            (meta or {}).get('detected_tool'),
+            params.get('model'),
+            params.get('sampler'),
+            str(seed) if seed is not None else None,
+            params.get('steps'),
+            params.get('cfg_scale'),
+        )
+        conn = self.conn
+        found = conn.execute("SELECT id FROM files WHERE key = ?", (key,)).fetchone()
+        if found:
+            file_id = found[0]
+            conn.execute("UPDATE files SET mtime=?, tool=?, model=?, sampler=?, seed=?, steps=?, cfg=? "
+                         "WHERE id=?", row + (file_id,))
+            conn.execute("DELETE FROM meta_fts WHERE rowid = ?", (file_id,))
+        else:
+            file_id = conn.execute(
+                "INSERT INTO files (mtime, tool, model, sampler, seed, steps, cfg, key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row + (key,)).lastrowid
+        if meta:
+            conn.execute(
+                "INSERT INTO meta_fts (rowid, prompt, negative, model, sampler) VALUES (?, ?, ?, ?, ?)",
+                (file_id, params.get('prompt', ''), params.get('negative_prompt', ''),
+                 params.get('model') or '', params.get('sampler') or ''))
+
+    # ------------------------------------------------------------------
+    # 조회 (반환: 색인 키 집합)
+    # ------------------------------------------------------------------
+
+    def _keys(self, sql: str, args: tuple = ()) -> Set[str]:
+        return {row[0] for row in self.conn.execute(sql, args)}
+
+    def match_text(self, field: str, kind: str, value: str,
+                   pattern: Optional[re.Pattern] = None) -> Set[str]:
+        """
+        텍스트 필드 조회. kind: 'sub' | 'glob' | 'regex'
+          prompt/negative/meta - sub: FTS 단어 검색, glob: 끝 *는 접두어 검색 그 외는 pattern으로 원문 검사
+          model/sampler        - 고유값 목록을 먼저 거른 뒤 해당 값을 가진 파일 조회
+        """
+        cache_key = ('text', field, kind, value)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+
+        if field in VALUE_FIELDS:
+            values = [v for (v,) in self.conn.execute(
+                f"SELECT DISTINCT {field} FROM files WHERE {field} IS NOT NULL")]
+            if kind == 'sub':
+                matched = [v for v in values if value in v.lower()]
+            elif kind == 'glob':
+                matched = [v for v in values if pattern.match(v)]
+            else:
+                matched = [v for v in values if pattern.search(v)]
+            keys = set()
+            for v in matched:
+                keys |= self._keys(f"SELECT key FROM files WHERE {field} = ?", (v,))
+        else:
+            column = FTS_FIELDS[field]
+            simple_prefix = kind == 'glob' and not any(c in value.rstrip('*') for c in '*?[')
+            if kind == 'sub' or simple_prefix:
+                query = _fts_phrases(value if simple_prefix else value.replace('*', ' '))
+                if not query:
+                    # 'prompt:*'처럼 검색할 단어가 남지 않으면 일치 없음 (빈 MATCH는 FTS 문법 오류)
+                    keys = set()
+                else:
+                    if column:
+                        query = f"{column} : ({query})"
+                    try:
+                        keys = self._keys(
+                            "SELECT f.key FROM meta_fts JOIN files f ON f.id = meta_fts.rowid "
+                            "WHERE meta_fts MATCH ?", (query,))
+                    except sqlite3.OperationalError as e:
+                        raise QueryError(f"메타데이터 검색어를 해석할 수 없습니다: {value} ({e})")
+            else:
+                columns = [column] if column else ['prompt', 'negative', 'model', 'sampler']
+                test = pattern.match if kind == 'glob' else pattern.search
+                keys = set()
+                for row in self.conn.execute(
+                        f"SELECT f.key, {', '.join('m.' + c for c in columns)} "
+                        "FROM meta_fts m JOIN files f ON f.id = m.rowid"):
+                    if any(text and test(text) for text in row[1:]):
+                        keys.add(row[0])
+
+        self._cache[cache_key] = keys
+        return keys
+
+    def match_number(self, field: str, op: str, a: Optional[float], b: Optional[float]) -> Set[str]:
+        """숫자 필드 조회. op: '>', '>=', '<', '<=', '=', '!=', 'range'"""
+        cache_key = ('num', field, op, a, b)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+
+        column = NUMBER_FIELDS[field]
+        if field == 'seed' and op in ('=', '!=') and a is not None and float(a).is_integer():
+            # 시드는 문자열로 보관하므로 정확 일치는 색인을 그대로 사용
+            sql = f"SELECT key FROM files WHERE seed {'=' if op == '=' else '!='} ?"
+            keys = self._keys(sql, (str(int(a)),))
+        else:
+            expr = f"CAST({column} AS REAL)" if field == 'seed' else column
+            if op == 'range':
+                conds, args = [f"{expr} IS NOT NULL"], []
+                if a is not None:
+                    conds.append(f"{expr} >= ?")
+                    args.append(a)
+                if b is not None:
+                    conds.append(f"{expr} <= ?")
+                    args.append(b)
+                keys = self._keys(f"SELECT key FROM files WHERE {' AND '.join(conds)}", tuple(args))
+            else:
+                sql_op = '<>' if op == '!=' else op
+                keys = self._keys(f"SELECT key FROM files WHERE {expr} {sql_op} ?", (a,))
+
+        self._cache[cache_key] = keys
+        return keys
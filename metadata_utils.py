@@ -2,6 +2,7 @@ from PIL import Image
 from PIL.PngImagePlugin import PngInfo
 import piexif
 import json
+import re
 from typing import Dict, Any, Optional
 
 # Assuming steganography_handler.py is in the same directory
@@ -77,6 +78,8 @@ def detect_ai_generator_type(metadata: Dict) -> (Optional[str], Optional[str]):
         return png_text['parameters'], 'webui'
     if 'prompt' in png_text: # ComfyUI style
         return png_text['prompt'], 'comfyui'
+    if 'workflow' in png_text: # ComfyUI UI 워크플로만 있는 경우
+        return png_text['workflow'], 'comfyui_workflow'
     
     stealth_info = metadata.get('steganography_data')
     if stealth_info and stealth_info.get('data') and stealth_info['data'] != "<data extraction not fully implemented>":
@@ -84,12 +87,184 @@ def detect_ai_generator_type(metadata: Dict) -> (Optional[str], Optional[str]):
 
     return None, 'unknown'
 
+# A1111 파라미터 줄의 "키: 값" 쌍 (값은 따옴표로 감싸 쉼표를 포함할 수 있음)
+_WEBUI_PARAM_RE = re.compile(r'\s*([\w ]+):\s*("(?:\\.|[^\\"])+"|[^,]*)(?:,|$)')
+
+# 표준 필드로 옮길 A1111 키
+_WEBUI_FIELD_KEYS = {
+    'Steps': 'steps',
+    'Sampler': 'sampler',
+    'CFG scale': 'cfg_scale',
+    'Seed': 'seed',
+    'Size': 'size',
+    'Model': 'model',
+    'Model hash': 'model_hash',
+}
+
+# ComfyUI 샘플러/모델 로더 노드
+_COMFY_SAMPLER_NODES = ('KSampler', 'KSamplerAdvanced', 'SamplerCustom')
+_COMFY_CHECKPOINT_NODES = ('CheckpointLoaderSimple', 'CheckpointLoader', 'UNETLoader')
+
+
+def _to_number(value, cast):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_webui_parameters(raw_data: str) -> Dict:
+    """A1111/WebUI 형식: 프롬프트 줄들, 'Negative prompt:' 줄, 마지막 'Steps: ...' 파라미터 줄"""
+    lines = raw_data.strip().split('\n')
+    param_line = ''
+    if lines and _WEBUI_PARAM_RE.match(lines[-1]) and lines[-1].lstrip().startswith('Steps:'):
+        param_line = lines.pop()
+
+    prompt_lines, negative_lines = [], []
+    target = prompt_lines
+    for line in lines:
+        if line.startswith('Negative prompt:'):
+            target = negative_lines
+            line = line[len('Negative prompt:'):].strip()
+        target.append(line)
+
+    result = {
+        'prompt': '\n'.join(prompt_lines).strip(),
+        'negative_prompt': '\n'.join(negative_lines).strip(),
+    }
+    extra = {}
+    for key, value in _WEBUI_PARAM_RE.findall(param_line):
+        key = key.strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        if key in _WEBUI_FIELD_KEYS:
+            result[_WEBUI_FIELD_KEYS[key]] = value
+        else:
+            extra[key] = value
+    result['steps'] = _to_number(result.get('steps'), int)
+    result['cfg_scale'] = _to_number(result.get('cfg_scale'), float)
+    result['seed'] = _to_number(result.get('seed'), int)
+    result['extra'] = extra
+    return result
+
+
+def _comfy_text(nodes: Dict, ref) -> str:
+    """ComfyUI 입력 값 또는 [노드 id, 출력 번호] 링크를 따라가 텍스트 인코더의 문자열을 찾음"""
+    seen = set()
+    while isinstance(ref, list) and ref and str(ref[0]) not in seen:
+        seen.add(str(ref[0]))
+        node = nodes.get(str(ref[0]), {})
+        inputs = node.get('inputs', {})
+        ref = inputs.get('text', inputs.get('text_g', inputs.get('conditioning')))
+    return ref if isinstance(ref, str) else ''
+
+
+def _parse_comfyui_prompt(raw_data: str) -> Dict:
+    """ComfyUI API 형식 'prompt' 청크: {노드 id: {class_type, inputs}}"""
+    nodes = json.loads(raw_data)
+    result = {'prompt': '', 'negative_prompt': ''}
+    for node in nodes.values():
+        class_type = node.get('class_type', '')
+        inputs = node.get('inputs', {})
+        if class_type in _COMFY_SAMPLER_NODES and 'steps' not in result:
+            result['seed'] = _to_number(inputs.get('seed', inputs.get('noise_seed')), int)
+            result['steps'] = _to_number(inputs.get('steps'), int)
+            result['cfg_scale'] = _to_number(inputs.get('cfg'), float)
+            sampler = inputs.get('sampler_name')
+            result['sampler'] = sampler if isinstance(sampler, str) else None
+            result['prompt'] = _comfy_text(nodes, inputs.get('positive'))
+            result['negative_prompt'] = _comfy_text(nodes, inputs.get('negative'))
+        elif class_type in _COMFY_CHECKPOINT_NODES and 'model' not in result:
+            name = inputs.get('ckpt_name', inputs.get('unet_name'))
+            if isinstance(name, str):
+                result['model'] = name
+    return result
+
+
+def _parse_comfyui_workflow(raw_data: str) -> Dict:
+    """ComfyUI UI 형식 'workflow' 청크: 노드별 widgets_values (긍정/부정 구분 없이 텍스트를 모음)"""
+    workflow = json.loads(raw_data)
+    result = {'prompt': '', 'negative_prompt': ''}
+    texts = []
+    for node in workflow.get('nodes', []):
+        node_type = node.get('type', '')
+        values = node.get('widgets_values') or []
+        if node_type in _COMFY_SAMPLER_NODES and len(values) >= 5 and 'steps' not in result:
+            # [seed, 시드 제어, steps, cfg, sampler_name, scheduler, denoise]
+            result['seed'] = _to_number(values[0], int)
+            result['steps'] = _to_number(values[2], int)
+            result['cfg_scale'] = _to_number(values[3], float)
+            result['sampler'] = values[4] if isinstance(values[4], str) else None
+        elif node_type in _COMFY_CHECKPOINT_NODES and values and 'model' not in result:
+            if isinstance(values[0], str):
+                result['model'] = values[0]
+        elif node_type.startswith('CLIPTextEncode') and values and isinstance(values[0], str):
+            texts.append(values[0])
+    result['prompt'] = '\n'.join(texts)
+    return result
+
+
 def parse_ai_parameters(raw_data: str, generator_type: str) -> Dict:
-    """AI 생성 파라미터를 파싱합니다."""
+    """
+    AI 생성 파라미터를 파싱합니다.
+    반환 키: raw, prompt, negative_prompt, model, sampler, seed, steps, cfg_scale (+ 형식별 부가 정보)
+    해석할 수 없으면 raw만 담아 반환합니다.
+    """
     if not raw_data:
         return {}
-    # Placeholder - in a real scenario, this would have complex parsing logic
-    return {'raw': raw_data}
+    try:
+        if generator_type in ('webui', 'stealth_pnginfo'):
+            # 스텔스 PNG 정보도 A1111 형식 텍스트를 담는 경우가 대부분 (JSON이면 ComfyUI로 시도)
+            if generator_type == 'stealth_pnginfo' and raw_data.lstrip().startswith('{'):
+                parsed = _parse_comfyui_prompt(raw_data)
+            else:
+                parsed = _parse_webui_parameters(raw_data)
+        elif generator_type == 'comfyui':
+            parsed = _parse_comfyui_prompt(raw_data)
+        elif generator_type == 'comfyui_workflow':
+            parsed = _parse_comfyui_workflow(raw_data)
+        else:
+            parsed = {}
+    except (ValueError, AttributeError, TypeError) as e:
+        print(f"AI 파라미터 파싱 실패 ({generator_type}): {e}")
+        parsed = {}
+    parsed['raw'] = raw_data
+    return parsed
+
+
+def read_ai_metadata(image_path: str, include_stealth: bool = True) -> Optional[Dict]:
+    """
+    검색 색인용 경량 추출: 이미지 디코딩 없이 PNG 텍스트 청크/EXIF 설명만 읽고,
+    없을 때만(include_stealth) 스텔스 PNG 정보를 확인합니다.
+    반환: {'detected_tool', 'parameters'} 또는 AI 정보가 없으면 None
+    """
+    with Image.open(image_path) as img:
+        info = img.info
+        raw_data, tool = None, None
+        if isinstance(info.get('parameters'), str):
+            raw_data, tool = info['parameters'], 'webui'
+        elif isinstance(info.get('prompt'), str):
+            raw_data, tool = info['prompt'], 'comfyui'
+        elif isinstance(info.get('workflow'), str):
+            raw_data, tool = info['workflow'], 'comfyui_workflow'
+        else:
+            exif = extract_exif_data(img)
+            comment = (exif or {}).get('Exif', {}).get(piexif.ExifIFD.UserComment)
+            if comment:
+                # UserComment 앞 8바이트는 문자 코드 (UNICODE는 UTF-16)
+                code, body = comment[:8], comment[8:]
+                text = body.decode('utf-16-be' if code.startswith(b'UNICODE') else 'utf-8', errors='ignore')
+                if 'Steps:' in text:
+                    raw_data, tool = text.strip('\x00'), 'webui'
+        if raw_data is None and include_stealth and img.format == 'PNG' and img.mode in ('RGB', 'RGBA'):
+            stealth = steganography_handler.extract_stealth_pnginfo(img)
+            if stealth and stealth.get('data'):
+                raw_data, tool = stealth['data'], 'stealth_pnginfo'
+
+    if raw_data is None:
+        return None
+    return {'detected_tool': tool, 'parameters': parse_ai_parameters(raw_data, tool)}
 
 def prepare_save_options(source_metadata: dict, target_format: str, settings: dict) -> dict:
     """대상 이미지 저장에 필요한 메타데이터 옵션을 준비합니다."""
@@ -118,20 +118,31 @@ class RenameProcessor:
         folder_path: str,
         base_name: str,
         start_number: int,
-        digit_count: int
+        digit_count: int,
+        paired_files: Optional[List[Tuple[Path, Path]]] = None
     ) -> Tuple[int, int, List[str]]:
         """
         이미지-텍스트 파일 쌍 일괄 이름 변경
+        paired_files: 대상 쌍 목록 (매니페스트 등). 없으면 folder_path를 스캔.
+                      하위 폴더의 파일은 제자리에서 이름만 바뀌며, 실행 취소 기록은 folder_path 기준 상대 경로.
         """
         folder = Path(folder_path)
         if not folder.exists():
             return 0, 0, ["폴더가 존재하지 않습니다."]
         
-        paired_files = get_paired_files(folder)
+        if paired_files is None:
+            paired_files = get_paired_files(folder)
         
         if not paired_files:
             return 0, 0, ["이름을 변경할 파일 쌍이 없습니다."]
         
+        # 대상이 아닌 기존 파일과 이름이 겹치면 덮어쓰게 되므로 (매니페스트로 일부만 바꾸는 경우 등) 시작 전에 중단
+        collisions = RenameProcessor.find_name_collisions(paired_files, base_name, start_number, digit_count)
+        if collisions:
+            logs = [f"이름 충돌: {os.path.relpath(path, folder)} 파일이 이미 있습니다." for path in collisions]
+            logs.insert(0, f"대상이 아닌 기존 파일과 이름이 겹쳐 이름 변경을 중단했습니다. ({len(collisions)}개)")
+            return 0, len(paired_files), logs
+        
         success = 0
         fail = 0
         logs = []
@@ -149,8 +160,8 @@ class RenameProcessor:
                 temp_img = img_path.parent / f"_temp_{current_num}{img_path.suffix}"
                 temp_txt = txt_path.parent / f"_temp_{current_num}{txt_path.suffix}"
                 
-                orig_img_name = img_path.name
-                orig_txt_name = txt_path.name
+                orig_img_name = os.path.relpath(img_path, folder)
+                orig_txt_name = os.path.relpath(txt_path, folder)
                 
                 img_path.rename(temp_img)
                 txt_path.rename(temp_txt)
@@ -176,7 +187,7 @@ class RenameProcessor:
                 
                 rename_history.append((
                     orig_img_name, orig_txt_name,
-                    final_img.name, final_txt.name
+                    os.path.relpath(final_img, folder), os.path.relpath(final_txt, folder)
                 ))
                 
                 logs.append(f"변경 완료: {orig_img_name} → {final_img.name}")
@@ -191,13 +202,37 @@ class RenameProcessor:
         
         return success, fail, logs
 
+    @staticmethod
+    def find_name_collisions(
+        paired_files: List[Tuple[Path, Path]],
+        base_name: str,
+        start_number: int,
+        digit_count: int
+    ) -> List[Path]:
+        """
+        최종 이름 / 임시 이름(_temp_N) 중 이미 있는 파일과 겹치는 경로 목록.
+        이번에 이름을 바꿀 파일 자체는 먼저 임시 이름으로 옮겨지므로 충돌로 보지 않는다.
+        """
+        key = lambda p: os.path.normcase(os.path.abspath(p))
+        sources = {key(path) for pair in paired_files for path in pair}
+        collisions = []
+        for i, (img_path, txt_path) in enumerate(paired_files):
+            num = start_number + i
+            new_base = f"{base_name}_{format_number(num, digit_count)}"
+            for path in (img_path, txt_path):
+                for target in (path.parent / f"_temp_{num}{path.suffix}", path.parent / f"{new_base}{path.suffix}"):
+                    if key(target) not in sources and target.exists():
+                        collisions.append(target)
+        return collisions
+
     @staticmethod
     def preview_rename(
         folder_path: str,
         base_name: str,
         start_number: int,
         digit_count: int,
-        preview_count: int = 10
+        preview_count: int = 10,
+        paired_files: Optional[List[Tuple[Path, Path]]] = None
     ) -> List[str]:
         """
         이름 변경 미리보기
@@ -206,7 +241,8 @@ class RenameProcessor:
         if not folder.exists():
             return ["폴더가 존재하지 않습니다."]
         
-        paired_files = get_paired_files(folder)
+        if paired_files is None:
+            paired_files = get_paired_files(folder)
         
         if not paired_files:
             return ["이름을 변경할 파일 쌍이 없습니다."]
@@ -226,4 +262,9 @@ class RenameProcessor:
         if len(paired_files) > preview_count:
             preview.append(f"\n... 외 {len(paired_files) - preview_count}개")
         
+        collisions = RenameProcessor.find_name_collisions(paired_files, base_name, start_number, digit_count)
+        if collisions:
+            preview.append(f"\n⚠ 대상이 아닌 기존 파일과 이름이 겹쳐 실행 시 중단됩니다 ({len(collisions)}개):")
+            preview.extend(f"  {os.path.relpath(path, folder)}" for path in collisions[:preview_count])
+        
         return preview
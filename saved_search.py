@@ -0,0 +1,256 @@
+"""
+저장된 검색 모듈 - 이름 붙인 검색 조건을 보관하고, 재실행 시 지난 실행 이후 추가/변경된 파일만 평가해 저장된 결과와 병합
+"""
+import os
+import json
+import pickle
+import hashlib
+import datetime
+import threading
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Callable
+
+from search_index import APP_DIR, CACHE_DIR
+from search_query import compile_query
+from search_filter import (
+    FileEntry,
+    SearchTable,
+    NO_DISTANCE,
+    collect_entries,
+    iter_search_entries,
+)
+
+# 검색 정의(JSON) 저장 폴더. 폴더 상태/결과는 용량이 커서 cache/에 따로 보관
+SAVED_SEARCH_DIR = APP_DIR / "saved_searches"
+
+# 상태 파일 형식 버전 (구조가 바뀌면 올려서 다음 실행을 전체 재평가로 처리)
+STATE_VERSION = 2
+
+# 이미지/캡션이 없는 항목의 mtime 자리 값
+_MISSING = -1.0
+
+
+class SavedSearch:
+    """
+    이름 붙인 검색 하나.
+
+    정의 (saved_searches/<이름>.json):
+      name, folder, recursive, conditions, query, use_tag_index, created_at, last_run, result_count
+    상태 (cache/saved_search_<이름 해시>.pkl):
+      files      - 항목 키(폴더 기준 상대 경로) -> (이미지 mtime, 캡션 mtime)  ← 지난 실행 시점의 폴더 상태 지문
+      results    - 조건을 만족한 항목 키 -> (유사 이미지 거리(없으면 NO_DISTANCE), FileEntry.snapshot())
+                   변하지 않은 항목은 이 값으로 결과 행을 다시 만들어 이미지/캡션을 다시 읽지 않는다
+      definition - 지난 실행의 조건 정의 해시 (조건이 바뀌면 전체 재평가)
+    """
+    def __init__(self, name: str, folder: str, recursive: bool, conditions: List[Dict],
+                 query: str = "", use_tag_index: bool = False):
+        self.name = name
+        self.folder = os.path.abspath(folder)
+        self.recursive = recursive
+        self.conditions = conditions
+        self.query = query
+        self.use_tag_index = use_tag_index
+        self.created_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self.last_run = ""
+        self.result_count = 0
+
+        self.files: Dict[str, Tuple[float, float]] = {}
+        self.results: Dict[str, Tuple[int, Tuple]] = {}
+        self.definition = ""
+
+    # ------------------------------------------------------------------
+    # 경로
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _digest(name: str) -> str:
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def definition_path(name: str) -> Path:
+        safe = "".join(
+            c if (c.isalnum() or c in ('-', '_', ' ')) else '_'
+            for c in name
+        ).strip().replace(' ', '_') or 'search'
+        return SAVED_SEARCH_DIR / f"{safe}_{SavedSearch._digest(name)[:8]}.json"
+
+    @staticmethod
+    def state_path(name: str) -> Path:
+        return CACHE_DIR / f"saved_search_{SavedSearch._digest(name)}.pkl"
+
+    # ------------------------------------------------------------------
+    # 저장 / 불러오기
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'folder': self.folder,
+            'recursive': self.recursive,
+            'conditions': self.conditions,
+            'query': self.query,
+            'use_tag_index': self.use_tag_index,
+            'created_at': self.created_at,
+            'last_run': self.last_run,
+            'result_count': self.result_count,
+        }
+
+    def save(self):
+        """정의는 JSON, 상태는 pickle로 저장 (각각 임시 파일 → os.replace)"""
+        SAVED_SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+        path = self.definition_path(self.name)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+        state = {
+            'version': STATE_VERSION,
+            'folder': self.folder,
+            'files': self.files,
+            'results': self.results,
+            'definition': self.definition,
+        }
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            state_path = self.state_path(self.name)
+            tmp_path = state_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, state_path)
+        except Exception as e:
+            print(f"저장된 검색 상태 저장 실패: {e}")
+
+    @classmethod
+    def load(cls, path: str) -> "SavedSearch":
+        """정의 JSON을 불러오고, 상태 파일이 없거나 손상되었으면 빈 상태(다음 실행은 전체 평가)로 둔다"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        saved = cls(data['name'], data['folder'], data.get('recursive', True),
+                    data.get('conditions', []), data.get('query', ""), data.get('use_tag_index', False))
+        saved.created_at = data.get('created_at', saved.created_at)
+        saved.last_run = data.get('last_run', "")
+        saved.result_count = data.get('result_count', 0)
+
+        state_path = cls.state_path(saved.name)
+        if state_path.exists():
+            try:
+                with open(state_path, 'rb') as f:
+                    state = pickle.load(f)
+                if state.get('version') == STATE_VERSION and state.get('folder') == saved.folder:
+                    saved.files = state['files']
+                    saved.results = state['results']
+                    saved.definition = state['definition']
+            except Exception as e:
+                print(f"저장된 검색 상태 불러오기 실패 (전체 재평가): {e}")
+        return saved
+
+    def delete(self):
+        for path in (self.definition_path(self.name), self.state_path(self.name)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+
+    def _definition_digest(self) -> str:
+        """조건 정의 + 유사 이미지 기준 파일의 mtime (기준 이미지가 바뀌면 전체 재평가)"""
+        refs = []
+        for cond in self.conditions:
+            if cond.get('type') == 'similar' and cond.get('image'):
+                try:
+                    refs.append(os.path.getmtime(cond['image']))
+                except OSError:
+                    refs.append(None)
+        payload = json.dumps([self.recursive, self.conditions, self.query, self.use_tag_index, refs],
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def run(self, num_cores: int = 1,
+            progress_callback: Optional[Callable[[int, int], None]] = None,
+            stop_event: Optional[threading.Event] = None) -> Optional[Tuple[SearchTable, Dict[str, int]]]:
+        """
+        폴더를 다시 스캔해 지난 실행의 폴더 상태와 비교하고,
+        새로 생겼거나 이미지/캡션 mtime이 바뀐 항목만 조건으로 평가한 뒤
+        변하지 않은 항목의 저장된 결과와 병합한다. 사라진 항목은 결과에서 빠진다.
+        조건 정의가 지난 실행과 다르면 전체를 평가한다.
+        성공 시 상태를 저장하고 (결과 테이블, 통계) 반환, 중지 시 None (상태는 그대로).
+          통계: total(스캔 항목), evaluated(평가), kept(재사용), removed(사라짐), matched(결과)
+        """
+        folder = Path(self.folder)
+        if not folder.exists():
+            raise FileNotFoundError(f"폴더를 찾을 수 없습니다: {self.folder}")
+        query = compile_query(self.query) if self.query.strip() else None
+
+        captions, images = [], []
+        entries = collect_entries(folder, self.recursive, captions, images)
+        mtimes = dict(captions)
+        mtimes.update(images)
+
+        definition = self._definition_digest()
+        full = definition != self.definition
+        prefix = self.folder + os.sep
+        files: Dict[str, Tuple[float, float]] = {}
+        keys: Dict[int, str] = {}
+        kept: List[FileEntry] = []
+        changed: List[FileEntry] = []
+        for entry in entries:
+            base = str(entry.image_path or entry.txt_path)
+            key = base[len(prefix):] if base.startswith(prefix) else os.path.relpath(base, self.folder)
+            state = (mtimes.get(str(entry.image_path), _MISSING) if entry.image_path else _MISSING,
+                     mtimes.get(str(entry.txt_path), _MISSING) if entry.txt_path else _MISSING)
+            files[key] = state
+            keys[id(entry)] = key
+            if not full and self.files.get(key) == state:
+                if key in self.results:
+                    dist, snapshot = self.results[key]
+                    entry.distance = None if dist == NO_DISTANCE else dist
+                    entry.restore(snapshot)
+                    kept.append(entry)
+            else:
+                changed.append(entry)
+
+        table = SearchTable()
+        for entry in kept:
+            table.append(entry)
+        for batch in iter_search_entries(str(folder), changed, captions, images, self.recursive,
+                                         self.conditions, num_cores, progress_callback, stop_event,
+                                         self.use_tag_index, query):
+            table.extend(batch)
+        if stop_event and stop_event.is_set():
+            return None
+
+        if any(c.get('type') == 'similar' and c.get('mode', 'unused') != 'unused' for c in self.conditions):
+            table = table.subset(table.sort_order([('distance', False)]))
+
+        stats = {
+            'total': len(entries),
+            'evaluated': len(changed),
+            'kept': len(kept),
+            'removed': sum(1 for key in self.files if key not in files),
+            'matched': len(table),
+        }
+        self.files = files
+        self.results = {keys[id(e)]: (table.distance[i], e.snapshot()) for i, e in enumerate(table.entries)}
+        self.definition = definition
+        self.last_run = datetime.datetime.now().isoformat(timespec='seconds')
+        self.result_count = len(table)
+        self.save()
+        return table, stats
+
+
+def list_saved_searches() -> List[Tuple[str, str]]:
+    """저장된 검색 목록 [(이름, 정의 파일 경로), ...] (이름순)"""
+    if not SAVED_SEARCH_DIR.exists():
+        return []
+    result = []
+    for path in SAVED_SEARCH_DIR.glob('*.json'):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result.append((json.load(f)['name'], str(path)))
+        except Exception:
+            continue
+    return sorted(result)
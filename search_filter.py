@@ -2,25 +2,92 @@
 검색 및 분류 모듈 - 데이터셋 파일을 조건별로 검색하고 처리하는 로직
 """
 import os
+import re
+import math
 import shutil
+from array import array
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator
 from PIL import Image
 import concurrent.futures
 import threading
+from datetime import datetime
 
-from utils import IMAGE_EXTENSIONS, TEXT_EXTENSION, is_image_file, is_text_file
+from utils import IMAGE_EXTENSIONS, TEXT_EXTENSION
+from search_index import SearchIndex
+from search_query import CompiledQuery, QueryEvaluator
+from metadata_index import MetadataIndex
+from hash_index import HashIndex, hash_image, DEFAULT_MAX_DISTANCE
+from link_utils import link_new
 
 
 # ------------------------------------------------------------------
 # 데이터 구조
 # ------------------------------------------------------------------
 
+# 해상도 캐시 미계산 표시 (None은 '읽기 실패/이미지 없음'을 뜻하므로 별도 값 사용)
+_UNSET = object()
+
+# 해상도 컬럼에서 '해상도 없음'을 나타내는 값
+NO_RESOLUTION = -1
+
+# 거리 컬럼에서 '유사 이미지 검색 대상 아님'을 나타내는 값
+NO_DISTANCE = -1
+
+# CLIP 토큰 수 추정: 단어/숫자 한 자리/구두점 한 글자 단위로 나누고,
+# 긴 영문 단어는 BPE로 쪼개지는 것을 감안해 글자 수로 나눠 센다
+_CLIP_PIECE_RE = re.compile(r"[^\W\d_]+|\d|[^\w\s]|_")
+_CLIP_WHOLE_WORD_LEN = 10
+_CLIP_CHARS_PER_TOKEN = 6
+
+
+def estimate_clip_tokens(text: str) -> int:
+    """캡션의 CLIP 토큰 수 근사치 (BOS/EOS 제외, WebUI의 75토큰 단위 판단용)"""
+    count = 0
+    for m in _CLIP_PIECE_RE.finditer(text.lower()):
+        piece = m.group()
+        if len(piece) == 1:
+            count += 1
+        elif not piece.isascii():
+            count += len(piece)   # 한글/일본어 등은 대개 글자마다 1토큰 이상
+        elif len(piece) <= _CLIP_WHOLE_WORD_LEN:
+            count += 1
+        else:
+            count += math.ceil(len(piece) / _CLIP_CHARS_PER_TOKEN)
+    return count
+
+
+def caption_stats(content: str, tags: List[str]) -> Tuple[int, int, int, int]:
+    """캡션 통계 (태그 수, 글자 수, CLIP 토큰 추정치, 중복 태그 수)"""
+    return len(tags), len(content.strip()), estimate_clip_tokens(content), len(tags) - len(set(tags))
+
+# 스트리밍 검색에서 한 번에 평가하는 스캔 항목 수 (통과한 항목이 배치로 UI에 전달됨)
+SEARCH_BATCH_SIZE = 500
+
+# 삭제/이동/복사 처리 로그 폴더 (전체 로그는 파일로, 결과 창에는 앞부분만 표시)
+ACTION_LOG_DIR = Path("logs/search_actions")
+RESULT_LOG_PREVIEW = 1000
+
+# 링크 생성 액션 (원본과 디스크 공간을 공유하는 부분 데이터셋 만들기)
+LINK_ACTIONS = ('hardlink', 'reflink')
+_LINK_LOG_LABELS = {'hardlink': "하드링크", 'reflink': "리플링크", 'copy': "복사"}
+
+
 class FileEntry:
-    """검색 결과 단일 항목"""
-    def __init__(self, image_path: Optional[Path], txt_path: Optional[Path]):
+    """
+    검색 결과 단일 항목.
+    용량/해상도/태그 내용은 처음 접근할 때 한 번만 디스크에서 읽고 캐시한다.
+    """
+    def __init__(self, image_path: Optional[Path], txt_path: Optional[Path],
+                 size: Optional[int] = None):
         self.image_path: Optional[Path] = image_path
         self.txt_path: Optional[Path] = txt_path
+        self._size: Optional[int] = size  # 스캔 시 stat 결과가 있으면 재사용
+        self._resolution = _UNSET
+        self._tag_content: Optional[str] = None
+        self._tags: Optional[List[str]] = None
+        self.distance: Optional[int] = None  # 유사 이미지 검색 시 기준 이미지와의 dHash 거리
+        self._caption_stats: Optional[Tuple[int, int, int, int]] = None
 
     @property
     def display_name(self) -> str:
@@ -44,11 +111,13 @@ class FileEntry:
     @property
     def file_size_bytes(self) -> int:
         """이미지 파일 크기(바이트). 이미지 없으면 txt 크기."""
-        target = self.image_path if self.image_path else self.txt_path
-        try:
-            return target.stat().st_size if target and target.exists() else 0
-        except Exception:
-            return 0
+        if self._size is None:
+            target = self.image_path if self.image_path else self.txt_path
+            try:
+                self._size = target.stat().st_size if target else 0
+            except Exception:
+                self._size = 0
+        return self._size
 
     @property
     def file_size_kb(self) -> float:
@@ -57,31 +126,55 @@ class FileEntry:
     @property
     def resolution(self) -> Optional[Tuple[int, int]]:
         """이미지 해상도 (w, h). 이미지 없거나 읽기 실패 시 None."""
-        if not self.image_path or not self.image_path.exists():
-            return None
-        try:
-            with Image.open(self.image_path) as img:
-                return img.size  # (width, height)
-        except Exception:
-            return None
+        if self._resolution is _UNSET:
+            res = None
+            if self.image_path:
+                try:
+                    with Image.open(self.image_path) as img:
+                        res = img.size  # (width, height)
+                except Exception:
+                    res = None
+            self._resolution = res
+        return self._resolution
 
     @property
     def tag_content(self) -> str:
         """txt 파일 내용 전체. 없으면 빈 문자열."""
-        if not self.txt_path or not self.txt_path.exists():
-            return ""
-        try:
-            return self.txt_path.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            return ""
+        if self._tag_content is None:
+            content = ""
+            if self.txt_path:
+                try:
+                    content = self.txt_path.read_text(encoding="utf-8", errors="ignore")
+                except Exception:
+                    content = ""
+            self._tag_content = content
+        return self._tag_content
 
     @property
     def tags(self) -> List[str]:
         """쉼표 구분 태그 리스트 (공백 정리, 소문자화)."""
-        content = self.tag_content
-        if not content.strip():
-            return []
-        return [t.strip().lower() for t in content.split(",") if t.strip()]
+        if self._tags is None:
+            content = self.tag_content
+            if not content.strip():
+                self._tags = []
+            else:
+                self._tags = [t.strip().lower() for t in content.split(",") if t.strip()]
+        return self._tags
+
+    @property
+    def caption_stats(self) -> Tuple[int, int, int, int]:
+        """(태그 수, 글자 수, CLIP 토큰 추정치, 중복 태그 수). 이미 읽은 캡션에서 계산하므로 추가 I/O 없음."""
+        if self._caption_stats is None:
+            self._caption_stats = caption_stats(self.tag_content, self.tags)
+        return self._caption_stats
+
+    def snapshot(self) -> Tuple:
+        """표시용 값 (용량, 해상도, 캡션 원문, 캡션 통계). 저장된 검색이 변하지 않은 항목을 다시 읽지 않도록 보관"""
+        return (self.file_size_bytes, self.resolution, self.tag_content, self.caption_stats)
+
+    def restore(self, snapshot: Tuple):
+        """snapshot() 값을 캐시에 채움 (디스크 I/O 없음)"""
+        self._size, self._resolution, self._tag_content, self._caption_stats = snapshot
 
     def has_image(self) -> bool:
         return self.image_path is not None and self.image_path.exists()
@@ -90,6 +183,188 @@ class FileEntry:
         return self.txt_path is not None and self.txt_path.exists()
 
 
+class SearchTable:
+    """
+    검색 결과를 컬럼 단위로 보관하는 테이블 (한 번만 계산된 값).
+    화면 표시와 정렬은 이 테이블만 읽으며 디스크에 다시 접근하지 않는다.
+
+    컬럼:
+      entries  - FileEntry (경로 정보, 파일 처리용)
+      size     - array('q') 파일 크기(바이트)
+      width    - array('i') 이미지 너비 (없으면 NO_RESOLUTION)
+      height   - array('i') 이미지 높이 (없으면 NO_RESOLUTION)
+      tags     - 태그 리스트
+      captions - txt 원문
+      distance - array('i') 유사 이미지 검색의 dHash 거리 (없으면 NO_DISTANCE)
+      tag_count / char_count / token_count / dup_tags
+               - array('i') 캡션 통계 (태그 수, 글자 수, CLIP 토큰 추정치, 중복 태그 수)
+    정렬은 sort_order()가 위 컬럼으로 만든 키 컬럼(SORT_KEYS)만 사용한다.
+    """
+    SORT_KEYS = ('name', 'ext', 'folder', 'size', 'pixels', 'caption',
+                 'tag_count', 'char_count', 'token_count', 'dup_tags', 'distance')
+
+    def __init__(self):
+        self.entries: List[FileEntry] = []
+        self.size = array('q')
+        self.width = array('i')
+        self.height = array('i')
+        self.tags: List[List[str]] = []
+        self.captions: List[str] = []
+        self.distance = array('i')
+        self.tag_count = array('i')
+        self.char_count = array('i')
+        self.token_count = array('i')
+        self.dup_tags = array('i')
+        self._sort_keys: Dict[str, list] = {}   # 정렬 키 캐시 (sort_key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def append(self, entry: FileEntry):
+        """FileEntry의 캐시된 값을 한 행으로 추가"""
+        res = entry.resolution
+        self.entries.append(entry)
+        self.size.append(entry.file_size_bytes)
+        self.width.append(res[0] if res else NO_RESOLUTION)
+        self.height.append(res[1] if res else NO_RESOLUTION)
+        self.tags.append(entry.tags)
+        self.captions.append(entry.tag_content)
+        self.distance.append(NO_DISTANCE if entry.distance is None else entry.distance)
+        n_tags, n_chars, n_tokens, n_dups = entry.caption_stats
+        self.tag_count.append(n_tags)
+        self.char_count.append(n_chars)
+        self.token_count.append(n_tokens)
+        self.dup_tags.append(n_dups)
+
+    def extend(self, other: "SearchTable"):
+        """다른 테이블의 행을 뒤에 이어 붙임 (스트리밍 배치 누적용)"""
+        self.entries.extend(other.entries)
+        self.size.extend(other.size)
+        self.width.extend(other.width)
+        self.height.extend(other.height)
+        self.tags.extend(other.tags)
+        self.captions.extend(other.captions)
+        self.distance.extend(other.distance)
+        self.tag_count.extend(other.tag_count)
+        self.char_count.extend(other.char_count)
+        self.token_count.extend(other.token_count)
+        self.dup_tags.extend(other.dup_tags)
+
+    def resolution(self, idx: int) -> Optional[Tuple[int, int]]:
+        w = self.width[idx]
+        return None if w == NO_RESOLUTION else (w, self.height[idx])
+
+    def size_kb(self, idx: int) -> float:
+        return round(self.size[idx] / 1024, 1)
+
+    def subset(self, indices: Iterable[int]) -> "SearchTable":
+        """지정한 행 순서대로 새 테이블 생성 (필터링/정렬 결과 반영용). 계산해 둔 정렬 키도 함께 옮긴다."""
+        indices = list(indices)
+        table = SearchTable()
+        table.entries = list(map(self.entries.__getitem__, indices))
+        table.size = array('q', map(self.size.__getitem__, indices))
+        table.width = array('i', map(self.width.__getitem__, indices))
+        table.height = array('i', map(self.height.__getitem__, indices))
+        table.tags = list(map(self.tags.__getitem__, indices))
+        table.captions = list(map(self.captions.__getitem__, indices))
+        table.distance = array('i', map(self.distance.__getitem__, indices))
+        table.tag_count = array('i', map(self.tag_count.__getitem__, indices))
+        table.char_count = array('i', map(self.char_count.__getitem__, indices))
+        table.token_count = array('i', map(self.token_count.__getitem__, indices))
+        table.dup_tags = array('i', map(self.dup_tags.__getitem__, indices))
+        table._sort_keys = {name: list(map(keys.__getitem__, indices))
+                            for name, keys in self._sort_keys.items()}
+        return table
+
+    # ── 정렬 ─────────────────────────────────────────────────────────
+
+    def sort_key(self, name: str) -> list:
+        """
+        정렬 키 컬럼 (SORT_KEYS 중 하나). 이미 보관된 컬럼에서 처음 요청될 때 한 번만 만들고 캐시.
+        디스크를 읽지 않으며, 행이 추가되면 캐시를 버린다.
+        """
+        keys = self._sort_keys.get(name)
+        if keys is None or len(keys) != len(self.entries):
+            if name in ('name', 'folder'):
+                # Path.stem/parent 대신 문자열 연산 (20만 행 기준 수 배 빠름)
+                paths = [str(e.image_path or e.txt_path or "") for e in self.entries]
+                if name == 'name':
+                    keys = [os.path.splitext(os.path.basename(p))[0].lower() for p in paths]
+                else:
+                    keys = [os.path.dirname(p).lower() for p in paths]
+            elif name == 'ext':
+                keys = [e.image_ext for e in self.entries]
+            elif name == 'caption':
+                keys = [c.lower() for c in self.captions]
+            elif name == 'pixels':
+                keys = [w * h if w != NO_RESOLUTION else 0 for w, h in zip(self.width, self.height)]
+            elif name == 'distance':
+                # 거리가 없는 행은 항상 뒤로
+                keys = [d if d != NO_DISTANCE else 1 << 30 for d in self.distance]
+            else:
+                keys = list(getattr(self, name))
+            self._sort_keys[name] = keys
+        return keys
+
+    def sort_order(self, keys: List[Tuple[str, bool]]) -> List[int]:
+        """
+        [(키 이름, 내림차순 여부), ...] 순서(앞이 우선)로 정렬한 행 순서(new → old).
+        뒤쪽 키부터 안정 정렬을 반복하는 lexsort 방식이며, 키가 같으면 현재 순서를 유지한다.
+        """
+        order = list(range(len(self.entries)))
+        for name, reverse in reversed(keys):
+            order.sort(key=self.sort_key(name).__getitem__, reverse=reverse)
+        return order
+
+
+def _materialize_entry(entry: FileEntry) -> FileEntry:
+    """워커 스레드에서 용량/해상도/태그를 읽어 캐시에 채움 (캡션 통계도 같은 읽기에서 계산)"""
+    _ = entry.file_size_bytes
+    _ = entry.resolution
+    _ = entry.caption_stats
+    return entry
+
+
+def materialize_table(
+    entries: List[FileEntry],
+    num_cores: int = 1,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    stop_event: Optional[threading.Event] = None,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> Optional[SearchTable]:
+    """
+    FileEntry 목록을 SearchTable로 변환.
+    디스크 I/O(이미지 헤더, txt 읽기)는 num_cores개의 스레드에서 병렬로 한 번만 수행.
+    executor가 주어지면 새 스레드 풀을 만들지 않고 재사용 (스트리밍 검색의 배치 처리용).
+    중지 시 None 반환.
+    """
+    total = len(entries)
+    if executor is not None or (num_cores > 1 and total > 1):
+        own_executor = executor is None
+        ex = concurrent.futures.ThreadPoolExecutor(max_workers=num_cores) if own_executor else executor
+        try:
+            for done, _ in enumerate(ex.map(_materialize_entry, entries), 1):
+                if stop_event and stop_event.is_set():
+                    return None
+                if progress_callback and (done % 200 == 0 or done == total):
+                    progress_callback(done, total)
+        finally:
+            if own_executor:
+                ex.shutdown(wait=not (stop_event and stop_event.is_set()), cancel_futures=True)
+    else:
+        for done, entry in enumerate(entries, 1):
+            if stop_event and stop_event.is_set():
+                return None
+            _materialize_entry(entry)
+            if progress_callback and (done % 200 == 0 or done == total):
+                progress_callback(done, total)
+
+    table = SearchTable()
+    for entry in entries:
+        table.append(entry)
+    return table
+
+
 # ------------------------------------------------------------------
 # 검색 조건 적용 로직
 # ------------------------------------------------------------------
@@ -99,11 +374,6 @@ def _parse_tag_query(query_str: str) -> List[str]:
     return [t.strip().lower() for t in query_str.split("|") if t.strip()]
 
 
-def _match_filename(entry: FileEntry, pattern: str) -> bool:
-    """파일명에 패턴(대소문자 무시) 포함 여부"""
-    return pattern.lower() in entry.stem.lower()
-
-
 def _match_size(entry: FileEntry, min_kb: Optional[float], max_kb: Optional[float]) -> bool:
     size = entry.file_size_kb
     if min_kb is not None and size < min_kb:
@@ -153,213 +423,493 @@ def _match_tags_all(entry: FileEntry, query_tags: List[str]) -> bool:
     return all(qt in entry_tags for qt in query_tags)
 
 
+def _match_similar(entry: FileEntry, query_hash: Optional[int], max_distance: int) -> bool:
+    """이미지의 dHash가 기준 해시와 max_distance 이하로 다르면 True (거리는 entry.distance에 기록)"""
+    if query_hash is None or entry.image_path is None:
+        return False
+    value = hash_image(str(entry.image_path))
+    if value is None:
+        return False
+    dist = (value ^ query_hash).bit_count()
+    if dist > max_distance:
+        return False
+    entry.distance = dist if entry.distance is None else min(entry.distance, dist)
+    return True
+
+
 # ------------------------------------------------------------------
 # 조건 평가 (AND / OR / NOT / 미사용)
 # ------------------------------------------------------------------
 
-def _evaluate_condition(entry: FileEntry, condition: Dict) -> bool:
+def _all_conditions_unused(conditions: List[Dict]) -> bool:
+    return all(c.get('mode', 'unused') == 'unused' for c in conditions)
+
+
+def entry_passes_filter(entry: FileEntry, conditions: List[Dict]) -> bool:
+    """
+    conditions 리스트를 평가하여 항목이 필터를 통과하는지 반환.
+
+    로직:
+    - 미사용 조건은 평가에서 제외.
+    - AND 조건 중 하나라도 False → 전체 False.
+    - NOT 조건 중 하나라도 False (즉 매칭됨) → 전체 False.
+    - 활성 조건이 AND/NOT만 있고 모두 통과하면 → True.
+    - OR 조건이 하나라도 있는 경우:
+        AND/NOT 모두 통과 AND OR 중 하나 이상 통과 → True.
+        활성 조건이 OR만 있는 경우 → OR 중 하나라도 통과하면 True.
+
+    여러 항목을 검사할 때는 SearchPlan으로 한 번 컴파일해 재사용하는 편이 빠르다.
+    """
+    return SearchPlan(conditions).matches(entry)
+
+
+# ------------------------------------------------------------------
+# 검색 계획 (비용 순 조건 평가)
+# ------------------------------------------------------------------
+
+# 조건 유형별 평가 비용 (작을수록 먼저 평가)
+#   filename   : 경로 문자열만 사용
+#   size       : 스캔 시 stat 결과 재사용
+#   tag        : txt 파일 읽기 (태그 색인 사용 시 집합 조회 → 파일명 다음 순위)
+#   resolution : 이미지 파일 헤더 열기
+#   similar    : 이미지 전체 디코딩 + dHash (해시 색인 사용 시 집합 조회)
+_CONDITION_COST = {'filename': 0, 'size': 1, 'tag': 2, 'resolution': 3, 'similar': 4}
+_INDEXED_TAG_COST = 0.5
+
+
+def _compile_indexed_tag(condition: Dict, index: SearchIndex) -> Callable[[FileEntry], bool]:
+    """태그 조건을 색인의 posting 집합 연산으로 미리 풀어 두고 항목은 키 조회만 수행"""
+    mode = condition.get('mode', 'unused')
+    query_tags = _parse_tag_query(condition.get('query', ''))
+    if not query_tags:
+        return lambda entry: True
+    if mode == 'or':
+        doc_ids = index.docs_with_any(query_tags)
+    else:
+        doc_ids = index.docs_with_all(query_tags)
+    keys = {index.keys[d] for d in doc_ids}
+
+    def match(entry: FileEntry) -> bool:
+        return entry.txt_path is not None and index.key_for(str(entry.txt_path)) in keys
+
+    if mode == 'not':
+        return lambda entry: not match(entry)
+    return match
+
+
+def _compile_condition(condition: Dict, index: Optional[SearchIndex] = None) -> Callable[[FileEntry], bool]:
     """
+    단일 조건을 entry -> bool 함수로 컴파일.
     condition 구조:
     {
       'mode': 'unused' | 'and' | 'or' | 'not',
-      'type': 'filename' | 'size' | 'resolution' | 'tag',
+      'type': 'filename' | 'size' | 'resolution' | 'tag' | 'similar',
       ... (type별 파라미터)
     }
-    미사용이면 항상 True 반환.
+    태그 쿼리 파싱, 기준 이미지 해시 등 항목과 무관한 준비 작업은 여기서 한 번만 수행한다.
     """
     mode = condition.get('mode', 'unused')
-    if mode == 'unused':
-        return True  # 이 조건은 평가에 참여 안 함 → 기여 없음
-
     ctype = condition.get('type')
 
+    if ctype == 'tag' and index is not None:
+        return _compile_indexed_tag(condition, index)
+
+    if ctype == 'similar' and 'hits' in condition:
+        # iter_search가 해시 색인으로 미리 구한 {이미지 경로: 거리}
+        hits = condition['hits']
+        match = lambda entry: entry.image_path is not None and str(entry.image_path) in hits
+        if mode == 'not':
+            return lambda entry: not match(entry)
+        return match
+
     if ctype == 'filename':
-        pattern = condition.get('pattern', '')
+        pattern = condition.get('pattern', '').lower()
         if not pattern:
-            return True
-        matched = _match_filename(entry, pattern)
+            return lambda entry: True
+        match = lambda entry: pattern in entry.stem.lower()
 
     elif ctype == 'size':
-        matched = _match_size(
-            entry,
-            condition.get('min_kb'),
-            condition.get('max_kb'),
-        )
+        min_kb = condition.get('min_kb')
+        max_kb = condition.get('max_kb')
+        match = lambda entry: _match_size(entry, min_kb, max_kb)
 
     elif ctype == 'resolution':
-        matched = _match_resolution(
-            entry,
-            condition.get('min_w'),
-            condition.get('max_w'),
-            condition.get('min_h'),
-            condition.get('max_h'),
-        )
+        bounds = (condition.get('min_w'), condition.get('max_w'),
+                  condition.get('min_h'), condition.get('max_h'))
+        match = lambda entry: _match_resolution(entry, *bounds)
 
     elif ctype == 'tag':
         query_tags = _parse_tag_query(condition.get('query', ''))
         if not query_tags:
-            return True
-        # OR 모드일 때 → 하나라도 포함
-        # AND / NOT 모드일 때 → 모두 포함 여부로 판단
+            return lambda entry: True
         if mode == 'or':
-            matched = _match_tags(entry, query_tags)
+            match = lambda entry: _match_tags(entry, query_tags)
         else:
-            matched = _match_tags_all(entry, query_tags)
+            match = lambda entry: _match_tags_all(entry, query_tags)
+
+    elif ctype == 'similar':
+        if not condition.get('image'):
+            return lambda entry: True
+        query_hash = hash_image(condition['image'])
+        max_distance = condition.get('max_distance', DEFAULT_MAX_DISTANCE)
+        match = lambda entry: _match_similar(entry, query_hash, max_distance)
     else:
-        return True
+        return lambda entry: True
 
     if mode == 'not':
-        return not matched
-    return matched  # 'and' 또는 'or'
-
-
-def _all_conditions_unused(conditions: List[Dict]) -> bool:
-    return all(c.get('mode', 'unused') == 'unused' for c in conditions)
+        return lambda entry: not match(entry)
+    return match
 
 
-def entry_passes_filter(entry: FileEntry, conditions: List[Dict]) -> bool:
+class SearchPlan:
     """
-    conditions 리스트를 평가하여 항목이 필터를 통과하는지 반환.
-
-    로직:
-    - 미사용 조건은 평가에서 제외.
-    - AND 조건 중 하나라도 False → 전체 False.
-    - NOT 조건 중 하나라도 False (즉 매칭됨) → 전체 False.
-    - 활성 조건이 AND/NOT만 있고 모두 통과하면 → True.
-    - OR 조건이 하나라도 있는 경우:
-        AND/NOT 모두 통과 AND OR 중 하나 이상 통과 → True.
-        활성 조건이 OR만 있는 경우 → OR 중 하나라도 통과하면 True.
+    조건 리스트를 비용 순으로 정렬해 컴파일한 검색 계획.
+    AND/NOT 조건은 싼 것부터 평가하다 하나라도 실패하면 즉시 중단하고,
+    OR 조건도 싼 것부터 평가하다 하나라도 통과하면 중단한다.
+    따라서 해상도(이미지 열기)나 태그(txt 읽기)는 앞선 조건을 통과한 항목에 대해서만 읽힌다.
+    tag_index가 주어지면 태그 조건은 캡션을 읽지 않고 색인으로 평가한다.
+    유사 이미지 조건에 'hits'(해시 색인 조회 결과)가 있으면 이미지를 열지 않고 집합 조회로 평가한다.
     """
-    active = [c for c in conditions if c.get('mode', 'unused') != 'unused']
-    if not active:
-        return True  # 조건 없음 → 전부 통과
-
-    and_not_conds = [c for c in active if c.get('mode') in ('and', 'not')]
-    or_conds = [c for c in active if c.get('mode') == 'or']
-
-    # AND / NOT 조건 평가
-    for cond in and_not_conds:
-        if not _evaluate_condition(entry, cond):
+    def __init__(self, conditions: List[Dict], tag_index: Optional[SearchIndex] = None):
+        active = [c for c in conditions if c.get('mode', 'unused') != 'unused']
+
+        def by_cost(c):
+            if c.get('type') == 'tag' and tag_index is not None:
+                return _INDEXED_TAG_COST
+            if c.get('type') == 'similar' and 'hits' in c:
+                return _INDEXED_TAG_COST
+            return _CONDITION_COST.get(c.get('type'), 0)
+
+        and_not_conds = sorted((c for c in active if c.get('mode') in ('and', 'not')), key=by_cost)
+        or_conds = sorted((c for c in active if c.get('mode') == 'or'), key=by_cost)
+
+        self.is_empty = not active
+        self.required = [_compile_condition(c, tag_index) for c in and_not_conds]
+        self.any_of = [_compile_condition(c, tag_index) for c in or_conds]
+        # 디스크 I/O가 필요한 조건이 있는지 (병렬 평가 여부 판단용)
+        io_types = ('resolution',) if tag_index is not None else ('tag', 'resolution')
+        self.needs_io = any(c.get('type') in io_types or (c.get('type') == 'similar' and 'hits' not in c)
+                            for c in active)
+
+    def matches(self, entry: FileEntry) -> bool:
+        for pred in self.required:
+            if not pred(entry):
+                return False
+        if self.any_of:
+            for pred in self.any_of:
+                if pred(entry):
+                    return True
             return False
-
-    # OR 조건 평가
-    if or_conds:
-        return any(_evaluate_condition(entry, cond) for cond in or_conds)
-
-    return True  # AND/NOT 조건만 있고 모두 통과
+        return True
 
 
 # ------------------------------------------------------------------
 # 스캔 및 검색
 # ------------------------------------------------------------------
 
-def _collect_entries(folder: Path, recursive: bool) -> List[FileEntry]:
-    """폴더 내 이미지 파일 기준으로 FileEntry 목록 수집."""
-    entries = []
-    iter_fn = folder.rglob if recursive else folder.iterdir
-
-    seen_stems = set()
+def _iter_folder_entries(folder: Path, recursive: bool,
+                         captions: Optional[List[Tuple[str, float]]] = None,
+                         images: Optional[List[Tuple[str, float]]] = None) -> Iterator[List[FileEntry]]:
+    """
+    폴더를 os.scandir로 한 번만 순회하며 디렉터리 단위로 FileEntry 목록을 생성 (이미지 → orphan txt 순).
+    스캔 중 얻은 stat 크기를 FileEntry에 미리 채우고
+    짝 txt 존재 여부도 같은 폴더의 파일명 집합으로 확인한다 (추가 stat 없음).
+    captions 리스트가 주어지면 모든 .txt의 (경로, mtime)을 담는다 (태그 색인 갱신용).
+    images 리스트가 주어지면 모든 이미지의 (경로, mtime)을 담는다 (메타데이터 색인 갱신용).
+    """
+    stack = [str(folder)]
 
-    # 이미지 기준으로 수집
-    for f in iter_fn("*") if recursive else folder.iterdir():
-        if not f.is_file():
-            continue
-        if is_image_file(f):
-            txt = f.with_suffix(TEXT_EXTENSION)
-            entry = FileEntry(
-                image_path=f,
-                txt_path=txt if txt.exists() else None,
-            )
-            entries.append(entry)
-            seen_stems.add((f.parent, f.stem))
-
-    # txt만 있는 파일도 수집 (이미지 없는 orphan txt)
-    for f in (folder.rglob("*") if recursive else folder.iterdir()):
-        if not f.is_file():
+    while stack:
+        current = stack.pop()
+        files = {}  # 파일명 -> 크기
+        try:
+            with os.scandir(current) as it:
+                for item in it:
+                    try:
+                        # 디렉터리 심볼릭 링크는 따라가지 않음 (상위 폴더를 가리키면 무한 재귀, rglob과 동일)
+                        if item.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(item.path)
+                        elif item.is_file():
+                            st = item.stat()
+                            files[item.name] = st.st_size
+                            if captions is not None or images is not None:
+                                ext = os.path.splitext(item.name)[1].lower()
+                                if captions is not None and ext == TEXT_EXTENSION:
+                                    captions.append((item.path, st.st_mtime))
+                                elif images is not None and ext in IMAGE_EXTENSIONS:
+                                    images.append((item.path, st.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
             continue
-        if is_text_file(f):
-            key = (f.parent, f.stem)
-            if key not in seen_stems:
-                entry = FileEntry(image_path=None, txt_path=f)
-                entries.append(entry)
 
+        parent = Path(current)
+        batch = []
+        # 짝 txt는 대소문자 구분 없이 찾는다 (a.PNG ↔ a.txt, A.png ↔ a.TXT). 정확히 같은 이름이 있으면 그것을 우선
+        lower_names = {}
+        for name in files:
+            lower_names.setdefault(name.lower(), name)
+        paired_txt = set()
+        for name, size in files.items():
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            txt_name = os.path.splitext(name)[0] + TEXT_EXTENSION
+            if txt_name not in files:
+                txt_name = lower_names.get(txt_name.lower())
+            if txt_name is not None:
+                paired_txt.add(txt_name)
+            batch.append(FileEntry(
+                image_path=parent / name,
+                txt_path=parent / txt_name if txt_name is not None else None,
+                size=size,
+            ))
+
+        # txt만 있는 파일도 수집 (이미지 없는 orphan txt)
+        for name, size in files.items():
+            if os.path.splitext(name)[1].lower() == TEXT_EXTENSION and name not in paired_txt:
+                batch.append(FileEntry(image_path=None, txt_path=parent / name, size=size))
+
+        if batch:
+            yield batch
+
+
+def collect_entries(folder: Path, recursive: bool,
+                     captions: Optional[List[Tuple[str, float]]] = None,
+                     images: Optional[List[Tuple[str, float]]] = None) -> List[FileEntry]:
+    """폴더 전체를 스캔해 FileEntry 목록으로 반환 (태그 색인 갱신처럼 전체 목록이 먼저 필요할 때)"""
+    entries = []
+    for batch in _iter_folder_entries(folder, recursive, captions, images):
+        entries.extend(batch)
     return entries
 
 
-def search_files(
+def _chunked(batches: Iterable[List[FileEntry]], size: int) -> Iterator[List[FileEntry]]:
+    """디렉터리 단위 배치를 약 size개씩 다시 묶음"""
+    pending = []
+    for batch in batches:
+        pending.extend(batch)
+        if len(pending) >= size:
+            yield pending
+            pending = []
+    if pending:
+        yield pending
+
+
+def _resolve_similar(conditions: List[Dict], folder: Path, images: List[Tuple[str, float]],
+                     recursive: bool, num_cores: int,
+                     progress_callback: Optional[Callable[[int, int], None]],
+                     stop_event: Optional[threading.Event]) -> Optional[List[Dict]]:
+    """
+    유사 이미지 조건을 해시 색인(HashIndex)으로 미리 풀어 'hits'({이미지 경로: 거리})를 채운 조건 목록 반환.
+    바뀐 이미지의 해시만 다시 계산하며, 중지 시에도 계산한 해시는 저장하고 None 반환.
+    """
+    hash_index = HashIndex.load(str(folder))
+    refreshed = hash_index.refresh(images, recursive, num_cores, progress_callback, stop_event)
+    hash_index.save()
+    if refreshed < 0:
+        return None
+
+    resolved = []
+    for cond in conditions:
+        if _is_active_similar(cond):
+            query_hash = hash_index.hash_of(cond['image'])
+            hits = {}
+            if query_hash is None:
+                print(f"기준 이미지를 읽을 수 없습니다: {cond['image']}")
+            else:
+                max_distance = cond.get('max_distance', DEFAULT_MAX_DISTANCE)
+                for dist, file_id in hash_index.nearest(query_hash, max_distance):
+                    hits[hash_index.path_for(file_id)] = dist
+            cond = dict(cond, hits=hits)
+        resolved.append(cond)
+    return resolved
+
+
+def _is_active_similar(condition: Dict) -> bool:
+    return (condition.get('type') == 'similar' and condition.get('mode', 'unused') != 'unused'
+            and bool(condition.get('image')))
+
+
+def iter_search(
     folder_path: str,
     recursive: bool,
     conditions: List[Dict],
     num_cores: int = 1,
     progress_callback: Optional[Callable[[int, int], None]] = None,
     stop_event: Optional[threading.Event] = None,
-) -> List[FileEntry]:
+    use_tag_index: bool = False,
+    query: Optional[CompiledQuery] = None,
+    batch_size: int = SEARCH_BATCH_SIZE,
+) -> Iterator[SearchTable]:
     """
-    조건에 맞는 FileEntry 목록 반환.
-    num_cores > 1 이면 ThreadPoolExecutor로 병렬 해상도 캐시 처리.
+    조건에 맞는 항목을 SearchTable 배치로 차례대로 생성하는 스트리밍 검색.
+    스캔 → (쿼리) → 조건 계획 → 표시용 컬럼 계산을 batch_size개 단위로 흘려보내므로
+    첫 결과가 전체 스캔을 기다리지 않고 나온다.
+    색인/쿼리를 쓰지 않으면 폴더 스캔 자체도 배치와 함께 진행되며,
+    태그 색인이 필요하면 전체 캡션 목록으로 색인을 먼저 갱신한 뒤 배치 처리한다.
+
+    조건은 SearchPlan으로 컴파일되어 싼 조건(파일명 → 용량 → 태그 → 해상도) 순으로
+    항목마다 평가되며, 비싼 속성은 앞 조건을 통과한 항목에 대해서만 읽는다.
+    query(CompiledQuery)가 주어지면 색인을 항상 사용하고, 배치마다 쿼리로 먼저 행을 거른 뒤 조건을 적용(AND).
+    쿼리에 AI 생성 정보 필드가 있으면 메타데이터 색인(MetadataIndex)도 바뀐 이미지만 다시 읽어 갱신한다.
+    유사 이미지 조건이 있으면 해시 색인(HashIndex)으로 기준 이미지와의 거리를 먼저 구하고,
+    AND 모드에서는 해당 이미지만 거리 순으로 처리해 결과가 가까운 순서로 나온다.
+    progress_callback(처리한 항목 수, 전체 항목 수)에서 전체 수를 아직 모르면 0을 전달.
+    중지 시 그때까지 생성한 배치는 유효하며, 진행 중이던 배치는 버리고 종료한다.
     """
-    folder = Path(folder_path)
+    folder = Path(os.path.abspath(folder_path))
     if not folder.exists():
-        return []
+        return
 
-    entries = _collect_entries(folder, recursive)
-    total = len(entries)
-    if total == 0:
-        return []
+    if query is not None:
+        use_tag_index = True
+
+    if use_tag_index or any(_is_active_similar(c) for c in conditions):
+        captions, images = [], []
+        entries = collect_entries(folder, recursive, captions, images)
+        yield from iter_search_entries(str(folder), entries, captions, images, recursive, conditions,
+                                       num_cores, progress_callback, stop_event, use_tag_index,
+                                       query, batch_size)
+    else:
+        # 스캔과 동시에 진행하므로 전체 수를 미리 알 수 없음 (total=0)
+        chunks = _chunked(_iter_folder_entries(folder, recursive), batch_size)
+        yield from _iter_batches(chunks, 0, SearchPlan(conditions), num_cores, progress_callback, stop_event)
 
-    # 해상도 조건이 있으면 미리 읽어야 하므로 병렬 처리
-    needs_resolution = any(
-        c.get('type') == 'resolution' and c.get('mode', 'unused') != 'unused'
-        for c in conditions
-    )
-
-    if needs_resolution and num_cores > 1:
-        def _preload_res(e: FileEntry):
-            _ = e.resolution  # 캐시 없이 그냥 호출 (PIL 열기)
-            return e
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_cores) as ex:
-            futures = {ex.submit(_preload_res, e): i for i, e in enumerate(entries)}
-            done = 0
-            for fut in concurrent.futures.as_completed(futures):
-                if stop_event and stop_event.is_set():
-                    ex.shutdown(wait=False, cancel_futures=True)
-                    return []
-                done += 1
-                if progress_callback:
-                    progress_callback(done, total)
 
-    results = []
-    for i, entry in enumerate(entries):
-        if stop_event and stop_event.is_set():
-            break
-        if entry_passes_filter(entry, conditions):
-            results.append(entry)
-        if progress_callback and not needs_resolution:
-            progress_callback(i + 1, total)
+def iter_search_entries(
+    folder_path: str,
+    entries: List[FileEntry],
+    captions: List[Tuple[str, float]],
+    images: List[Tuple[str, float]],
+    recursive: bool,
+    conditions: List[Dict],
+    num_cores: int = 1,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    stop_event: Optional[threading.Event] = None,
+    use_tag_index: bool = False,
+    query: Optional[CompiledQuery] = None,
+    batch_size: int = SEARCH_BATCH_SIZE,
+) -> Iterator[SearchTable]:
+    """
+    이미 스캔한 항목 목록에 대해 iter_search와 같은 평가를 수행.
+    captions/images는 폴더 전체의 (경로, mtime) 목록으로 색인 갱신에 쓰이며,
+    entries는 그 일부여도 된다 (저장된 검색의 증분 재실행처럼 바뀐 항목만 평가할 때).
+    """
+    folder = Path(os.path.abspath(folder_path))
+    if query is not None:
+        use_tag_index = True
+    if not entries:
+        return
+
+    tag_index = None
+    if use_tag_index:
+        tag_index = SearchIndex.load(str(folder))
+        if tag_index.refresh(captions, recursive, num_cores, progress_callback, stop_event) < 0:
+            return
+        tag_index.save()
+
+    if any(_is_active_similar(c) for c in conditions):
+        conditions = _resolve_similar(conditions, folder, images, recursive, num_cores,
+                                      progress_callback, stop_event)
+        if conditions is None:
+            return
+        distances = {}
+        for cond in conditions:
+            for path, dist in cond.get('hits', {}).items():
+                distances[path] = min(dist, distances.get(path, dist))
+        for entry in entries:
+            if entry.image_path is not None:
+                entry.distance = distances.get(str(entry.image_path))
+        if any(_is_active_similar(c) and c['mode'] == 'and' for c in conditions):
+            # 기준 이미지와 가까운 항목만 거리 순으로 처리
+            entries = sorted((e for e in entries if e.distance is not None), key=lambda e: e.distance)
+
+    meta_index = None
+    if query is not None and query.uses_metadata:
+        meta_index = MetadataIndex(str(folder)).open()
+        if meta_index.refresh(images, recursive, num_cores, progress_callback, stop_event) < 0:
+            meta_index.close()
+            return
+
+    try:
+        if query is not None:
+            # 쿼리는 전체 항목에 대해 한 번만 평가 (청크마다 평가하면 posting/어휘를 매번 다시 훑음)
+            rows = QueryEvaluator(entries, tag_index, str(folder), num_cores, stop_event,
+                                  progress_callback, meta_index=meta_index).run(query)
+            if stop_event and stop_event.is_set():
+                return
+            entries = [entries[r] for r in rows]
+
+        total = len(entries)
+        chunks = (entries[i:i + batch_size] for i in range(0, total, batch_size))
+        yield from _iter_batches(chunks, total, SearchPlan(conditions, tag_index),
+                                 num_cores, progress_callback, stop_event)
+    finally:
+        if meta_index is not None:
+            meta_index.close()
+
+
+def _iter_batches(chunks: Iterable[List[FileEntry]], total: int, plan: SearchPlan, num_cores: int,
+                  progress_callback: Optional[Callable[[int, int], None]],
+                  stop_event: Optional[threading.Event]) -> Iterator[SearchTable]:
+    """청크마다 조건 계획 → 표시용 컬럼 계산을 수행해 통과한 항목을 SearchTable로 생성 (쿼리는 호출 전에 평가)"""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_cores) if num_cores > 1 else None
+    processed = 0
+    try:
+        for chunk in chunks:
+            if stop_event and stop_event.is_set():
+                return
+
+            if plan.is_empty:
+                results = chunk
+            elif plan.needs_io and executor is not None:
+                results = [entry for entry, passed in
+                           zip(chunk, executor.map(plan.matches, chunk, chunksize=32))
+                           if passed]
+            else:
+                results = [entry for entry in chunk if plan.matches(entry)]
+
+            # 통과한 항목만 표시용 컬럼을 채움 (필터링 중 읽은 값은 캐시 재사용)
+            table = materialize_table(results, num_cores, stop_event=stop_event, executor=executor)
+            if table is None or (stop_event and stop_event.is_set()):
+                return
+
+            processed += len(chunk)
+            if progress_callback:
+                progress_callback(processed, total)
+            if len(table):
+                yield table
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
 
-    return results
+def search_files(
+    folder_path: str,
+    recursive: bool,
+    conditions: List[Dict],
+    num_cores: int = 1,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    stop_event: Optional[threading.Event] = None,
+    use_tag_index: bool = False,
+    query: Optional[CompiledQuery] = None,
+) -> SearchTable:
+    """
+    iter_search의 배치를 모두 이어 붙인 SearchTable 반환.
+    중지 시 그때까지 찾은 결과(부분 결과)를 반환.
+    """
+    table = SearchTable()
+    for batch in iter_search(folder_path, recursive, conditions, num_cores,
+                             progress_callback, stop_event, use_tag_index, query):
+        table.extend(batch)
+    return table
 
 
 # ------------------------------------------------------------------
 # 파일 처리 (삭제 / 이동 / 복사)
 # ------------------------------------------------------------------
 
-def _resolve_conflict_path(dest_path: Path) -> Path:
-    """대상 경로가 이미 존재하면 _{n} 접미사를 붙여 고유한 경로 반환."""
-    if not dest_path.exists():
-        return dest_path
-    stem = dest_path.stem
-    suffix = dest_path.suffix
-    parent = dest_path.parent
-    counter = 1
-    while True:
-        new_path = parent / f"{stem}_{counter}{suffix}"
-        if not new_path.exists():
-            return new_path
-        counter += 1
-
-
 def _get_target_files(entry: FileEntry, target_type: str) -> List[Path]:
     """
     target_type: 'both' | 'image' | 'txt'
@@ -373,56 +923,179 @@ def _get_target_files(entry: FileEntry, target_type: str) -> List[Path]:
     return files
 
 
+def _assign_destinations(file_groups: List[List[Path]], dest: Path) -> List[List[Path]]:
+    """
+    대상 폴더의 파일명 집합을 한 번만 읽어 두고, 항목별 대상 경로를 미리 계산.
+    한 항목(이미지 + txt)은 같은 접미사를 공유하도록 모든 파일이 비는 번호를 고른다.
+    (파일마다 exists()를 반복 호출하지 않음)
+    """
+    try:
+        taken = {os.path.normcase(name) for name in os.listdir(dest)}
+    except OSError:
+        taken = set()
+
+    result = []
+    for files in file_groups:
+        names = [f.name for f in files]
+        counter = 0
+        while any(os.path.normcase(n) in taken for n in names):
+            counter += 1
+            names = [f"{f.stem}_{counter}{f.suffix}" for f in files]
+        taken.update(os.path.normcase(n) for n in names)
+        result.append([dest / n for n in names])
+    return result
+
+
+def _open_action_log(action: str):
+    """처리 로그 파일을 열어 (파일, 경로) 반환. 실패 시 (None, None)"""
+    try:
+        ACTION_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = ACTION_LOG_DIR / f"{action}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        return open(path, 'a', encoding='utf-8'), path
+    except OSError as e:
+        print(f"처리 로그 파일 생성 실패: {e}")
+        return None, None
+
+
+def _run_file_action(action: str, src: Path, dst: Optional[Path], same_device: bool) -> Tuple[bool, str]:
+    """파일 하나 처리. (성공 여부, 로그 한 줄) 반환"""
+    try:
+        if action == 'delete':
+            src.unlink()
+            return True, f"[삭제] {src.name}"
+
+        suffix_note = f" → {dst.name}" if dst.name != src.name else ""
+        if action == 'move':
+            if same_device:
+                os.replace(src, dst)  # 같은 장치: 데이터 복사 없이 이름만 변경
+            else:
+                shutil.move(str(src), str(dst))
+            return True, f"[이동] {src.name}{suffix_note}"
+
+        if action in LINK_ACTIONS:
+            # 하드링크는 내용을 공유하므로 편집이 잦은 캡션은 복사 (크기가 작아 공간 부담 없음)
+            if action == 'hardlink' and src.suffix.lower() == TEXT_EXTENSION:
+                shutil.copy2(str(src), str(dst))
+                return True, f"[복사] {src.name}{suffix_note}"
+            used = link_new(str(src), str(dst), action, same_device)
+            note = "" if used == action else " (링크 불가, 복사로 대체)"
+            return True, f"[{_LINK_LOG_LABELS[used]}] {src.name}{suffix_note}{note}"
+
+        shutil.copy2(str(src), str(dst))
+        return True, f"[복사] {src.name}{suffix_note}"
+    except Exception as e:
+        return False, f"[실패] {src.name}: {e}"
+
+
 def process_entries(
     entries: List[FileEntry],
-    action: str,           # 'delete' | 'move' | 'copy'
+    action: str,           # 'delete' | 'move' | 'copy' | 'hardlink' | 'reflink'
     target_type: str,      # 'both' | 'image' | 'txt'
-    dest_folder: str = "", # 이동/복사 시 필요
+    dest_folder: str = "", # 이동/복사/링크 시 필요
+    num_workers: int = 1,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    stop_event: Optional[threading.Event] = None,
 ) -> Tuple[int, int, List[str]]:
     """
     선택된 항목들에 대해 지정한 액션을 수행.
+    - 이동/복사 대상 경로는 대상 폴더 파일명 집합으로 미리 계산 (_assign_destinations)
+    - 같은 장치 간 이동은 os.replace로 처리
+    - hardlink/reflink는 원본과 디스크 공간을 공유하는 파일을 만들고, 다른 장치이거나 지원하지 않으면 복사
+      (hardlink 모드에서 캡션 .txt는 원본 편집이 번지지 않도록 복사)
+    - num_workers개의 스레드로 병렬 처리하되, 진행 중인 작업 수를 제한해 중지 요청에 빠르게 반응
+    - 모든 로그는 logs/search_actions/ 파일에 즉시 기록하고,
+      반환하는 로그 리스트에는 앞부분 RESULT_LOG_PREVIEW줄과 로그 파일 경로만 담는다
     Returns: (성공 수, 실패 수, 로그 메시지 리스트)
     """
     success = 0
     fail = 0
     logs = []
+    omitted = 0
 
-    if action in ('move', 'copy') and dest_folder:
-        dest = Path(dest_folder)
-        dest.mkdir(parents=True, exist_ok=True)
+    log_file, log_path = _open_action_log(action)
+
+    def _log(line: str):
+        nonlocal omitted
+        if log_file:
+            log_file.write(line + "\n")
+        if len(logs) < RESULT_LOG_PREVIEW:
+            logs.append(line)
+        else:
+            omitted += 1
 
+    # 작업 목록: (원본, 대상, 같은 장치 여부)
+    groups = []
     for entry in entries:
         files = _get_target_files(entry, target_type)
         if not files:
-            logs.append(f"[건너뜀] 처리 대상 파일 없음: {entry.display_name}")
+            _log(f"[건너뜀] 처리 대상 파일 없음: {entry.display_name}")
             continue
+        groups.append(files)
 
-        for fpath in files:
-            try:
-                if action == 'delete':
-                    fpath.unlink()
-                    logs.append(f"[삭제] {fpath.name}")
-                    success += 1
-
-                elif action == 'move':
-                    dest_file = _resolve_conflict_path(Path(dest_folder) / fpath.name)
-                    shutil.move(str(fpath), str(dest_file))
-                    moved_name = dest_file.name
-                    suffix_note = f" → {moved_name}" if moved_name != fpath.name else ""
-                    logs.append(f"[이동] {fpath.name}{suffix_note}")
-                    success += 1
-
-                elif action == 'copy':
-                    dest_file = _resolve_conflict_path(Path(dest_folder) / fpath.name)
-                    shutil.copy2(str(fpath), str(dest_file))
-                    copied_name = dest_file.name
-                    suffix_note = f" → {copied_name}" if copied_name != fpath.name else ""
-                    logs.append(f"[복사] {fpath.name}{suffix_note}")
-                    success += 1
-
-            except Exception as e:
-                logs.append(f"[실패] {fpath.name}: {e}")
-                fail += 1
+    tasks = []
+    if action in ('move', 'copy') + LINK_ACTIONS and dest_folder:
+        dest = Path(dest_folder)
+        dest.mkdir(parents=True, exist_ok=True)
+        dest_dev = os.stat(dest).st_dev
+        folder_dev = {}  # 원본 폴더 → 같은 장치 여부 (폴더마다 stat 한 번)
+        for files, targets in zip(groups, _assign_destinations(groups, dest)):
+            for src, dst in zip(files, targets):
+                parent = src.parent
+                if parent not in folder_dev:
+                    try:
+                        folder_dev[parent] = os.stat(parent).st_dev == dest_dev
+                    except OSError:
+                        folder_dev[parent] = False
+                tasks.append((src, dst, folder_dev[parent]))
+    else:
+        tasks = [(src, None, False) for files in groups for src in files]
+
+    total = len(tasks)
+    done = 0
+
+    def _collect(ok: bool, line: str):
+        nonlocal success, fail, done
+        if ok:
+            success += 1
+        else:
+            fail += 1
+        _log(line)
+        done += 1
+        if progress_callback and (done % 100 == 0 or done == total):
+            progress_callback(done, total)
+
+    try:
+        if num_workers > 1 and total > 1:
+            max_pending = num_workers * 4
+            with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as ex:
+                pending = set()
+                task_iter = iter(tasks)
+                while True:
+                    while len(pending) < max_pending and not (stop_event and stop_event.is_set()):
+                        task = next(task_iter, None)
+                        if task is None:
+                            break
+                        pending.add(ex.submit(_run_file_action, action, *task))
+                    if not pending:
+                        break
+                    finished, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for fut in finished:
+                        _collect(*fut.result())
+        else:
+            for task in tasks:
+                if stop_event and stop_event.is_set():
+                    break
+                _collect(*_run_file_action(action, *task))
+
+        if done < total:
+            _log(f"[중지] 사용자 요청으로 중지됨 (미처리 {total - done}개)")
+    finally:
+        if omitted:
+            logs.append(f"... 외 {omitted}줄")
+        if log_file:
+            log_file.close()
+            logs.append(f"[로그] 전체 기록: {log_path}")
 
     return success, fail, logs
 
@@ -2,19 +2,28 @@
 검색 및 분류 탭 UI  (v1.1.6)
 """
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 from PIL import Image, ImageTk
 import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from search_filter import (
+    NO_DISTANCE,
     FileEntry,
-    search_files,
+    SearchTable,
+    iter_search,
     process_entries,
     get_orphan_warning,
 )
+from search_query import QueryError, compile_query
+from hash_index import DEFAULT_MAX_DISTANCE
+from saved_search import SavedSearch, list_saved_searches
 from utils import ScrollableFrame
+from virtual_grid import VirtualGrid
+from thumbnail_grid import ThumbnailGridWindow
+from thumbnail_cache import make_thumbnail
+from manifest import ManifestWriter, MANIFEST_EXT, MANIFEST_FILETYPES
 
 
 # ---------------------------------------------------------------------------
@@ -28,8 +37,31 @@ _COLUMNS = [
     ("size_kb",    "용량(KB)",        75),
     ("resolution", "해상도",         100),
     ("tags",       "태그 미리보기",  260),
+    ("tag_count",  "태그 수",         55),
+    ("chars",      "글자 수",         60),
+    ("tokens",     "토큰(추정)",      70),
+    ("dup_tags",   "중복 태그",       65),
+    ("distance",   "유사 거리",       70),
 ]
 
+# 미리보기 draft 디코딩 최소 크기 (창이 아직 배치되기 전에도 쓸 만한 해상도)
+_PREVIEW_MIN_DECODE = 512
+
+# 목록 열 id → SearchTable 정렬 키 (SearchTable.SORT_KEYS)
+_SORT_KEYS = {
+    "name":       "name",
+    "ext":        "ext",
+    "folder":     "folder",
+    "size_kb":    "size",
+    "resolution": "pixels",
+    "tags":       "caption",
+    "tag_count":  "tag_count",
+    "chars":      "char_count",
+    "tokens":     "token_count",
+    "dup_tags":   "dup_tags",
+    "distance":   "distance",
+}
+
 
 # ===========================================================================
 # 메인 탭 GUI 클래스
@@ -64,26 +96,36 @@ class SearchFilterGUI:
 
         self.tag_mode = tk.StringVar(value="unused")
         self.tag_query = tk.StringVar()
+        self.use_tag_index = tk.BooleanVar(value=False)   # 저장된 태그 색인으로 태그 조건 평가
+
+        self.similar_mode = tk.StringVar(value="unused")
+        self.similar_image = tk.StringVar()                  # 기준 이미지 경로
+        self.similar_distance = tk.StringVar(value=str(DEFAULT_MAX_DISTANCE))
+
+        self.query_text = tk.StringVar()   # 고급 쿼리 (비어 있으면 미사용)
+
+        # ── 저장된 검색 ──────────────────────────────────────────────
+        self.saved_search_name = tk.StringVar()
 
         # ── 처리 대상 ────────────────────────────────────────────────
         self.target_type = tk.StringVar(value="both")
 
         # ── 내부 상태 ────────────────────────────────────────────────
-        self._all_results: List[FileEntry] = []
-        self._check_vars: List[tk.BooleanVar] = []
+        self._table: SearchTable = SearchTable()   # 검색 결과 (표시/정렬은 이 테이블만 사용)
         self._search_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
 
         # 미리보기 관련
         self._preview_img_ref = None          # PhotoImage GC 방지
         self._preview_orig_img = None         # EXIF 보정 완료된 PIL Image
+        self._preview_decode_size = 0         # 미리보기 이미지를 디코딩한 최대 변 길이 (0이면 원본 크기 그대로)
         self._current_entry: Optional[FileEntry] = None
         self._resize_job = None               # after() 디바운스 ID
         self._last_preview_size = (-1, -1)    # 마지막 렌더링 Canvas 크기 캐시
+        self._thumb_window: Optional[ThumbnailGridWindow] = None
 
-        # 정렬 상태
-        self._sort_col = "name"
-        self._sort_reverse = False
+        # 정렬 상태 [(열 id, 내림차순 여부), ...] (앞이 우선)
+        self._sort_keys: List[Tuple[str, bool]] = []
 
         self._create_widgets()
 
@@ -115,6 +157,7 @@ class SearchFilterGUI:
             return None
 
     def _build_conditions(self) -> list:
+        max_distance = self._safe_int(self.similar_distance)
         return [
             {'mode': self.filename_mode.get(), 'type': 'filename',
              'pattern': self.filename_pattern.get().strip()},
@@ -128,6 +171,9 @@ class SearchFilterGUI:
              'max_h': self._safe_int(self.res_max_h)},
             {'mode': self.tag_mode.get(), 'type': 'tag',
              'query': self.tag_query.get().strip()},
+            {'mode': self.similar_mode.get(), 'type': 'similar',
+             'image': self.similar_image.get().strip(),
+             'max_distance': DEFAULT_MAX_DISTANCE if max_distance is None else max_distance},
         ]
 
     # =========================================================================
@@ -147,6 +193,7 @@ class SearchFilterGUI:
         left = left_scroll.scrollable_frame
 
         self._build_path_group(left)
+        self._build_saved_search_group(left)
         self._build_condition_group(left)
         self._build_action_group(left)
 
@@ -197,6 +244,180 @@ class SearchFilterGUI:
         if folder:
             self.independent_folder_path.set(folder)
 
+    def _select_similar_image(self):
+        path = filedialog.askopenfilename(
+            title="기준 이미지 선택",
+            filetypes=[("이미지", "*.png *.jpg *.jpeg *.webp *.bmp *.gif *.tiff"), ("모든 파일", "*.*")])
+        if path:
+            self.similar_image.set(path)
+            if self.similar_mode.get() == "unused":
+                self.similar_mode.set("and")
+
+    def _use_preview_as_similar(self):
+        entry = self._current_entry
+        if entry is None or entry.image_path is None:
+            messagebox.showinfo("알림", "결과 목록에서 이미지를 먼저 선택하세요.")
+            return
+        self.similar_image.set(str(entry.image_path))
+        if self.similar_mode.get() == "unused":
+            self.similar_mode.set("and")
+
+    # ── 저장된 검색 ──────────────────────────────────────────────────
+
+    def _build_saved_search_group(self, parent):
+        grp = ttk.LabelFrame(parent, text="저장된 검색 (다시 실행하면 바뀐 파일만 평가)", padding="8")
+        grp.pack(fill=tk.X, pady=(0, 5))
+
+        top = ttk.Frame(grp)
+        top.pack(fill=tk.X)
+        self._saved_combo = ttk.Combobox(
+            top, textvariable=self.saved_search_name, state="readonly")
+        self._saved_combo.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 4))
+        self._saved_combo.bind("<<ComboboxSelected>>", lambda e: self._update_saved_info())
+
+        btn_f = ttk.Frame(grp)
+        btn_f.pack(fill=tk.X, pady=(3, 0))
+        self._saved_btns = []
+        for text, command in [
+            ("▶  실행", self._run_saved_search),
+            ("💾  현재 조건 저장", self._save_current_search),
+            ("🗑  삭제", self._delete_saved_search),
+        ]:
+            btn = ttk.Button(btn_f, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=3)
+            self._saved_btns.append(btn)
+
+        self._saved_info_var = tk.StringVar(value="")
+        ttk.Label(grp, textvariable=self._saved_info_var, foreground="gray").pack(anchor=tk.W, pady=(3, 0))
+        self._refresh_saved_list()
+
+    def _refresh_saved_list(self, select: Optional[str] = None):
+        self._saved_paths = dict(list_saved_searches())
+        names = list(self._saved_paths)
+        self._saved_combo.config(values=names)
+        if select is not None:
+            self.saved_search_name.set(select)
+        elif self.saved_search_name.get() not in self._saved_paths:
+            self.saved_search_name.set(names[0] if names else "")
+        self._update_saved_info()
+
+    def _load_selected_search(self) -> Optional[SavedSearch]:
+        path = self._saved_paths.get(self.saved_search_name.get())
+        if not path:
+            return None
+        try:
+            return SavedSearch.load(path)
+        except Exception as e:
+            messagebox.showerror("오류", f"저장된 검색을 불러올 수 없습니다.\n{e}")
+            return None
+
+    def _update_saved_info(self):
+        path = self._saved_paths.get(self.saved_search_name.get())
+        if not path:
+            self._saved_info_var.set("")
+            return
+        try:
+            saved = SavedSearch.load(path)
+        except Exception:
+            self._saved_info_var.set("")
+            return
+        last = saved.last_run.replace('T', ' ') if saved.last_run else "-"
+        self._saved_info_var.set(f"{saved.folder}\n마지막 실행: {last}  /  결과 {saved.result_count}건")
+
+    def _save_current_search(self):
+        folder = self._get_effective_folder()
+        if not folder:
+            messagebox.showwarning("경고", "작업 폴더를 먼저 선택하세요.")
+            return
+        query_text = self.query_text.get().strip()
+        if query_text:
+            try:
+                compile_query(query_text)
+            except QueryError as e:
+                messagebox.showerror("쿼리 오류", str(e))
+                return
+        name = simpledialog.askstring("검색 저장", "저장할 검색 이름을 입력하세요:",
+                                      initialvalue=self.saved_search_name.get())
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        if name in self._saved_paths and not messagebox.askyesno(
+                "확인", f"'{name}' 검색이 이미 있습니다. 현재 조건으로 덮어쓰시겠습니까?"):
+            return
+
+        saved = SavedSearch(name, folder, self.recursive.get(), self._build_conditions(),
+                            query_text, self.use_tag_index.get())
+        saved.delete()   # 이전 상태를 버리고 첫 실행(전체 평가)으로 결과를 만듦
+        saved.save()
+        self._refresh_saved_list(select=name)
+        self._start_saved_search(saved)
+
+    def _run_saved_search(self):
+        saved = self._load_selected_search()
+        if saved is None:
+            messagebox.showwarning("경고", "실행할 저장된 검색을 선택하세요.")
+            return
+        self._start_saved_search(saved)
+
+    def _delete_saved_search(self):
+        saved = self._load_selected_search()
+        if saved is None:
+            return
+        if not messagebox.askyesno("확인", f"'{saved.name}' 검색을 삭제하시겠습니까?"):
+            return
+        saved.delete()
+        self.saved_search_name.set("")
+        self._refresh_saved_list()
+
+    def _set_saved_running(self, running: bool):
+        state = tk.DISABLED if running else tk.NORMAL
+        for btn in self._saved_btns:
+            btn.config(state=state)
+
+    def _start_saved_search(self, saved: SavedSearch):
+        if self._search_thread is not None and self._search_thread.is_alive():
+            messagebox.showwarning("경고", "검색이 진행 중입니다. 끝난 뒤 다시 시도하세요.")
+            return
+        self._stop_event.clear()
+        self._search_btn.config(state=tk.DISABLED)
+        self._stop_btn.config(state=tk.NORMAL)
+        self._set_saved_running(True)
+        self._progress_var.set(f"'{saved.name}' 실행 중...")
+        self._clear_tree()
+
+        cores = self.core_var.get() if self.core_var else 1
+
+        def _run():
+            try:
+                result = saved.run(cores, self._progress_cb, self._stop_event)
+                self.parent.after(0, lambda: self._on_saved_search_done(saved, result))
+            except Exception as e:
+                print(f"저장된 검색 실행 오류: {e}")
+                self.parent.after(0, lambda msg=str(e): self._on_saved_search_done(saved, None, msg))
+
+        self._search_thread = threading.Thread(target=_run, daemon=True)
+        self._search_thread.start()
+
+    def _on_saved_search_done(self, saved: SavedSearch, result, error: str = ""):
+        self._search_btn.config(state=tk.NORMAL)
+        self._stop_btn.config(state=tk.DISABLED)
+        self._set_saved_running(False)
+        self._progress_var.set("")
+        if error:
+            messagebox.showerror("오류", f"'{saved.name}' 실행 중 오류가 발생했습니다.\n{error}")
+            return
+        if result is None:
+            self._result_count_var.set(f"검색 결과: 0건 ('{saved.name}' 중지됨, 저장된 결과는 그대로)")
+            return
+        table, stats = result
+        self._table = table
+        self._set_sort_keys([])
+        self._populate_tree()
+        self._result_count_var.set(
+            f"검색 결과: {stats['matched']}건  ('{saved.name}': 평가 {stats['evaluated']} / "
+            f"재사용 {stats['kept']} / 사라짐 {stats['removed']})")
+        self._update_saved_info()
+
     # ── 검색 조건 ────────────────────────────────────────────────────
 
     def _build_condition_group(self, parent):
@@ -216,6 +437,19 @@ class SearchFilterGUI:
                     frame, text=label, variable=var, value=value,
                 ).pack(side=tk.LEFT, padx=2)
 
+        # 고급 쿼리
+        q_grp = ttk.LabelFrame(grp, text="고급 쿼리 (아래 조건과 AND)", padding="5")
+        q_grp.pack(fill=tk.X, pady=3)
+        ttk.Entry(q_grp, textvariable=self.query_text).pack(fill=tk.X)
+        ttk.Label(
+            q_grp,
+            text="예) (blonde hair OR yellow hair) AND NOT monochrome res:>=1024 name:~^img_\n"
+                 "*_hair · tag:~정규식 · w/h/res/ratio/size/tagcount:>=N · a..b · folder:glob\n"
+                 "캡션 통계: chars:>500 · tokens:>75 · duptags:>0\n"
+                 "AI 생성 정보: prompt:\"blue sky\" negative:lowres model:animagine* sampler:euler seed:123 steps/cfg:>=N",
+            foreground="gray", justify=tk.LEFT,
+        ).pack(anchor=tk.W, pady=(3, 0))
+
         # 파일명
         fn_grp = ttk.LabelFrame(grp, text="파일명", padding="5")
         fn_grp.pack(fill=tk.X, pady=3)
@@ -277,6 +511,33 @@ class SearchFilterGUI:
         ttk.Label(tag_bot, text="태그 (  |  로 구분):").pack(side=tk.LEFT)
         ttk.Entry(tag_bot, textvariable=self.tag_query).pack(
             side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Checkbutton(
+            tag_grp, text="태그 색인 사용 (변경된 캡션만 다시 읽음, 반복 검색이 빨라짐)",
+            variable=self.use_tag_index).pack(anchor=tk.W, pady=(3, 0))
+
+        # 유사 이미지
+        sim_grp = ttk.LabelFrame(grp, text="유사 이미지 (dHash)", padding="5")
+        sim_grp.pack(fill=tk.X, pady=3)
+        sim_top = ttk.Frame(sim_grp)
+        sim_top.pack(fill=tk.X)
+        ttk.Label(sim_top, text="모드:").pack(side=tk.LEFT)
+        mode_radios(sim_top, self.similar_mode)
+        sim_mid = ttk.Frame(sim_grp)
+        sim_mid.pack(fill=tk.X, pady=(3, 0))
+        ttk.Label(sim_mid, text="기준 이미지:").pack(side=tk.LEFT)
+        ttk.Entry(sim_mid, textvariable=self.similar_image).pack(
+            side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Button(sim_mid, text="선택", width=5,
+                   command=self._select_similar_image).pack(side=tk.LEFT)
+        sim_bot = ttk.Frame(sim_grp)
+        sim_bot.pack(fill=tk.X, pady=(3, 0))
+        ttk.Label(sim_bot, text="최대 거리 (0~64):").pack(side=tk.LEFT)
+        ttk.Spinbox(sim_bot, from_=0, to=64, textvariable=self.similar_distance, width=5).pack(
+            side=tk.LEFT, padx=3)
+        ttk.Button(sim_bot, text="미리보기 이미지 사용",
+                   command=self._use_preview_as_similar).pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Label(sim_grp, text="해시는 폴더별로 캐시되어 바뀐 이미지만 다시 계산합니다. 결과는 거리 순으로 표시됩니다.",
+                  foreground="gray").pack(anchor=tk.W, pady=(3, 0))
 
         # 검색 버튼
         btn_f = ttk.Frame(grp)
@@ -308,9 +569,17 @@ class SearchFilterGUI:
 
         act_f = ttk.Frame(grp)
         act_f.pack(fill=tk.X, pady=(6, 0))
-        ttk.Button(act_f, text="🗑  삭제", command=self._action_delete).pack(side=tk.LEFT, padx=3)
-        ttk.Button(act_f, text="📂  이동", command=self._action_move).pack(side=tk.LEFT, padx=3)
-        ttk.Button(act_f, text="📋  복사", command=self._action_copy).pack(side=tk.LEFT, padx=3)
+        self._action_btns = []
+        for text, command in [
+            ("🗑  삭제", self._action_delete),
+            ("📂  이동", self._action_move),
+            ("📋  복사", self._action_copy),
+            ("🔗  하드링크", lambda: self._action_link('hardlink', "하드링크")),
+            ("🧬  리플링크", lambda: self._action_link('reflink', "리플링크")),
+        ]:
+            btn = ttk.Button(act_f, text=text, command=command)
+            btn.pack(side=tk.LEFT, padx=3)
+            self._action_btns.append(btn)
 
     # ── 결과 영역 ────────────────────────────────────────────────────
 
@@ -327,39 +596,26 @@ class SearchFilterGUI:
 
         self._result_count_var = tk.StringVar(value="검색 결과: 0건")
         ttk.Label(ctrl_bar, textvariable=self._result_count_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(ctrl_bar, text="🖼 썸네일 보기", command=self._open_thumbnail_grid).pack(side=tk.LEFT, padx=3)
+        ttk.Button(ctrl_bar, text="📄 매니페스트 저장", command=self._export_manifest).pack(side=tk.LEFT, padx=3)
 
         ttk.Button(ctrl_bar, text="전체 선택",    command=self._select_all).pack(side=tk.RIGHT, padx=3)
         ttk.Button(ctrl_bar, text="전체 선택해제", command=self._deselect_all).pack(side=tk.RIGHT, padx=3)
+        ttk.Button(ctrl_bar, text="선택 반전",    command=self._invert_selection).pack(side=tk.RIGHT, padx=3)
         self._sel_count_var = tk.StringVar(value="선택: 0건")
         ttk.Label(ctrl_bar, textvariable=self._sel_count_var).pack(side=tk.RIGHT, padx=5)
 
-        tree_frame = ttk.Frame(top_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=3)
-
-        col_ids = [c[0] for c in _COLUMNS]
-        self._tree = ttk.Treeview(
-            tree_frame, columns=col_ids, show="headings", selectmode="browse")
-
-        for col_id, col_label, col_width in _COLUMNS:
-            self._tree.heading(
-                col_id, text=col_label,
-                command=lambda c=col_id: self._sort_by(c))
-            anchor = tk.CENTER if col_id in (
-                "check", "ext", "size_kb", "resolution") else tk.W
-            self._tree.column(col_id, width=col_width, anchor=anchor, minwidth=20)
-
-        vsb = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL,   command=self._tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self._tree.xview)
-        self._tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        self._tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-        tree_frame.rowconfigure(0, weight=1)
-        tree_frame.columnconfigure(0, weight=1)
-
-        self._tree.bind("<ButtonRelease-1>", self._on_tree_click)
-        self._tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        # 보이는 행만 그리는 가상화 목록 (체크 상태는 비트셋)
+        self._grid = VirtualGrid(
+            top_frame, _COLUMNS,
+            row_values=self._row_values,
+            centered=("check", "ext", "size_kb", "resolution",
+                      "tag_count", "chars", "tokens", "dup_tags", "distance"),
+            on_select=self._show_preview,
+            on_check=self._update_sel_count,
+            on_heading=self._sort_by,
+        )
+        self._grid.pack(fill=tk.BOTH, expand=True, padx=3)
 
         # 하단: 미리보기
         bot_frame = ttk.Frame(paned)
@@ -394,39 +650,6 @@ class SearchFilterGUI:
     # 이벤트 핸들러
     # =========================================================================
 
-    def _on_tree_click(self, event):
-        """check 열 클릭 → 체크 토글"""
-        region = self._tree.identify_region(event.x, event.y)
-        col    = self._tree.identify_column(event.x)
-        if region == "cell" and col == "#1":
-            item = self._tree.identify_row(event.y)
-            if item:
-                self._toggle_check(item)
-
-    def _toggle_check(self, item_id: str):
-        idx = self._item_to_idx(item_id)
-        if idx is None:
-            return
-        new_val = not self._check_vars[idx].get()
-        self._check_vars[idx].set(new_val)
-        self._tree.set(item_id, "check", "☑" if new_val else "☐")
-        self._update_sel_count()
-
-    def _on_tree_select(self, event):
-        selected = self._tree.selection()
-        if not selected:
-            return
-        idx = self._item_to_idx(selected[0])
-        if idx is None:
-            return
-        self._show_preview(self._all_results[idx])
-
-    def _item_to_idx(self, item_id: str) -> Optional[int]:
-        try:
-            return int(self._tree.item(item_id, "tags")[0])
-        except (IndexError, ValueError, TypeError):
-            return None
-
     # =========================================================================
     # 검색
     # =========================================================================
@@ -437,9 +660,21 @@ class SearchFilterGUI:
             messagebox.showwarning("경고", "작업 폴더를 먼저 선택하세요.")
             return
 
+        query = None
+        query_text = self.query_text.get().strip()
+        if query_text:
+            try:
+                query = compile_query(query_text)
+            except QueryError as e:
+                messagebox.showerror("쿼리 오류", str(e))
+                return
+
         conditions   = self._build_conditions()
+        if self.similar_mode.get() != "unused" and not Path(self.similar_image.get().strip()).is_file():
+            messagebox.showwarning("경고", "유사 이미지 검색의 기준 이미지를 찾을 수 없습니다.")
+            return
         active_count = sum(1 for c in conditions if c.get('mode', 'unused') != 'unused')
-        if active_count == 0:
+        if active_count == 0 and query is None:
             if not messagebox.askyesno(
                     "확인",
                     "활성 검색 조건이 없습니다.\n폴더 내 모든 파일을 불러오시겠습니까?"):
@@ -454,15 +689,27 @@ class SearchFilterGUI:
         cores = self.core_var.get() if self.core_var else 1
 
         def _run():
-            results = search_files(
-                folder_path=folder,
-                recursive=self.recursive.get(),
-                conditions=conditions,
-                num_cores=cores,
-                progress_callback=self._progress_cb,
-                stop_event=self._stop_event,
-            )
-            self.parent.after(0, lambda: self._on_search_done(results))
+            # 통과한 항목을 배치 단위로 UI에 넘김 (스캔은 계속 진행)
+            # 오류가 나도 _on_search_done은 반드시 호출해 검색 버튼을 되살린다
+            try:
+                for batch in iter_search(
+                    folder_path=folder,
+                    recursive=self.recursive.get(),
+                    conditions=conditions,
+                    num_cores=cores,
+                    progress_callback=self._progress_cb,
+                    stop_event=self._stop_event,
+                    use_tag_index=self.use_tag_index.get(),
+                    query=query,
+                ):
+                    self.parent.after(0, lambda b=batch: self._on_search_batch(b))
+            except QueryError as e:
+                self.parent.after(0, lambda msg=str(e): messagebox.showerror("쿼리 오류", msg))
+            except Exception as e:
+                print(f"검색 실패: {e}")
+                self.parent.after(0, lambda msg=str(e): messagebox.showerror("오류", f"검색 중 오류가 발생했습니다.\n{msg}"))
+            finally:
+                self.parent.after(0, self._on_search_done)
 
         self._search_thread = threading.Thread(target=_run, daemon=True)
         self._search_thread.start()
@@ -471,116 +718,165 @@ class SearchFilterGUI:
         self._stop_event.set()
 
     def _progress_cb(self, done: int, total: int):
-        self.parent.after(0, lambda: self._progress_var.set(f"처리 중... {done}/{total}"))
+        if total:
+            text = f"처리 중... {done}/{total}"
+        else:
+            text = f"스캔 중... {done}개 확인"
+        self.parent.after(0, lambda: self._progress_var.set(text))
+
+    def _on_search_batch(self, batch: SearchTable):
+        self._table.extend(batch)
+        self._append_rows()
+        self._result_count_var.set(f"검색 결과: {len(self._table)}건 (검색 중)")
 
-    def _on_search_done(self, results: List[FileEntry]):
-        self._all_results = results
+    def _on_search_done(self):
         self._search_btn.config(state=tk.NORMAL)
         self._stop_btn.config(state=tk.DISABLED)
         self._progress_var.set("")
-        self._result_count_var.set(f"검색 결과: {len(results)}건")
-        self._populate_tree(results)
+        suffix = " (중지됨, 부분 결과)" if self._stop_event.is_set() else ""
+        self._result_count_var.set(f"검색 결과: {len(self._table)}건{suffix}")
+        if self.similar_mode.get() != "unused" and len(self._table):
+            # 유사 이미지 검색은 거리 순으로 정렬해 보여줌
+            self._set_sort_keys([])
+            self._sort_by("distance")
 
     # =========================================================================
     # Treeview 조작
     # =========================================================================
 
     def _clear_tree(self):
-        self._tree.delete(*self._tree.get_children())
-        self._check_vars.clear()
-        self._all_results.clear()
+        self._table = SearchTable()
+        self._grid.set_row_count(0)
+        self._set_sort_keys([])
+        self._refresh_thumbnail_grid(reset=True)
         self._sel_count_var.set("선택: 0건")
         self._result_count_var.set("검색 결과: 0건")
 
-    def _populate_tree(self, entries: List[FileEntry]):
-        self._tree.delete(*self._tree.get_children())
-        self._check_vars = [tk.BooleanVar(value=False) for _ in entries]
-
-        for idx, entry in enumerate(entries):
-            res     = entry.resolution
-            res_str = f"{res[0]}×{res[1]}" if res else "-"
-            tag_list = entry.tags
-            tags_preview = ", ".join(tag_list[:6])
-            if len(tag_list) > 6:
-                tags_preview += " ..."
-
-            self._tree.insert("", tk.END, tags=(str(idx),), values=(
-                "☐",
-                entry.stem,
-                entry.image_ext if entry.image_ext else ".txt",
-                entry.folder,
-                str(entry.file_size_kb),
-                res_str,
-                tags_preview,
-            ))
+    def _populate_tree(self):
+        self._grid.set_row_count(len(self._table))
+        self._update_sel_count()
+        self._refresh_thumbnail_grid(reset=True)
 
+    def _append_rows(self):
+        """테이블에 새로 붙은 행을 목록에 반영 (보이는 구간이 바뀔 때만 다시 그림)"""
+        self._grid.append_rows(len(self._table))
         self._update_sel_count()
 
-    def _sort_by(self, col: str):
-        if self._sort_col == col:
-            self._sort_reverse = not self._sort_reverse
+    def _row_values(self, idx: int) -> tuple:
+        """목록에 보이는 행의 표시 값 (체크 열 제외)"""
+        table = self._table
+        entry = table.entries[idx]
+        res     = table.resolution(idx)
+        res_str = f"{res[0]}×{res[1]}" if res else "-"
+        tag_list = table.tags[idx]
+        tags_preview = ", ".join(tag_list[:6])
+        if len(tag_list) > 6:
+            tags_preview += " ..."
+        dist = table.distance[idx]
+        return (
+            entry.stem,
+            entry.image_ext if entry.image_ext else ".txt",
+            entry.folder,
+            str(table.size_kb(idx)),
+            res_str,
+            tags_preview,
+            str(table.tag_count[idx]),
+            str(table.char_count[idx]),
+            str(table.token_count[idx]),
+            str(table.dup_tags[idx]),
+            str(dist) if dist != NO_DISTANCE else "-",
+        )
+
+    def _set_sort_keys(self, keys: List[Tuple[str, bool]]):
+        self._sort_keys = keys
+        self._grid.set_sort_marks(keys)
+
+    def _sort_by(self, col: str, additive: bool = False):
+        """
+        열 제목 클릭 정렬. 같은 열을 다시 누르면 방향 전환,
+        Shift+클릭은 기존 정렬 뒤에 보조 키로 추가(이미 있으면 방향 전환)해 다중 열 정렬.
+        테이블에 미리 만들어 둔 키 컬럼으로 순서만 계산하고, 목록은 위젯 재생성 없이 순서만 바꿔 다시 그림.
+        """
+        if col not in _SORT_KEYS:
+            return
+        keys = list(self._sort_keys)
+        pos = next((i for i, (c, _) in enumerate(keys) if c == col), None)
+        if additive:
+            if pos is None:
+                keys.append((col, False))
+            else:
+                keys[pos] = (col, not keys[pos][1])
+        elif pos == 0 and len(keys) == 1:
+            keys = [(col, not keys[0][1])]
         else:
-            self._sort_col   = col
-            self._sort_reverse = False
-
-        def _key(entry: FileEntry):
-            if col == "name":       return entry.stem.lower()
-            if col == "ext":        return entry.image_ext
-            if col == "folder":     return entry.folder.lower()
-            if col == "size_kb":    return entry.file_size_kb
-            if col == "resolution":
-                res = entry.resolution
-                return (res[0] * res[1]) if res else 0
-            if col == "tags":       return entry.tag_content.lower()
-            return ""
-
-        self._all_results.sort(key=_key, reverse=self._sort_reverse)
-        self._populate_tree(self._all_results)
+            keys = [(col, False)]
+        self._set_sort_keys(keys)
+
+        table = self._table
+        order = table.sort_order([(_SORT_KEYS[c], reverse) for c, reverse in keys])
+        self._table = table.subset(order)
+        self._grid.apply_order(order)
+        self._refresh_thumbnail_grid(reset=True)
 
     # =========================================================================
     # 선택 제어
     # =========================================================================
 
     def _select_all(self):
-        for i, item in enumerate(self._tree.get_children()):
-            self._check_vars[i].set(True)
-            self._tree.set(item, "check", "☑")
-        self._update_sel_count()
+        self._grid.select_all()
 
     def _deselect_all(self):
-        for i, item in enumerate(self._tree.get_children()):
-            self._check_vars[i].set(False)
-            self._tree.set(item, "check", "☐")
-        self._update_sel_count()
+        self._grid.deselect_all()
+
+    def _invert_selection(self):
+        self._grid.invert_checks()
 
     def _update_sel_count(self):
-        cnt = sum(1 for v in self._check_vars if v.get())
-        self._sel_count_var.set(f"선택: {cnt}건")
+        self._sel_count_var.set(f"선택: {self._grid.checks.count}건")
+        self._refresh_thumbnail_grid()
 
     def _get_selected_entries(self) -> List[FileEntry]:
-        return [e for e, v in zip(self._all_results, self._check_vars) if v.get()]
+        entries = self._table.entries
+        return [entries[i] for i in self._grid.checked_indices()]
 
-    # =========================================================================
-    # 미리보기 (인라인 Canvas)
-    # =========================================================================
+    def _export_manifest(self):
+        """체크된 항목(없으면 결과 전체)을 매니페스트로 저장 — 변환/태그/이름 변경/XY표 탭에서 불러와 재스캔 없이 처리"""
+        if not len(self._table):
+            messagebox.showinfo("알림", "저장할 검색 결과가 없습니다.")
+            return
+        entries = self._get_selected_entries() or self._table.entries
+        path = filedialog.asksaveasfilename(
+            title="매니페스트 저장", defaultextension=MANIFEST_EXT, filetypes=MANIFEST_FILETYPES,
+            initialfile=f"search{MANIFEST_EXT}")
+        if not path:
+            return
+        try:
+            with ManifestWriter(path, "search", self._get_effective_folder()) as writer:
+                for entry in entries:
+                    writer.write(str(entry.image_path) if entry.image_path else None,
+                                 str(entry.txt_path) if entry.txt_path else None)
+        except Exception as e:
+            print(f"매니페스트 저장 실패: {e}")
+            messagebox.showerror("오류", f"매니페스트 저장 실패:\n{e}")
+            return
+        messagebox.showinfo("완료", f"{writer.count}개 항목을 매니페스트로 저장했습니다.\n{path}")
 
-    def _show_preview(self, entry: FileEntry):
+    def _show_preview(self, idx: int):
+        table = self._table
+        entry = table.entries[idx]
         self._current_entry = entry
+        if self._thumb_window is not None and self._thumb_window.alive():
+            self._thumb_window.select(idx)
         # 렌더링 크기 캐시 초기화 — 새 이미지가 선택됐으므로 반드시 재렌더
         self._last_preview_size = (-1, -1)
 
         if entry.has_image():
             try:
-                img = Image.open(entry.image_path)
-                img.load()                          # 파일 핸들 즉시 해제
-                # EXIF 방향 보정은 이미지 로드 시 1회만 수행한다.
-                # _render_preview_to_canvas 에서 매번 수행하지 않아도 된다.
-                img = _apply_exif_orientation(img)
-                self._preview_orig_img = img
+                self._load_preview_image(entry.image_path)
                 self._render_preview_to_canvas()
-                w, h = entry.resolution or (0, 0)
+                w, h = table.resolution(idx) or (0, 0)
                 self._img_info_var.set(
-                    f"{entry.image_path.name}  ({w}×{h}, {entry.file_size_kb} KB)"
+                    f"{entry.image_path.name}  ({w}×{h}, {table.size_kb(idx)} KB)"
                     "  ─  클릭하면 뷰어 창이 열립니다"
                 )
             except Exception as e:
@@ -606,16 +902,27 @@ class SearchFilterGUI:
         self._tag_preview.config(state=tk.NORMAL)
         self._tag_preview.delete("1.0", tk.END)
         self._tag_preview.insert(
-            tk.END, entry.tag_content if entry.has_txt() else "(태그 파일 없음)")
+            tk.END, table.captions[idx] if entry.txt_path else "(태그 파일 없음)")
         self._tag_preview.config(state=tk.DISABLED)
 
+    def _load_preview_image(self, path: Path):
+        """미리보기용 이미지를 Canvas 크기에 맞춰 draft 디코딩 (큰 JPEG도 원본 전체를 풀지 않음).
+        EXIF 방향 보정은 여기서 1회만 수행한다."""
+        cw = self._img_canvas.winfo_width()
+        ch = self._img_canvas.winfo_height()
+        size = max(cw, ch, _PREVIEW_MIN_DECODE)
+        img = make_thumbnail(str(path), size)
+        self._preview_orig_img = img
+        # 축소되지 않았으면 원본 크기이므로 Canvas가 커져도 다시 읽을 필요 없음
+        self._preview_decode_size = size if max(img.size) >= size else 0
+
     def _render_preview_to_canvas(self):
         """원본 PIL 이미지를 현재 Canvas 크기에 비율 유지하여 fit 렌더링.
 
         최적화 포인트:
         - update_idletasks() 제거 — 호출 자체가 이벤트 루프를 flush해
           추가 Configure 이벤트를 유발하므로 제거한다.
-        - copy() / EXIF 보정 제거 — _show_preview()에서 1회 처리한 이미지를
+        - copy() / EXIF 보정 제거 — _load_preview_image()에서 1회 처리한 이미지를
           _preview_orig_img 에 보관하므로 여기서 반복할 필요 없다.
         - 크기 변화 없으면 skip — PIL resize + PhotoImage 생성 비용을 아낀다.
         """
@@ -626,6 +933,14 @@ class SearchFilterGUI:
         if cw <= 1 or ch <= 1:
             return
 
+        # Canvas가 디코딩한 크기보다 커졌으면 그 크기로 다시 디코딩
+        if self._preview_decode_size and max(cw, ch) > self._preview_decode_size \
+                and self._current_entry is not None and self._current_entry.has_image():
+            try:
+                self._load_preview_image(self._current_entry.image_path)
+            except Exception as e:
+                print(f"미리보기 다시 불러오기 실패: {e}")
+
         # 동일 크기면 재렌더 불필요
         if (cw, ch) == getattr(self, "_last_preview_size", None):
             return
@@ -665,6 +980,48 @@ class SearchFilterGUI:
         except Exception as e:
             messagebox.showerror("오류", f"이미지 뷰어를 열 수 없습니다.\n{e}")
 
+    # ── 썸네일 격자 ──────────────────────────────────────────────────
+
+    def _open_thumbnail_grid(self):
+        """검색 결과 전체를 썸네일 격자 창으로 보기 (썸네일은 공용 디스크 캐시에서 백그라운드로 불러옴)"""
+        if self._thumb_window is not None and self._thumb_window.alive():
+            self._thumb_window.win.lift()
+            return
+        cores = self.core_var.get() if self.core_var else 1
+        self._thumb_window = ThumbnailGridWindow(
+            self.parent, "검색 결과 썸네일",
+            row_count=lambda: len(self._table),
+            image_path=self._thumb_path,
+            label=lambda idx: self._table.entries[idx].display_name,
+            is_checked=lambda idx: self._grid.checks.get(idx),
+            on_select=self._grid.select_row,
+            on_toggle=self._grid.toggle,
+            on_open=self._open_viewer_at,
+            num_workers=max(2, cores),
+        )
+
+    def _thumb_path(self, idx: int) -> Optional[str]:
+        entry = self._table.entries[idx]
+        return str(entry.image_path) if entry.image_path else None
+
+    def _refresh_thumbnail_grid(self, reset: bool = False):
+        window = self._thumb_window
+        if window is None or not window.alive():
+            return
+        if reset:
+            window.reset()
+        else:
+            window.refresh()
+
+    def _open_viewer_at(self, idx: int):
+        entry = self._table.entries[idx]
+        if not entry.has_image():
+            return
+        try:
+            ImageViewerWindow(parent=self._img_canvas, image_path=entry.image_path)
+        except Exception as e:
+            messagebox.showerror("오류", f"이미지 뷰어를 열 수 없습니다.\n{e}")
+
     # =========================================================================
     # 파일 처리 액션
     # =========================================================================
@@ -707,10 +1064,7 @@ class SearchFilterGUI:
                 f"처리 대상: {self._ttype_label()}\n\n"
                 "이 작업은 되돌릴 수 없습니다. 계속하시겠습니까?"):
             return
-        success, fail, logs = process_entries(
-            selected, 'delete', self.target_type.get())
-        self._show_result_log("삭제", success, fail, logs)
-        self._start_search()
+        self._run_action('delete', "삭제", selected)
 
     def _action_move(self):
         selected = self._check_selection()
@@ -726,10 +1080,7 @@ class SearchFilterGUI:
                 f"선택한 {len(selected)}개 항목을\n{dest}\n으로 이동합니다.\n"
                 f"처리 대상: {self._ttype_label()}\n\n계속하시겠습니까?"):
             return
-        success, fail, logs = process_entries(
-            selected, 'move', self.target_type.get(), dest)
-        self._show_result_log("이동", success, fail, logs)
-        self._start_search()
+        self._run_action('move', "이동", selected, dest)
 
     def _action_copy(self):
         selected = self._check_selection()
@@ -743,9 +1094,62 @@ class SearchFilterGUI:
                 f"선택한 {len(selected)}개 항목을\n{dest}\n으로 복사합니다.\n"
                 f"처리 대상: {self._ttype_label()}\n\n계속하시겠습니까?"):
             return
-        success, fail, logs = process_entries(
-            selected, 'copy', self.target_type.get(), dest)
-        self._show_result_log("복사", success, fail, logs)
+        self._run_action('copy', "복사", selected, dest, research=False)
+
+    def _action_link(self, action: str, action_name: str):
+        """원본과 디스크 공간을 공유하는 링크로 부분 데이터셋 생성 (다른 드라이브면 복사)"""
+        selected = self._check_selection()
+        if selected is None:
+            return
+        dest = filedialog.askdirectory(title=f"{action_name}를 만들 폴더 선택")
+        if not dest:
+            return
+        note = ("하드링크는 원본과 내용을 공유하므로 이미지를 편집하면 원본도 바뀝니다.\n"
+                "(캡션 .txt는 복사됩니다.)" if action == 'hardlink' else
+                "리플링크(CoW 복제)는 원본과 블록을 공유하다가 수정된 부분만 따로 저장합니다.")
+        if not messagebox.askyesno(
+                f"{action_name} 확인",
+                f"선택한 {len(selected)}개 항목의 {action_name}를\n{dest}\n에 만듭니다.\n"
+                f"처리 대상: {self._ttype_label()}\n\n{note}\n"
+                "다른 드라이브이거나 지원하지 않는 파일시스템이면 복사로 대체됩니다.\n\n계속하시겠습니까?"):
+            return
+        self._run_action(action, action_name, selected, dest, research=False)
+
+    def _set_action_running(self, running: bool):
+        state = tk.DISABLED if running else tk.NORMAL
+        for btn in self._action_btns:
+            btn.config(state=state)
+        self._search_btn.config(state=state)
+        self._stop_btn.config(state=tk.NORMAL if running else tk.DISABLED)
+
+    def _run_action(self, action: str, action_name: str, selected: List[FileEntry],
+                    dest: str = "", research: bool = True):
+        """삭제/이동/복사를 백그라운드 스레드에서 병렬 실행 (중지 버튼으로 취소)"""
+        self._stop_event.clear()
+        self._set_action_running(True)
+        self._progress_var.set(f"{action_name} 중...")
+        target_type = self.target_type.get()
+        cores = self.core_var.get() if self.core_var else 1
+
+        def _run():
+            success, fail, logs = process_entries(
+                selected, action, target_type, dest,
+                num_workers=cores,
+                progress_callback=self._progress_cb,
+                stop_event=self._stop_event,
+            )
+            self.parent.after(0, lambda: self._on_action_done(
+                action_name, success, fail, logs, research))
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _on_action_done(self, action_name: str, success: int, fail: int,
+                        logs: List[str], research: bool):
+        self._set_action_running(False)
+        self._progress_var.set("")
+        self._show_result_log(action_name, success, fail, logs)
+        if research:
+            self._start_search()
 
     def _show_result_log(self, action_name: str, success: int, fail: int, logs: List[str]):
         log_win = tk.Toplevel(self.parent)
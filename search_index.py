@@ -0,0 +1,280 @@
+"""
+검색 색인 모듈 - 태그 역색인(tag -> 파일 id 목록)을 디스크에 보관하고 캡션 mtime 기준으로 증분 갱신
+"""
+import os
+import sys
+import pickle
+import hashlib
+import threading
+import concurrent.futures
+from array import array
+from pathlib import Path
+from typing import List, Dict, Set, Optional, Callable, Iterable, Tuple
+
+from tag_vocab import TagVocab
+
+if getattr(sys, 'frozen', False):
+    APP_DIR = Path(sys.executable).parent
+else:
+    APP_DIR = Path(__file__).parent
+
+# 색인 파일 저장 폴더
+CACHE_DIR = APP_DIR / "cache"
+
+# 저장 형식 버전 (구조가 바뀌면 올려서 기존 색인을 버리고 다시 생성)
+INDEX_VERSION = 1
+
+# 삭제된 문서 비율이 이 값을 넘으면 저장 시 id를 다시 매겨 압축
+COMPACT_RATIO = 0.3
+
+
+def parse_caption_tags(content: str) -> List[str]:
+    """FileEntry.tags와 같은 규칙: 쉼표 구분, 공백 정리, 소문자화"""
+    if not content.strip():
+        return []
+    return [t.strip().lower() for t in content.split(",") if t.strip()]
+
+
+def _read_caption_tags(path: str) -> List[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return parse_caption_tags(f.read())
+    except Exception:
+        return []
+
+
+class SearchIndex:
+    """
+    데이터셋 폴더 하나에 대한 태그 역색인.
+
+    문서(doc) = 캡션(.txt) 파일 1개. doc id는 0부터 증가하는 정수.
+      keys       - doc id -> 폴더 기준 상대 경로 (삭제된 문서는 None)
+      mtimes     - array('d') 캡션 수정 시각 (증분 갱신 판단용)
+      doc_tags   - doc id -> array('I') 태그 id (캡션 순서 그대로, 정방향 색인)
+      vocab      - 태그 문자열 <-> 태그 id (TagVocab)
+      postings   - 태그 id -> 정렬된 array('I') doc id 목록 (역색인)
+    태그 조건은 캡션을 읽지 않고 posting 집합 연산으로 처리한다.
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.keys: List[Optional[str]] = []
+        self.mtimes = array('d')
+        self.doc_tags: List[array] = []
+        self.vocab = TagVocab()
+        self.postings: Dict[int, array] = {}
+        self.doc_ids: Dict[str, int] = {}
+        self.dirty = False
+
+    # ------------------------------------------------------------------
+    # 저장 / 불러오기
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def index_path(root: str) -> Path:
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+        return CACHE_DIR / f"tag_index_{digest}.pkl"
+
+    @classmethod
+    def load(cls, root: str) -> "SearchIndex":
+        """저장된 색인을 불러옴. 없거나 손상/버전 불일치면 빈 색인 반환"""
+        index = cls(root)
+        path = cls.index_path(root)
+        if not path.exists():
+            return index
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != INDEX_VERSION or data.get('root') != index.root:
+                return index
+            index.keys = data['keys']
+            index.mtimes = data['mtimes']
+            index.doc_tags = data['doc_tags']
+            index.vocab = TagVocab(data['tag_names'])
+            index.postings = data['postings']
+        except Exception as e:
+            print(f"태그 색인 불러오기 실패 (새로 생성): {e}")
+            return cls(root)
+        index.doc_ids = {key: i for i, key in enumerate(index.keys) if key is not None}
+        return index
+
+    def save(self):
+        """변경된 경우에만 저장 (임시 파일 → os.replace)"""
+        if not self.dirty:
+            return
+        dead = len(self.keys) - len(self.doc_ids)
+        if self.keys and dead / len(self.keys) > COMPACT_RATIO:
+            self._compact()
+
+        path = self.index_path(self.root)
+        data = {
+            'version': INDEX_VERSION,
+            'root': self.root,
+            'keys': self.keys,
+            'mtimes': self.mtimes,
+            'doc_tags': self.doc_tags,
+            'tag_names': self.vocab.names,
+            'postings': self.postings,
+        }
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self.dirty = False
+        except Exception as e:
+            print(f"태그 색인 저장 실패: {e}")
+
+    def _compact(self):
+        """삭제된 문서를 제거하고 doc id를 0부터 다시 매김"""
+        remap = {}
+        keys, mtimes, doc_tags = [], array('d'), []
+        for old_id, key in enumerate(self.keys):
+            if key is None:
+                continue
+            remap[old_id] = len(keys)
+            keys.append(key)
+            mtimes.append(self.mtimes[old_id])
+            doc_tags.append(self.doc_tags[old_id])
+        postings = {}
+        for tag_id, plist in self.postings.items():
+            moved = array('I', (remap[d] for d in plist if d in remap))
+            if moved:
+                postings[tag_id] = moved
+        self.keys, self.mtimes, self.doc_tags, self.postings = keys, mtimes, doc_tags, postings
+        self.doc_ids = {key: i for i, key in enumerate(keys)}
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+
+    def key_for(self, path: str) -> str:
+        """절대 경로 → 색인 키 (폴더 기준 상대 경로)"""
+        prefix = self.root + os.sep
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        return os.path.relpath(path, self.root)
+
+    def path_for(self, doc_id: int) -> str:
+        return os.path.join(self.root, self.keys[doc_id])
+
+    def refresh(self, captions: Iterable[Tuple[str, float]], recursive: bool = True,
+                num_cores: int = 1,
+                progress_callback: Optional[Callable[[int, int], None]] = None,
+                stop_event: Optional[threading.Event] = None) -> int:
+        """
+        스캔된 캡션 목록 [(절대 경로, mtime), ...]과 색인을 비교해
+        새로 생겼거나 mtime이 바뀐 캡션만 다시 읽고, 사라진 캡션은 색인에서 제거.
+        recursive=False 스캔에서는 최상위 폴더의 캡션만 제거 대상으로 본다.
+        반환: 다시 읽은 캡션 수 (중지 시 -1)
+        """
+        seen = set()
+        changed: List[Tuple[str, float]] = []
+        for path, mtime in captions:
+            key = self.key_for(path)
+            seen.add(key)
+            doc_id = self.doc_ids.get(key)
+            if doc_id is None or self.mtimes[doc_id] != mtime:
+                changed.append((key, mtime))
+
+        removed = [key for key in self.doc_ids
+                   if key not in seen and (recursive or os.sep not in key)]
+
+        if not changed and not removed:
+            return 0
+
+        # 변경된 캡션만 병렬로 읽기
+        total = len(changed)
+        paths = [os.path.join(self.root, key) for key, _ in changed]
+        new_tags: List[List[str]] = []
+        if num_cores > 1 and total > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=num_cores) as ex:
+                for done, tags in enumerate(ex.map(_read_caption_tags, paths, chunksize=64), 1):
+                    if stop_event and stop_event.is_set():
+                        ex.shutdown(wait=False, cancel_futures=True)
+                        return -1
+                    new_tags.append(tags)
+                    if progress_callback and (done % 500 == 0 or done == total):
+                        progress_callback(done, total)
+        else:
+            for done, path in enumerate(paths, 1):
+                if stop_event and stop_event.is_set():
+                    return -1
+                new_tags.append(_read_caption_tags(path))
+                if progress_callback and (done % 500 == 0 or done == total):
+                    progress_callback(done, total)
+
+        # posting 변경분을 태그별로 모았다가 한 번에 반영
+        additions: Dict[int, Set[int]] = {}
+        deletions: Dict[int, Set[int]] = {}
+
+        for key in removed:
+            doc_id = self.doc_ids.pop(key)
+            for tag_id in set(self.doc_tags[doc_id]):
+                deletions.setdefault(tag_id, set()).add(doc_id)
+            self.keys[doc_id] = None
+            self.doc_tags[doc_id] = array('I')
+
+        for (key, mtime), tags in zip(changed, new_tags):
+            tag_arr = self.vocab.encode(tags)
+            doc_id = self.doc_ids.get(key)
+            if doc_id is None:
+                doc_id = len(self.keys)
+                self.keys.append(key)
+                self.mtimes.append(mtime)
+                self.doc_tags.append(tag_arr)
+                self.doc_ids[key] = doc_id
+                old_set = set()
+            else:
+                old_set = set(self.doc_tags[doc_id])
+                self.mtimes[doc_id] = mtime
+                self.doc_tags[doc_id] = tag_arr
+            new_set = set(tag_arr)
+            for tag_id in old_set - new_set:
+                deletions.setdefault(tag_id, set()).add(doc_id)
+            for tag_id in new_set - old_set:
+                additions.setdefault(tag_id, set()).add(doc_id)
+
+        for tag_id in set(additions) | set(deletions):
+            current = self.postings.get(tag_id, array('I'))
+            merged = (set(current) - deletions.get(tag_id, set())) | additions.get(tag_id, set())
+            if merged:
+                self.postings[tag_id] = array('I', sorted(merged))
+            else:
+                self.postings.pop(tag_id, None)
+
+        self.dirty = True
+        return total
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def posting(self, tag: str) -> array:
+        tag_id = self.vocab.get(tag)
+        if tag_id is None:
+            return array('I')
+        return self.postings.get(tag_id, array('I'))
+
+    def docs_with_all(self, tags: List[str]) -> Set[int]:
+        """모든 태그를 가진 문서 (교집합, 가장 짧은 posting부터)"""
+        lists = sorted((self.posting(t) for t in tags), key=len)
+        if not lists or not lists[0]:
+            return set()
+        result = set(lists[0])
+        for plist in lists[1:]:
+            result.intersection_update(plist)
+            if not result:
+                break
+        return result
+
+    def docs_with_any(self, tags: List[str]) -> Set[int]:
+        """태그 중 하나라도 가진 문서 (합집합)"""
+        result = set()
+        for t in tags:
+            result.update(self.posting(t))
+        return result
+
+    def tags_of(self, doc_id: int) -> List[str]:
+        """정방향 색인으로 캡션 태그 리스트 복원 (캡션 순서 유지)"""
+        return self.vocab.decode(self.doc_tags[doc_id])
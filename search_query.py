@@ -0,0 +1,566 @@
+"""
+검색 쿼리 언어 모듈 - 괄호/AND/OR/NOT, 태그 와일드카드·정규식, 숫자 필드 비교, 폴더 glob
+
+문법 요약:
+    blonde hair OR yellow hair          공백이 들어간 태그는 단어를 이어서 씀
+    (a OR b) AND NOT monochrome          AND/OR/NOT (대문자), | & 도 사용 가능
+    *_hair                               태그 와일드카드 (* ?)
+    tag:~^red                            태그 정규식
+    "1girl"                              따옴표: 그대로의 태그 (와일드카드 해석 안 함)
+    w:>=1024  h:<2048  res:>=1024        너비/높이/양변 모두
+    ratio:>1.5  size:>500  size:<2mb     비율(w/h), 용량(기본 KB, kb/mb/gb 단위)
+    tagcount:10..30                      범위 (이상..이하)
+    chars:>500  tokens:>75  duptags:>0   캡션 글자 수 / CLIP 토큰 추정치 / 중복 태그 수
+    name:~^img_2024  name:img_*  name:cat   파일명 정규식 / glob / 포함
+    folder:char*/raw                     폴더 (검색 폴더 기준 상대 경로) glob / 포함
+    prompt:"blue sky"  negative:lowres   AI 생성 정보 프롬프트/네거티브 단어 검색 (끝 *는 접두어, ~는 정규식)
+    model:animagine*  sampler:euler      모델/샘플러 포함 / glob / 정규식,  meta:xxx 는 모든 생성 정보
+    seed:12345  steps:>=30  cfg:5..7     시드/스텝/CFG
+나란히 놓인 항은 AND로 결합된다.
+"""
+import os
+import re
+import fnmatch
+import threading
+import concurrent.futures
+from array import array
+from typing import List, Set, Optional, Callable, Tuple, Any
+
+from search_index import SearchIndex
+
+
+class QueryError(ValueError):
+    """쿼리 문법 오류 (UI에 그대로 표시할 메시지)"""
+    pass
+
+
+# 필드 이름 → 종류
+NUMERIC_FIELDS = {'w', 'h', 'res', 'ratio', 'size', 'tagcount', 'chars', 'tokens', 'duptags'}
+TEXT_FIELDS = {'name', 'folder', 'tag'}
+# AI 생성 정보 필드 (메타데이터 색인에서 조회)
+META_TEXT_FIELDS = {'prompt', 'negative', 'model', 'sampler', 'meta'}
+META_NUMERIC_FIELDS = {'seed', 'steps', 'cfg'}
+_ALL_FIELDS = NUMERIC_FIELDS | TEXT_FIELDS | META_TEXT_FIELDS | META_NUMERIC_FIELDS
+
+# 평가 비용 (AND 자식은 싼 것부터 평가해 후보를 줄인 뒤 비싼 항을 평가)
+_FIELD_COST = {
+    'name': 0, 'folder': 0, 'size': 0,
+    'tag': 1, 'tagcount': 1,
+    'chars': 2, 'tokens': 2, 'duptags': 2,
+    'w': 3, 'h': 3, 'res': 3, 'ratio': 3,
+}
+_META_COST = 1
+
+# 캡션 통계 필드 → FileEntry.caption_stats 위치
+_CAPTION_STAT_FIELDS = {'chars': 1, 'tokens': 2, 'duptags': 3}
+
+_SIZE_UNITS = {'b': 1 / 1024, 'kb': 1, 'k': 1, 'mb': 1024, 'm': 1024, 'gb': 1024 * 1024, 'g': 1024 * 1024}
+_COMPARE_RE = re.compile(r'^(>=|<=|!=|>|<|=)?(.+)$')
+
+_KEYWORDS = {'AND': 'and', '&': 'and', '&&': 'and', 'OR': 'or', '|': 'or', '||': 'or', 'NOT': 'not', '!': 'not'}
+
+
+# ------------------------------------------------------------------
+# 토큰화
+# ------------------------------------------------------------------
+
+def _read_quoted(text: str, pos: int) -> Tuple[str, int]:
+    """text[pos] == '"' 위치에서 닫는 따옴표까지 읽음. (내용, 다음 위치)"""
+    end = text.find('"', pos + 1)
+    if end < 0:
+        raise QueryError("따옴표가 닫히지 않았습니다.")
+    return text[pos + 1:end], end + 1
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    """
+    토큰: ('(' ,None) (')',None) ('op','and'|'or'|'not') ('word',str) ('quoted',str) ('field',(name,value))
+    필드 값은 공백 전까지 읽되, 값 안에서 열린 괄호만큼의 ')'는 값에 포함한다 (정규식 그룹 허용).
+    """
+    tokens = []
+    pos = 0
+    n = len(text)
+    while pos < n:
+        ch = text[pos]
+        if ch.isspace():
+            pos += 1
+            continue
+        if ch in '()':
+            tokens.append((ch, None))
+            pos += 1
+            continue
+        if ch == '"':
+            value, pos = _read_quoted(text, pos)
+            tokens.append(('quoted', value))
+            continue
+
+        start = pos
+        while pos < n and not text[pos].isspace() and text[pos] not in '()':
+            if text[pos] == ':':
+                break
+            pos += 1
+        word = text[start:pos]
+
+        if pos < n and text[pos] == ':' and word.lower() in _ALL_FIELDS:
+            # 필드 항: name:value
+            pos += 1
+            prefix = ''
+            if pos < n and text[pos] == '~':
+                prefix = '~'
+                pos += 1
+            if pos < n and text[pos] == '"':
+                value, pos = _read_quoted(text, pos)
+                tokens.append(('field', (word.lower(), prefix + value, True)))
+                continue
+            vstart = pos
+            depth = 0
+            while pos < n and not text[pos].isspace():
+                c = text[pos]
+                if c == '(':
+                    depth += 1
+                elif c == ')':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                pos += 1
+            value = text[vstart:pos]
+            if not value:
+                raise QueryError(f"'{word}:' 뒤에 값이 없습니다.")
+            tokens.append(('field', (word.lower(), prefix + value, False)))
+            continue
+
+        if pos < n and text[pos] == ':':
+            # 알 수 없는 필드 이름이면 ':'를 포함한 일반 단어로 취급 (예: 태그 'score:9')
+            while pos < n and not text[pos].isspace() and text[pos] not in '()':
+                pos += 1
+            word = text[start:pos]
+
+        if word in _KEYWORDS:
+            tokens.append(('op', _KEYWORDS[word]))
+        else:
+            tokens.append(('word', word))
+    return tokens
+
+
+# ------------------------------------------------------------------
+# 파싱 (재귀 하강) → AST
+#   ('and', [..]) ('or', [..]) ('not', node)
+#   ('tag', kind, value)            kind: 'exact' | 'glob' | 'regex'
+#   ('text', field, kind, value)    field: 'name' | 'folder', kind: 'sub' | 'glob' | 'regex'
+#   ('num', field, op, a, b)        op: '>', '>=', '<', '<=', '=', '!=', 'range'
+#   ('meta_text', field, kind, value) / ('meta_num', field, op, a, b)   AI 생성 정보
+# ------------------------------------------------------------------
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("쿼리가 비어 있습니다.")
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            kind, value = self.peek()
+            raise QueryError(f"예상하지 못한 '{value if value else kind}' 입니다.")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == ('op', 'or'):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        while True:
+            kind, value = self.peek()
+            if kind == 'op' and value == 'and':
+                self.take()
+                children.append(self.parse_unary())
+            elif kind in ('(', 'word', 'quoted', 'field') or (kind == 'op' and value == 'not'):
+                children.append(self.parse_unary())  # 나란히 놓인 항은 AND
+            else:
+                break
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_unary(self):
+        if self.peek() == ('op', 'not'):
+            self.take()
+            return ('not', self.parse_unary())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        kind, value = self.take()
+        if kind == '(':
+            node = self.parse_or()
+            if self.take()[0] != ')':
+                raise QueryError("괄호가 닫히지 않았습니다.")
+            return node
+        if kind == 'quoted':
+            return ('tag', 'exact', value.strip().lower())
+        if kind == 'field':
+            return _field_node(*value)
+        if kind == 'word':
+            words = [value]
+            while self.peek()[0] == 'word':
+                words.append(self.take()[1])
+            return _tag_node(' '.join(words))
+        if kind is None:
+            raise QueryError("쿼리가 중간에 끝났습니다.")
+        raise QueryError(f"예상하지 못한 '{value if value else kind}' 입니다.")
+
+
+def _tag_node(text: str):
+    text = text.strip().lower()
+    if any(c in text for c in '*?['):
+        return ('tag', 'glob', text)
+    return ('tag', 'exact', text)
+
+
+def _parse_number(field: str, text: str) -> float:
+    text = text.strip().lower()
+    scale = 1.0
+    if field == 'size':
+        m = re.match(r'^([0-9.]+)\s*([a-z]*)$', text)
+        if not m or (m.group(2) and m.group(2) not in _SIZE_UNITS):
+            raise QueryError(f"용량 값을 해석할 수 없습니다: {text}")
+        text = m.group(1)
+        scale = _SIZE_UNITS.get(m.group(2), 1)
+    try:
+        if field in ('seed', 'steps'):
+            return int(text)
+        return float(text) * scale
+    except ValueError:
+        raise QueryError(f"'{field}'에는 숫자가 필요합니다: {text}")
+
+
+def _field_node(field: str, value: str, quoted: bool):
+    if field == 'tag':
+        if value.startswith('~'):
+            return ('tag', 'regex', value[1:])
+        return ('tag', 'exact', value.strip().lower()) if quoted else _tag_node(value)
+
+    if field in TEXT_FIELDS or field in META_TEXT_FIELDS:
+        kind = 'meta_text' if field in META_TEXT_FIELDS else 'text'
+        if value.startswith('~'):
+            return (kind, field, 'regex', value[1:])
+        if not quoted and any(c in value for c in '*?['):
+            return (kind, field, 'glob', value)
+        return (kind, field, 'sub', value.lower())
+
+    # 숫자 필드
+    kind = 'meta_num' if field in META_NUMERIC_FIELDS else 'num'
+    if '..' in value:
+        lo, hi = value.split('..', 1)
+        a = _parse_number(field, lo) if lo.strip() else None
+        b = _parse_number(field, hi) if hi.strip() else None
+        return (kind, field, 'range', a, b)
+    m = _COMPARE_RE.match(value)
+    op = m.group(1) or '='
+    return (kind, field, op, _parse_number(field, m.group(2)), None)
+
+
+def parse_query(text: str):
+    """쿼리 문자열 → AST. 문법 오류 시 QueryError"""
+    return _Parser(_tokenize(text)).parse()
+
+
+# ------------------------------------------------------------------
+# 컴파일: AST의 정규식/glob을 미리 컴파일하고 비용을 매김
+# ------------------------------------------------------------------
+
+def _compile_pattern(kind: str, value: str, ignore_case: bool):
+    try:
+        if kind == 'glob':
+            return re.compile(fnmatch.translate(value), re.IGNORECASE if ignore_case else 0)
+        if kind == 'regex':
+            return re.compile(value)
+    except re.error as e:
+        raise QueryError(f"정규식 오류 '{value}': {e}")
+    return None
+
+
+def _compile_node(node):
+    """(node, cost) 반환. 자식 노드는 비용 순으로 정렬"""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        compiled = sorted((_compile_node(c) for c in node[1]), key=lambda x: x[1])
+        return (kind, [c for c, _ in compiled]), max(cost for _, cost in compiled)
+    if kind == 'not':
+        child, cost = _compile_node(node[1])
+        return ('not', child), cost
+    if kind == 'tag':
+        _, tkind, value = node
+        return ('tag', tkind, value, _compile_pattern(tkind, value, ignore_case=False)), _FIELD_COST['tag']
+    if kind == 'text':
+        _, field, tkind, value = node
+        return ('text', field, tkind, value, _compile_pattern(tkind, value, ignore_case=True)), _FIELD_COST[field]
+    if kind == 'meta_text':
+        _, field, tkind, value = node
+        return ('meta_text', field, tkind, value, _compile_pattern(tkind, value, ignore_case=True)), _META_COST
+    if kind == 'meta_num':
+        return node, _META_COST
+    return node, _FIELD_COST[node[1]]
+
+
+def _uses_resolution(node) -> bool:
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return any(_uses_resolution(c) for c in node[1])
+    if kind == 'not':
+        return _uses_resolution(node[1])
+    return kind == 'num' and node[1] in ('w', 'h', 'res', 'ratio')
+
+
+def _uses_metadata(node) -> bool:
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return any(_uses_metadata(c) for c in node[1])
+    if kind == 'not':
+        return _uses_metadata(node[1])
+    return kind in ('meta_text', 'meta_num')
+
+
+class CompiledQuery:
+    """한 번 컴파일해 재사용하는 쿼리 (평가는 QueryEvaluator)"""
+    def __init__(self, text: str):
+        self.text = text
+        self.root, self.cost = _compile_node(parse_query(text))
+        self.uses_resolution = _uses_resolution(self.root)
+        self.uses_metadata = _uses_metadata(self.root)
+
+
+def compile_query(text: str) -> CompiledQuery:
+    return CompiledQuery(text)
+
+
+# ------------------------------------------------------------------
+# 평가: 행 번호 집합 위의 집합 연산 + 컬럼 스캔
+# ------------------------------------------------------------------
+
+def _compare(op: str, a: Optional[float], b: Optional[float]) -> Callable[[float], bool]:
+    if op == 'range':
+        lo = float('-inf') if a is None else a
+        hi = float('inf') if b is None else b
+        return lambda v: lo <= v <= hi
+    return {
+        '>': lambda v: v > a, '>=': lambda v: v >= a,
+        '<': lambda v: v < a, '<=': lambda v: v <= a,
+        '=': lambda v: v == a, '!=': lambda v: v != a,
+    }[op]
+
+
+class QueryEvaluator:
+    """
+    스캔된 항목(FileEntry 목록)과 태그 색인을 묶어 쿼리를 평가.
+    각 노드는 '후보 행 집합'을 받아 그 중 조건을 만족하는 행 집합을 돌려준다.
+      AND: 자식을 비용 순으로 적용하며 후보를 줄여 나감
+      OR : 아직 만족하지 않은 후보에 대해서만 다음 자식을 평가
+      NOT: 후보 - 자식 결과
+    태그 항은 색인 posting을 행 번호로 옮긴 집합 연산, 숫자/문자 필드는 후보 행에 대한 컬럼 스캔.
+    해상도 컬럼은 처음 필요할 때 후보 행에 대해서만 병렬로 읽는다.
+    AI 생성 정보 항은 meta_index(MetadataIndex)의 조회 결과(이미지 키 집합)를 행 번호로 옮긴다.
+    """
+    def __init__(self, entries, index: SearchIndex, root: str, num_cores: int = 1,
+                 stop_event: Optional[threading.Event] = None,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 meta_index=None):
+        self.entries = entries
+        self.index = index
+        self.root = os.path.abspath(root)
+        self.num_cores = num_cores
+        self.stop_event = stop_event
+        self.progress_callback = progress_callback
+        self.meta_index = meta_index
+        n = len(entries)
+
+        # 행 ↔ 색인 문서 매핑
+        self.row_doc = array('i', [-1]) * n
+        self.doc_row = {}
+        for row, entry in enumerate(entries):
+            if entry.txt_path is not None:
+                doc_id = index.doc_ids.get(index.key_for(str(entry.txt_path)))
+                if doc_id is not None:
+                    self.row_doc[row] = doc_id
+                    self.doc_row[doc_id] = row
+
+        # 해상도 컬럼 (-2: 아직 안 읽음, -1: 이미지 없음/읽기 실패)
+        self.width = array('i', [-2]) * n
+        self.height = array('i', [-2]) * n
+        self._names = None
+        self._folders = None
+        self._image_rows = None
+
+    # ── 컬럼 ─────────────────────────────────────────────────────────
+
+    def _name_column(self) -> List[str]:
+        if self._names is None:
+            self._names = [e.stem for e in self.entries]
+        return self._names
+
+    def _folder_column(self) -> List[str]:
+        if self._folders is None:
+            prefix = self.root + os.sep
+            folders = []
+            for e in self.entries:
+                folder = e.folder
+                rel = folder[len(prefix):] if folder.startswith(prefix) else ('' if folder == self.root else folder)
+                folders.append(rel.replace(os.sep, '/'))
+            self._folders = folders
+        return self._folders
+
+    def _image_row_map(self) -> dict:
+        """메타데이터 색인 키(이미지 상대 경로) → 행"""
+        if self._image_rows is None:
+            key_for = self.meta_index.key_for
+            self._image_rows = {key_for(str(e.image_path)): row
+                                for row, e in enumerate(self.entries) if e.image_path is not None}
+        return self._image_rows
+
+    def _ensure_resolution(self, rows: Set[int]):
+        missing = [r for r in rows if self.width[r] == -2]
+        if not missing:
+            return
+        entries = self.entries
+
+        def _load(row):
+            return row, entries[row].resolution
+
+        total = len(missing)
+        if self.num_cores > 1 and total > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_cores) as ex:
+                results = ex.map(_load, missing, chunksize=64)
+                self._store_resolutions(results, total)
+        else:
+            self._store_resolutions(map(_load, missing), total)
+
+    def _store_resolutions(self, results, total):
+        for done, (row, res) in enumerate(results, 1):
+            if res:
+                self.width[row], self.height[row] = res
+            else:
+                self.width[row] = self.height[row] = -1
+            if self.progress_callback and (done % 500 == 0 or done == total):
+                self.progress_callback(done, total)
+
+    # ── 평가 ─────────────────────────────────────────────────────────
+
+    def run(self, query: CompiledQuery) -> List[int]:
+        """쿼리를 만족하는 행 번호 (원래 순서)"""
+        result = self._eval(query.root, set(range(len(self.entries))))
+        return sorted(result)
+
+    def _stopped(self) -> bool:
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def _eval(self, node, candidates: Set[int]) -> Set[int]:
+        if not candidates or self._stopped():
+            return set()
+        kind = node[0]
+        if kind == 'and':
+            for child in node[1]:
+                candidates = self._eval(child, candidates)
+                if not candidates:
+                    break
+            return candidates
+        if kind == 'or':
+            result = set()
+            for child in node[1]:
+                result |= self._eval(child, candidates - result)
+            return result
+        if kind == 'not':
+            return candidates - self._eval(node[1], candidates)
+        if kind == 'tag':
+            return self._eval_tag(node, candidates)
+        if kind == 'text':
+            return self._eval_text(node, candidates)
+        if kind in ('meta_text', 'meta_num'):
+            return self._eval_meta(node, candidates)
+        return self._eval_num(node, candidates)
+
+    def _eval_tag(self, node, candidates: Set[int]) -> Set[int]:
+        _, tkind, value, pattern = node
+        index = self.index
+        if tkind == 'exact':
+            tag_id = index.vocab.get(value)
+            tag_ids = [tag_id] if tag_id is not None else []
+        elif tkind == 'glob':
+            # 대소문자는 색인에서 이미 소문자로 정규화됨
+            tag_ids = [i for i, name in enumerate(index.vocab.names) if pattern.match(name)]
+        else:
+            tag_ids = [i for i, name in enumerate(index.vocab.names) if pattern.search(name)]
+
+        doc_row = self.doc_row
+        rows = set()
+        for tag_id in tag_ids:
+            for doc_id in index.postings.get(tag_id, ()):
+                row = doc_row.get(doc_id)
+                if row is not None:
+                    rows.add(row)
+        return candidates & rows
+
+    def _eval_text(self, node, candidates: Set[int]) -> Set[int]:
+        _, field, tkind, value, pattern = node
+        column = self._name_column() if field == 'name' else self._folder_column()
+        if tkind == 'sub':
+            return {r for r in candidates if value in column[r].lower()}
+        if tkind == 'glob':
+            return {r for r in candidates if pattern.match(column[r])}
+        return {r for r in candidates if pattern.search(column[r])}
+
+    def _eval_meta(self, node, candidates: Set[int]) -> Set[int]:
+        if self.meta_index is None:
+            raise QueryError("AI 생성 정보 필드를 쓰려면 메타데이터 색인이 필요합니다.")
+        if node[0] == 'meta_text':
+            _, field, tkind, value, pattern = node
+            keys = self.meta_index.match_text(field, tkind, value, pattern)
+        else:
+            _, field, op, a, b = node
+            keys = self.meta_index.match_number(field, op, a, b)
+        image_rows = self._image_row_map()
+        if len(keys) > len(image_rows):
+            # 색인 전체 결과가 배치보다 크면 배치 쪽을 순회
+            rows = {row for k, row in image_rows.items() if k in keys}
+        else:
+            rows = {image_rows[k] for k in keys if k in image_rows}
+        return candidates & rows
+
+    def _eval_num(self, node, candidates: Set[int]) -> Set[int]:
+        _, field, op, a, b = node
+        test = _compare(op, a, b)
+        entries = self.entries
+
+        if field == 'size':
+            return {r for r in candidates if test(entries[r].file_size_bytes / 1024)}
+        if field == 'tagcount':
+            doc_tags = self.index.doc_tags
+            row_doc = self.row_doc
+            return {r for r in candidates
+                    if test(len(doc_tags[row_doc[r]]) if row_doc[r] >= 0 else 0)}
+
+        if field in _CAPTION_STAT_FIELDS:
+            # 캡션 통계: 캡션을 한 번 읽어 FileEntry에 캐시 (결과 테이블을 만들 때 재사용)
+            pos = _CAPTION_STAT_FIELDS[field]
+            return {r for r in candidates if test(entries[r].caption_stats[pos])}
+
+        # 해상도 기반 필드: 이미지가 없는 행은 불일치
+        self._ensure_resolution(candidates)
+        width, height = self.width, self.height
+        if field == 'w':
+            return {r for r in candidates if width[r] >= 0 and test(width[r])}
+        if field == 'h':
+            return {r for r in candidates if height[r] >= 0 and test(height[r])}
+        if field == 'res':
+            return {r for r in candidates if width[r] >= 0 and test(width[r]) and test(height[r])}
+        # ratio
+        return {r for r in candidates if height[r] > 0 and test(width[r] / height[r])}
@@ -0,0 +1,248 @@
+"""
+태그 별칭/함의 모듈 - Danbooru 형식의 별칭(alias)·함의(implication) 표를 정규화된 해시 맵 하나로 만들어 디스크에 캐시하고,
+캡션의 태그마다 한 번의 조회로 별칭 치환과 함의 태그 확장을 함께 처리
+"""
+import os
+import csv
+import pickle
+import hashlib
+from itertools import chain
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Iterator
+
+from search_index import CACHE_DIR
+
+# 저장 형식 버전 (구조가 바뀌면 올려서 기존 캐시를 버리고 다시 생성)
+ALIAS_CACHE_VERSION = 1
+ALIAS_FILETYPES = [("CSV files", "*.csv"), ("All files", "*.*")]
+
+# Danbooru 내보내기 파일에서 적용할 상태 (deleted/retired/pending 등은 무시)
+ACTIVE_STATUSES = {'active', 'approved', ''}
+
+# (캐노니컬 태그, 함의 태그 목록) - 모두 정규화된 이름
+AliasEntry = Tuple[str, Tuple[str, ...]]
+
+
+class TagAliasError(ValueError):
+    """별칭/함의 파일을 읽을 수 없음"""
+
+
+def normalize_alias_key(tag: str) -> str:
+    """표의 태그 → 비교용 키 (tag_processor.normalize_tag와 같은 규칙)"""
+    return tag.strip().lower().replace('_', ' ')
+
+
+def _iter_pairs(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    CSV → (앞 태그, 뒤 태그) 쌍. 지원 형식:
+      - Danbooru 내보내기: 헤더에 antecedent_name, consequent_name (status가 있으면 active만)
+      - 머리줄 없는 2열: 앞 태그, 뒤 태그
+      - 태그 자동완성 CSV: 태그, 카테고리, 개수, "별칭1,별칭2" (별칭 → 태그)
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [col.strip().lower() for col in first]
+        if 'antecedent_name' in header and 'consequent_name' in header:
+            a_col = header.index('antecedent_name')
+            c_col = header.index('consequent_name')
+            s_col = header.index('status') if 'status' in header else None
+            width = max(a_col, c_col) + 1
+            for row in reader:
+                if len(row) < width:
+                    continue
+                if s_col is not None and s_col < len(row) and row[s_col].strip().lower() not in ACTIVE_STATUSES:
+                    continue
+                yield row[a_col], row[c_col]
+            return
+
+        for row in chain([first], reader):
+            if len(row) >= 4 and row[1].strip().isdigit():
+                for alias in row[3].split(','):
+                    if alias.strip():
+                        yield alias, row[0]
+            elif len(row) >= 2:
+                yield row[0], row[1]
+
+
+class TagAliasMap:
+    """
+    별칭/함의 표를 합친 조회용 맵 (모든 키와 값은 정규화된 태그 이름).
+
+      entries - 태그 → (캐노니컬 태그, 함의 태그 목록). 바뀌지도 확장되지도 않는 태그는 넣지 않는다
+      alias_count / implication_count - 읽어 들인 별칭 / 함의 규칙 수
+
+    별칭 사슬(a → b → c)은 미리 끝까지 따라가 a → c로 펴 두고, 함의는 별칭을 적용한 뒤
+    간접 함의(a ⇒ b ⇒ c)까지 모두 펼쳐 두므로, 캡션 태그마다 entries 조회 한 번으로 끝난다.
+    """
+    __slots__ = ('entries', 'alias_count', 'implication_count')
+
+    def __init__(self, entries: Optional[Dict[str, AliasEntry]] = None,
+                 alias_count: int = 0, implication_count: int = 0):
+        self.entries: Dict[str, AliasEntry] = entries if entries is not None else {}
+        self.alias_count = alias_count
+        self.implication_count = implication_count
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: str) -> Optional[AliasEntry]:
+        """정규화된 태그 → (캐노니컬 태그, 함의 태그 목록). 해당 없으면 None"""
+        return self.entries.get(key)
+
+    @classmethod
+    def build(cls, alias_pairs: Iterator[Tuple[str, str]],
+              implication_pairs: Iterator[Tuple[str, str]]) -> "TagAliasMap":
+        # 1. 별칭: 사슬을 끝까지 따라가 최종 태그로 (순환이면 순환 안에서 마지막으로 도달한 태그에서 멈춤)
+        direct: Dict[str, str] = {}
+        for antecedent, consequent in alias_pairs:
+            a, c = normalize_alias_key(antecedent), normalize_alias_key(consequent)
+            if a and c and a != c:
+                direct.setdefault(a, c)
+
+        resolved: Dict[str, str] = {}
+        for start in direct:
+            if start in resolved:
+                continue
+            path = [start]
+            on_path = {start}
+            tag = direct[start]
+            while tag in direct and tag not in resolved and tag not in on_path:
+                path.append(tag)
+                on_path.add(tag)
+                tag = direct[tag]
+            if tag in resolved:
+                final = resolved[tag]
+            elif tag in on_path:
+                final = path[-1]
+            else:
+                final = tag
+            for t in path:
+                resolved[t] = final
+        alias = {a: c for a, c in resolved.items() if a != c}
+
+        # 2. 함의: 양쪽에 별칭을 적용한 뒤 직접 함의 목록 구성
+        resolve = lambda tag: alias.get(tag, tag)
+        direct_implies: Dict[str, List[str]] = {}
+        implication_count = 0
+        for antecedent, consequent in implication_pairs:
+            a, c = resolve(normalize_alias_key(antecedent)), resolve(normalize_alias_key(consequent))
+            if not a or not c or a == c:
+                continue
+            targets = direct_implies.setdefault(a, [])
+            if c not in targets:
+                targets.append(c)
+                implication_count += 1
+
+        # 3. 간접 함의까지 펼침 (가까운 것부터, 중복·자기 자신 제외)
+        closure: Dict[str, Tuple[str, ...]] = {}
+        for start in direct_implies:
+            order: List[str] = []
+            seen = {start}
+            queue = list(direct_implies[start])
+            i = 0
+            while i < len(queue):
+                tag = queue[i]
+                i += 1
+                if tag in seen:
+                    continue
+                seen.add(tag)
+                order.append(tag)
+                queue.extend(direct_implies.get(tag, ()))
+            closure[start] = tuple(order)
+
+        # 4. 태그 하나당 조회 한 번이 되도록 별칭과 함의를 한 사전으로
+        entries: Dict[str, AliasEntry] = {tag: (tag, implied) for tag, implied in closure.items()}
+        for a, c in alias.items():
+            entries[a] = (c, closure.get(c, ()))
+        return cls(entries, len(alias), implication_count)
+
+
+# ---------------------------------------------------------------------------
+# 불러오기 (디스크 캐시)
+# ---------------------------------------------------------------------------
+
+def _source_stamp(path: str) -> Tuple[str, int, float]:
+    if not path:
+        return ("", 0, 0.0)
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime)
+
+
+def alias_source_stamp(alias_path: str, implication_path: str) -> Tuple:
+    """두 표 파일의 (절대 경로, 크기, 수정 시각). 파일이 바뀌면 값이 달라져 캐시를 다시 만든다"""
+    try:
+        return (_source_stamp(alias_path), _source_stamp(implication_path))
+    except OSError as e:
+        raise TagAliasError(f"별칭/함의 파일을 찾을 수 없습니다: {e}")
+
+
+def _cache_path(stamp: Tuple) -> Path:
+    key = "|".join(s[0] for s in stamp)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f"tag_alias_{digest}.pkl"
+
+
+def _load_cache(path: Path, stamp: Tuple) -> Optional[TagAliasMap]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != ALIAS_CACHE_VERSION or data.get('stamp') != stamp:
+            return None
+        return TagAliasMap(data['entries'], data['alias_count'], data['implication_count'])
+    except Exception as e:
+        print(f"별칭 캐시 불러오기 실패 (새로 생성): {e}")
+        return None
+
+
+def _save_cache(path: Path, stamp: Tuple, alias_map: TagAliasMap):
+    data = {
+        'version': ALIAS_CACHE_VERSION,
+        'stamp': stamp,
+        'entries': alias_map.entries,
+        'alias_count': alias_map.alias_count,
+        'implication_count': alias_map.implication_count,
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"별칭 캐시 저장 실패: {e}")
+
+
+# 프로세스 안에서 이미 불러온 맵 (stamp → 맵). 작업자 프로세스도 각자 한 번씩만 디스크 캐시를 읽는다
+_loaded: Dict[Tuple, TagAliasMap] = {}
+
+
+def load_tag_alias_map(alias_path: str = "", implication_path: str = "") -> TagAliasMap:
+    """
+    별칭 / 함의 CSV(둘 중 하나는 비워도 됨)를 읽어 TagAliasMap 반환.
+    처음에는 CSV를 해석해 cache/tag_alias_<경로 해시>.pkl로 저장하고, 이후에는 파일이 바뀌지 않았으면 캐시를 읽는다.
+    파일이 없거나 읽을 수 없으면 TagAliasError
+    """
+    stamp = alias_source_stamp(alias_path, implication_path)
+    alias_map = _loaded.get(stamp)
+    if alias_map is not None:
+        return alias_map
+
+    cache_path = _cache_path(stamp)
+    alias_map = _load_cache(cache_path, stamp)
+    if alias_map is None:
+        try:
+            alias_pairs = _iter_pairs(alias_path) if alias_path else iter(())
+            implication_pairs = _iter_pairs(implication_path) if implication_path else iter(())
+            alias_map = TagAliasMap.build(alias_pairs, implication_pairs)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise TagAliasError(f"별칭/함의 파일을 읽을 수 없습니다: {e}")
+        _save_cache(cache_path, stamp, alias_map)
+
+    _loaded.clear()   # 큰 표를 여러 벌 들고 있지 않도록 마지막 하나만 유지
+    _loaded[stamp] = alias_map
+    return alias_map
@@ -0,0 +1,125 @@
+"""
+태그 다중 패턴 매칭 모듈 - 태그 id 시퀀스 패턴 여러 개를 Aho-Corasick 오토마톤 하나로 묶어 캡션을 한 번만 훑어 찾기/치환
+"""
+from collections import deque
+from typing import List, Dict, Tuple, Sequence, Set, Optional
+
+Pattern = Tuple[int, ...]
+
+
+class TagMatcher:
+    """
+    태그 id 시퀀스 패턴 목록에 대한 Aho-Corasick 오토마톤.
+
+      patterns     - 패턴 목록 (인덱스가 곧 패턴 번호, 앞쪽일수록 우선)
+      replacements - 패턴별 치환 시퀀스 (빈 튜플이면 삭제)
+
+    매칭 규칙은 기존 _replace_subsequence와 같이 왼쪽부터, 겹치지 않게.
+    같은 위치에서 시작하는 패턴이 여러 개면 앞쪽 패턴을 쓰고, 똑같은 패턴이 중복되면 앞쪽 번호로만 보고한다.
+    패턴이 모두 태그 1개짜리면 오토마톤 대신 태그 → 패턴 번호 사전 하나로 처리한다.
+    """
+    def __init__(self, patterns: Sequence[Pattern], replacements: Optional[Sequence[Pattern]] = None):
+        self.patterns: List[Pattern] = [tuple(p) for p in patterns]
+        self.replacements: List[Pattern] = ([tuple(r) for r in replacements] if replacements is not None
+                                            else [()] * len(self.patterns))
+        self.single = all(len(p) == 1 for p in self.patterns)
+        # 태그 1개짜리 패턴: 태그 → 가장 앞쪽 패턴 번호
+        self._first: Dict[int, int] = {}
+        if self.single:
+            for idx, pattern in enumerate(self.patterns):
+                self._first.setdefault(pattern[0], idx)
+        else:
+            self._build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _build(self):
+        goto: List[Dict[int, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for idx, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for tok in pattern:
+                nxt = goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][tok] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            if not out[state]:   # 같은 패턴이 여러 번 있으면 앞쪽 번호만
+                out[state].append(idx)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and tok not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(tok, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    def matches(self, tags: Sequence[int]) -> List[Tuple[int, int]]:
+        """모든 출현 위치 [(시작 위치, 패턴 번호), ...] (겹침 포함, 끝 위치 순)"""
+        if self.single:
+            first = self._first
+            return [(pos, first[tok]) for pos, tok in enumerate(tags) if tok in first]
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        found = []
+        state = 0
+        for pos, tok in enumerate(tags):
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            for idx in out[state]:
+                found.append((pos - len(patterns[idx]) + 1, idx))
+        return found
+
+    def present(self, tags: Sequence[int]) -> Set[int]:
+        """캡션에 한 번이라도 나오는 패턴 번호"""
+        return {idx for _, idx in self.matches(tags)}
+
+    def replace(self, tags: List[int]) -> Tuple[List[int], Dict[int, int]]:
+        """
+        한 번의 왼쪽→오른쪽 훑기로 모든 패턴을 치환.
+        Returns: (결과 태그 리스트, {패턴 번호: 치환 횟수}). 일치가 없으면 tags를 그대로 반환
+        """
+        found = self.matches(tags)
+        if not found:
+            return tags, {}
+        replacements = self.replacements
+        counts: Dict[int, int] = {}
+        if self.single:
+            result = []
+            first = self._first
+            for tok in tags:
+                idx = first.get(tok)
+                if idx is None:
+                    result.append(tok)
+                else:
+                    result.extend(replacements[idx])
+                    counts[idx] = counts.get(idx, 0) + 1
+            return result, counts
+
+        found.sort()
+        patterns = self.patterns
+        result = []
+        pos = 0
+        for start, idx in found:
+            if start < pos:
+                continue
+            result.extend(tags[pos:start])
+            result.extend(replacements[idx])
+            counts[idx] = counts.get(idx, 0) + 1
+            pos = start + len(patterns[idx])
+        result.extend(tags[pos:])
+        return result, counts
@@ -2,15 +2,284 @@
 태그 처리 모듈 - 태그 치환, 삭제, 이동 및 정렬 기능
 """
 from pathlib import Path
-from typing import List, Tuple, Dict, Set, Optional
+from typing import List, Tuple, Dict, Set, Optional, FrozenSet, Union
 from utils import PERSON_COUNT_TAGS, process_with_multicore
-from functools import partial
+from tag_vocab import TagVocab, get_tag_vocab
+from tag_matcher import TagMatcher
+from tag_alias import load_tag_alias_map, alias_source_stamp
+from dataclasses import dataclass
+from functools import lru_cache
+import csv
 import json
 from datetime import datetime
 import os
 
 UNDO_DIR = Path("logs/undo")
 
+
+@lru_cache(maxsize=1 << 18)
+def normalize_tag(tag: str) -> str:
+    """비교용 태그 정규화 (소문자화, 언더바 → 공백). 같은 태그가 수없이 반복되므로 결과를 캐시"""
+    return tag.lower().replace('_', ' ')
+
+
+def _split_tags(tag_string: str) -> Tuple[str, ...]:
+    if not tag_string:
+        return ()
+    return tuple(t for t in (tag.strip() for tag in tag_string.split(',')) if t)
+
+
+def _condition_set(condition_str: str) -> FrozenSet[str]:
+    """'a|b|c' 조건 문자열 → 태그 집합 (하나라도 있으면 조건 충족, 비어 있으면 항상 불충족)"""
+    return frozenset(t.strip() for t in (condition_str or '').split('|') if t.strip())
+
+
+def _replace_subsequence(tags: List[int], find_seq: Tuple[int, ...],
+                         replace_seq: Tuple[int, ...]) -> Tuple[List[int], int]:
+    """tags에서 find_seq와 같은 연속 구간을 왼쪽부터 겹치지 않게 replace_seq로 교체 (빈 튜플이면 삭제)"""
+    first = find_seq[0]
+    if first not in tags:
+        return tags, 0
+    m = len(find_seq)
+    n = len(tags)
+    result_tags = []
+    count = 0
+    i = 0
+    while i < n:
+        tag = tags[i]
+        if tag == first and (m == 1 or tuple(tags[i:i + m]) == find_seq):
+            result_tags.extend(replace_seq)
+            count += 1
+            i += m
+        else:
+            result_tags.append(tag)
+            i += 1
+    return result_tags, count
+
+
+@dataclass(frozen=True)
+class TagProgram:
+    """
+    get_tag_options() 딕셔너리를 한 번 컴파일한 태그 처리 규칙 (변경 불가).
+    문자열 옵션은 미리 태그 튜플/조건 집합으로 나눠 두어 파일마다 다시 파싱하지 않으며,
+    비활성화된 기능은 빈 값으로 두어 process_tags_logic에서 바로 건너뛴다.
+    조건 집합이 None이면 무조건 실행.
+    """
+    missing_tag: str = ""
+    replace_find: Tuple[str, ...] = ()
+    replace_with: Tuple[str, ...] = ()
+    replace_find_str: str = ""
+    replace_with_str: str = ""
+    neighbor_target: str = ""
+    neighbor_pos: str = "after"
+    neighbor_add_pos: str = "prefix"
+    neighbor_text: str = ""
+    alias_file: str = ""
+    implication_file: str = ""
+    alias_stamp: Tuple = ()
+    csv_tags: FrozenSet[str] = frozenset()
+    csv_mode: str = "add"
+    csv_input: str = ""
+    csv_add_pos: str = "prefix"
+    delete_seqs: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    delete_condition: Optional[FrozenSet[str]] = None
+    use_move: bool = False
+    move_person: bool = False
+    move_solo: bool = False
+    move_custom_tags: FrozenSet[str] = frozenset()
+    add_tags: Tuple[str, ...] = ()
+    add_str: str = ""
+    add_condition: Optional[FrozenSet[str]] = None
+
+
+def compile_tag_program(options: Dict) -> TagProgram:
+    """옵션 딕셔너리 → TagProgram"""
+    fields = {}
+
+    if options.get('use_missing_tag'):
+        gender = options.get('missing_gender', 'girl')
+        count = options.get('missing_count', '1')
+        if count == "6+": fields['missing_tag'] = f"6+{gender}s"
+        elif count == "1": fields['missing_tag'] = f"1{gender}"
+        else: fields['missing_tag'] = f"{count}{gender}s"
+
+    if options.get('use_replace') and options.get('replace_find'):
+        find_str = options['replace_find'].strip()
+        replace_str = options.get('replace_with', '').strip()
+        fields.update(replace_find=_split_tags(find_str), replace_with=_split_tags(replace_str),
+                      replace_find_str=find_str, replace_with_str=replace_str)
+
+    if options.get('use_tag_alias') and (options.get('alias_file_path') or options.get('implication_file_path')):
+        alias_file = options.get('alias_file_path', '').strip()
+        implication_file = options.get('implication_file_path', '').strip()
+        # 표 파일이 바뀌면 다른 규칙으로 보고 다시 바인딩하도록 크기/수정 시각을 함께 보관
+        fields.update(alias_file=alias_file, implication_file=implication_file,
+                      alias_stamp=alias_source_stamp(alias_file, implication_file))
+
+    if options.get('use_neighbor_modify') and options.get('neighbor_target'):
+        target_tag = options['neighbor_target'].strip()
+        add_text = options.get('neighbor_text', '')
+        if target_tag and add_text:
+            fields.update(neighbor_target=target_tag, neighbor_text=add_text,
+                          neighbor_pos=options.get('neighbor_pos', 'after'),
+                          neighbor_add_pos=options.get('neighbor_add_pos', 'prefix'))
+
+    if options.get('use_csv_process') and options.get('csv_tags_set'):
+        fields.update(csv_tags=frozenset(options['csv_tags_set']),
+                      csv_mode=options.get('csv_mode', 'add'),
+                      csv_input=options.get('csv_input_text', ''),
+                      csv_add_pos=options.get('csv_add_pos', 'prefix'))
+
+    if options.get('use_delete') and options.get('delete_tags'):
+        seqs = []
+        for del_item in options['delete_tags']:
+            del_seq = _split_tags(del_item)
+            if del_seq:
+                seqs.append((del_item, del_seq))
+        fields['delete_seqs'] = tuple(seqs)
+        if options.get('use_conditional_delete'):
+            fields['delete_condition'] = _condition_set(options.get('condition_delete_tags', ''))
+
+    use_person = bool(options.get('use_move_person', False))
+    use_solo = bool(options.get('use_move_solo', False))
+    use_custom = bool(options.get('use_move_custom', False))
+    fields.update(use_move=use_person or use_solo or use_custom,
+                  move_person=use_person, move_solo=use_solo,
+                  move_custom_tags=frozenset(options.get('move_custom_tags', [])) if use_custom else frozenset())
+
+    if options.get('use_add') and options.get('add_tags'):
+        add_str = options['add_tags']
+        fields.update(add_tags=_split_tags(add_str), add_str=add_str)
+        if options.get('use_conditional_add'):
+            fields['add_condition'] = _condition_set(options.get('condition_add_tags', ''))
+
+    return TagProgram(**fields)
+
+
+class _BoundRules:
+    """
+    TagProgram을 공용 태그 어휘의 id로 바꾼 실행용 규칙 (프로세스마다 _bind_program으로 한 번 생성).
+    인접 수정/CSV 추가로 새로 생기는 태그와 CSV 정규화 비교 결과는 태그 id별로 캐시한다.
+    """
+    def __init__(self, program: TagProgram, vocab: TagVocab):
+        self.program = program
+        self.vocab = vocab
+        intern = vocab.intern
+        ids = lambda seq: tuple(intern(t) for t in seq)
+        id_set = lambda seq: frozenset(intern(t) for t in seq) if seq is not None else None
+
+        self.person_ids = frozenset(intern(t) for t in PERSON_COUNT_TAGS)
+        self.solo_id = intern('solo')
+        self.missing_tag = intern(program.missing_tag) if program.missing_tag else None
+        self.replace_find = ids(program.replace_find)
+        self.replace_with = ids(program.replace_with)
+        self.neighbor_target = intern(program.neighbor_target) if program.neighbor_target else None
+        self.delete_seqs = tuple((item, ids(seq)) for item, seq in program.delete_seqs)
+        # 삭제 패턴 전체를 오토마톤 하나로 묶음. 패턴이 모두 태그 1개짜리(또는 1개뿐)면 순서대로 적용한 결과와
+        # 같으므로 한 번에 치환하고, 아니면 캡션에 실제로 나오는 패턴만 순서대로 적용한다
+        self.delete_matcher = TagMatcher([seq for _, seq in self.delete_seqs])
+        self.delete_one_pass = self.delete_matcher.single or len(self.delete_seqs) <= 1
+        self.delete_condition = id_set(program.delete_condition)
+        self.move_custom_tags = id_set(program.move_custom_tags)
+        self.add_tags = ids(program.add_tags)
+        self.add_condition = id_set(program.add_condition)
+        self.csv_replacement = intern(program.csv_input)
+        self.alias_map = (load_tag_alias_map(program.alias_file, program.implication_file)
+                          if program.alias_stamp else None)
+
+        self._neighbor_cache: Dict[int, int] = {}
+        self._csv_hits: Dict[int, bool] = {}
+        self._csv_added: Dict[int, int] = {}
+        self._alias_cache: Dict[int, Optional[Tuple[int, Tuple[int, ...]]]] = {}
+
+    def neighbor_modified(self, tag_id: int) -> int:
+        new_id = self._neighbor_cache.get(tag_id)
+        if new_id is None:
+            program = self.program
+            name = self.vocab.names[tag_id]
+            name = program.neighbor_text + name if program.neighbor_add_pos == 'prefix' else name + program.neighbor_text
+            new_id = self._neighbor_cache[tag_id] = self.vocab.intern(name)
+        return new_id
+
+    def alias_entry(self, tag_id: int) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        """태그 id → (별칭을 적용한 태그 id, 함의 태그 id 목록). 해당 없으면 None.
+        결과 태그는 원래 태그가 언더바 표기면 언더바, 아니면 공백 표기로 쓴다"""
+        try:
+            return self._alias_cache[tag_id]
+        except KeyError:
+            pass
+        name = self.vocab.names[tag_id]
+        key = normalize_tag(name)
+        hit = self.alias_map.lookup(key)
+        if hit is not None:
+            canonical, implied = hit
+            styled = (lambda t: t.replace(' ', '_')) if '_' in name else (lambda t: t)
+            intern = self.vocab.intern
+            new_id = tag_id if canonical == key else intern(styled(canonical))
+            hit = (new_id, tuple(intern(styled(t)) for t in implied))
+        self._alias_cache[tag_id] = hit
+        return hit
+
+    def csv_hit(self, tag_id: int) -> bool:
+        hit = self._csv_hits.get(tag_id)
+        if hit is None:
+            hit = self._csv_hits[tag_id] = normalize_tag(self.vocab.names[tag_id]) in self.program.csv_tags
+        return hit
+
+    def csv_added(self, tag_id: int) -> int:
+        new_id = self._csv_added.get(tag_id)
+        if new_id is None:
+            program = self.program
+            name = self.vocab.names[tag_id]
+            name = program.csv_input + name if program.csv_add_pos == 'prefix' else name + program.csv_input
+            new_id = self._csv_added[tag_id] = self.vocab.intern(name)
+        return new_id
+
+
+@lru_cache(maxsize=8)
+def _bind_program(program: TagProgram) -> _BoundRules:
+    return _BoundRules(program, get_tag_vocab())
+
+
+@dataclass(frozen=True)
+class RuleStep:
+    """
+    규칙 파일의 한 단계. program은 기능 하나만 켠 TagProgram.
+    condition - 이 중 하나라도 있을 때만 실행 (None이면 항상)
+    unless    - 이 중 하나라도 있으면 건너뜀 (None이면 검사 안 함)
+    """
+    op: str
+    program: TagProgram
+    condition: Optional[FrozenSet[str]] = None
+    unless: Optional[FrozenSet[str]] = None
+    label: str = ""
+
+
+@dataclass(frozen=True)
+class TagRuleSet:
+    """순서대로 적용할 규칙 단계 목록 (tag_rules.load_rule_file로 생성)"""
+    name: str
+    steps: Tuple[RuleStep, ...]
+
+
+@lru_cache(maxsize=4)
+def _bind_rule_set(rule_set: TagRuleSet):
+    """[(단계, _BoundRules, 조건 id 집합, 제외 id 집합), ...]"""
+    vocab = get_tag_vocab()
+    id_set = lambda tags: frozenset(vocab.intern(t) for t in tags) if tags is not None else None
+    return [(step, _BoundRules(step.program, vocab), id_set(step.condition), id_set(step.unless))
+            for step in rule_set.steps]
+
+
+def _compile_options(options: Union[Dict, TagProgram, TagRuleSet]) -> Union[TagProgram, TagRuleSet]:
+    if isinstance(options, (TagProgram, TagRuleSet)):
+        return options
+    return compile_tag_program(options)
+
+
+# 작업자 프로세스가 초기화 때 받아 두는 규칙 (TagProcessor._init_worker)
+_worker_program: Optional[Union[TagProgram, TagRuleSet]] = None
+
 class TagProcessor:
     @staticmethod
     def save_undo_info(folder_path: str, tag_history: List[Dict[str, str]]):
@@ -107,6 +376,23 @@ class TagProcessor:
             
         return success, fail, logs
 
+    @staticmethod
+    def load_csv_tags(csv_path: str, category_id: str) -> Set[str]:
+        """CSV 파일(태그, 카테고리, ...)에서 지정 카테고리 태그를 정규화해 집합으로 반환"""
+        if not csv_path or not os.path.exists(csv_path):
+            return set()
+        category_id = str(category_id).strip()
+        tags_set = set()
+        try:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if len(row) >= 2 and row[1].strip() == category_id:
+                        # 첫 번째 열: 태그, 두 번째 열: 카테고리 (normalize_tag와 같은 규칙, 캐시는 쓰지 않음)
+                        tags_set.add(row[0].strip().lower().replace('_', ' '))
+        except Exception as e:
+            print(f"CSV 로드 오류: {e}")
+        return tags_set
+
     @staticmethod
     def parse_tags(tag_string: str) -> List[str]:
         """
@@ -126,183 +412,174 @@ class TagProcessor:
     @staticmethod
     def process_tags_logic(
         content: str, 
-        options: Dict
+        options: Union[Dict, "TagProgram", "TagRuleSet"]
     ) -> Tuple[str, List[str]]:
         """
         태그 처리 핵심 로직
+        태그는 공용 어휘(get_tag_vocab)의 정수 id 리스트로 바꿔 처리하고, 결과를 쓸 때만 문자열로 되돌린다.
+        options에 옵션 딕셔너리를 주면 매번 컴파일하므로, 여러 파일에는 compile_tag_program() 결과를 넘길 것.
+        규칙 파일(TagRuleSet)이면 단계를 순서대로 같은 id 리스트에 적용해 한 번만 문자열로 되돌린다.
         """
-        tags = TagProcessor.parse_tags(content)
-        original_tags = tags[:]
+        program = _compile_options(options)
+        vocab = get_tag_vocab()
+        tags = vocab.encode_list(TagProcessor.parse_tags(content))
         changes = []
 
+        if isinstance(program, TagRuleSet):
+            for no, (step, rules, condition, unless) in enumerate(_bind_rule_set(program), 1):
+                if condition is not None and condition.isdisjoint(tags):
+                    continue
+                if unless is not None and not unless.isdisjoint(tags):
+                    continue
+                step_changes = []
+                tags = TagProcessor._apply_program(tags, step.program, rules, step_changes)
+                changes.extend(f"[{no}단계] {change}" for change in step_changes)
+        else:
+            tags = TagProcessor._apply_program(tags, program, _bind_program(program), changes)
+
+        return vocab.join(tags), changes
+
+    @staticmethod
+    def _apply_program(tags: List[int], program: "TagProgram", rules: "_BoundRules",
+                       changes: List[str]) -> List[int]:
+        """태그 id 리스트에 규칙 하나를 적용한 결과 반환 (변경 내역은 changes에 추가)"""
+        vocab = rules.vocab
+
         # 0. 누락된 인원수 태그 추가
-        if options.get('use_missing_tag'):
-            has_person_tag = any(tag in tags for tag in PERSON_COUNT_TAGS)
-            if not has_person_tag:
-                gender = options.get('missing_gender', 'girl')
-                count = options.get('missing_count', '1')
-                if count == "6+": new_tag = f"6+{gender}s"
-                elif count == "1": new_tag = f"1{gender}"
-                else: new_tag = f"{count}{gender}s"
-                
-                if new_tag not in tags:
-                    tags.insert(0, new_tag)
-                    changes.append(f"주입: 누락된 인원수 태그 '{new_tag}' 추가")
-
-        # --- 헬퍼 함수 ---
-        def replace_subsequence(current_tags: List[str], find_seq: List[str], replace_seq: List[str] = None) -> Tuple[List[str], int]:
-            if not find_seq: return current_tags, 0
-            result_tags = []
-            i = 0
-            count = 0
-            n = len(current_tags)
-            m = len(find_seq)
-            while i < n:
-                if i + m <= n and current_tags[i:i+m] == find_seq:
-                    if replace_seq: result_tags.extend(replace_seq)
-                    count += 1
-                    i += m
-                else:
-                    result_tags.append(current_tags[i])
-                    i += 1
-            return result_tags, count
-            
-        def check_condition(current_tags: List[str], condition_str: str) -> bool:
-            if not condition_str: return False
-            cond_tags = [t.strip() for t in condition_str.split('|') if t.strip()]
-            for ct in cond_tags:
-                if ct in current_tags: return True
-            return False
+        new_tag = rules.missing_tag
+        if new_tag is not None and rules.person_ids.isdisjoint(tags) and new_tag not in tags:
+            tags.insert(0, new_tag)
+            changes.append(f"주입: 누락된 인원수 태그 '{program.missing_tag}' 추가")
+
+        # 0.5 태그 별칭 / 함의 (태그 id마다 한 번만 조회해 캐시)
+        if rules.alias_map is not None:
+            # 중복 판단은 정규화한 이름으로 ('cat_ears'와 'cat ears'는 같은 태그)
+            alias_entry = rules.alias_entry
+            names = vocab.names
+            key = lambda tag_id: normalize_tag(names[tag_id])
+            original = {key(tag) for tag in tags}
+            result = []
+            emitted = set()
+            implied_ids = []
+            aliased_count = 0
+            for tag in tags:
+                hit = alias_entry(tag)
+                if hit is None:
+                    result.append(tag)
+                    emitted.add(key(tag))
+                    continue
+                new_tag, implied = hit
+                new_key = key(new_tag)
+                if new_tag != tag:
+                    aliased_count += 1
+                    # 별칭 결과가 이미 캡션에 있으면 중복으로 넣지 않음
+                    if new_key in original or new_key in emitted:
+                        implied_ids.extend(implied)
+                        continue
+                result.append(new_tag)
+                emitted.add(new_key)
+                implied_ids.extend(implied)
+            added = []
+            for tag in implied_ids:
+                implied_key = key(tag)
+                if implied_key not in emitted:
+                    emitted.add(implied_key)
+                    added.append(tag)
+            if aliased_count or added:
+                tags = result + added
+                if aliased_count:
+                    changes.append(f"별칭: {aliased_count}개 태그 정리")
+                if added:
+                    changes.append(f"함의: '{vocab.join(added)}' 추가")
 
         # 1. 태그 치환
-        if options.get('use_replace') and options.get('replace_find'):
-            find_str = options['replace_find'].strip()
-            replace_str = options.get('replace_with', '').strip()
-            find_seq = TagProcessor.parse_tags(find_str)
-            replace_seq = TagProcessor.parse_tags(replace_str)
-            if find_seq:
-                tags, replaced_count = replace_subsequence(tags, find_seq, replace_seq)
-                if replaced_count > 0:
-                    changes.append(f"치환: '{find_str}' → '{replace_str}' ({replaced_count}건)")
-
-        # 1.5 인접 태그 수정 (New)
-        if options.get('use_neighbor_modify') and options.get('neighbor_target'):
-            target_tag = options['neighbor_target'].strip()
-            neighbor_pos = options.get('neighbor_pos', 'after') # 'before' or 'after'
-            add_pos = options.get('neighbor_add_pos', 'prefix') # 'prefix' or 'suffix'
-            add_text = options.get('neighbor_text', '')
-            
-            if target_tag and add_text:
-                new_tags = tags[:]
-                modified_indices = set()
-                
-                # 타겟 태그의 모든 위치 찾기
-                for idx, tag in enumerate(tags):
-                    if tag == target_tag:
-                        # 인접 인덱스 계산
-                        n_idx = idx - 1 if neighbor_pos == 'before' else idx + 1
-                        
-                        if 0 <= n_idx < len(tags):
-                            modified_indices.add(n_idx)
-                
-                # 실제 수정 적용 (뒤에서부터 수정해야 인덱스 혼란 방지 - 여기서는 인덱스 고정이라 상관없지만 습관적 처리)
-                if modified_indices:
-                    for m_idx in sorted(list(modified_indices), reverse=True):
-                        orig_neighbor = tags[m_idx]
-                        if add_pos == 'prefix':
-                            tags[m_idx] = add_text + orig_neighbor
-                        else:
-                            tags[m_idx] = orig_neighbor + add_text
-                    
-                    changes.append(f"인접수정: '{target_tag}'의 {neighbor_pos} 태그에 '{add_text}' {add_pos} 추가")
-
-        # 1.7 CSV 기반 특수 처리 (New)
-        if options.get('use_csv_process') and options.get('csv_tags_set'):
-            csv_tags = options['csv_tags_set']
-            csv_mode = options.get('csv_mode', 'add')
-            csv_input = options.get('csv_input_text', '')
-            csv_add_pos = options.get('csv_add_pos', 'prefix')
-            
+        if rules.replace_find:
+            tags, replaced_count = _replace_subsequence(tags, rules.replace_find, rules.replace_with)
+            if replaced_count > 0:
+                changes.append(f"치환: '{program.replace_find_str}' → '{program.replace_with_str}' ({replaced_count}건)")
+
+        # 1.5 인접 태그 수정
+        if rules.neighbor_target is not None:
+            target_tag = rules.neighbor_target
+            offset = -1 if program.neighbor_pos == 'before' else 1
+            modified_indices = {
+                idx + offset for idx, tag in enumerate(tags)
+                if tag == target_tag and 0 <= idx + offset < len(tags)
+            }
+            if modified_indices:
+                modify = rules.neighbor_modified
+                for m_idx in modified_indices:
+                    tags[m_idx] = modify(tags[m_idx])
+                changes.append(f"인접수정: '{program.neighbor_target}'의 {program.neighbor_pos} 태그에 "
+                               f"'{program.neighbor_text}' {program.neighbor_add_pos} 추가")
+
+        # 1.7 CSV 기반 특수 처리 (정규화 비교 결과는 태그 id별로 캐시)
+        if program.csv_tags:
+            csv_hit = rules.csv_hit
+            csv_mode = program.csv_mode
             new_tags_list = []
             csv_changes_count = 0
-            
             for tag in tags:
-                # 비교를 위한 정규화 (소문자화 및 언더바->공백)
-                normalized_tag = tag.lower().replace('_', ' ')
-                
-                if normalized_tag in csv_tags:
+                if csv_hit(tag):
                     csv_changes_count += 1
                     if csv_mode == 'add':
-                        processed_tag = (csv_input + tag) if csv_add_pos == 'prefix' else (tag + csv_input)
-                        new_tags_list.append(processed_tag)
+                        new_tags_list.append(rules.csv_added(tag))
                     elif csv_mode == 'replace':
-                        new_tags_list.append(csv_input)
-                    elif csv_mode == 'delete':
-                        continue # 추가하지 않음 (삭제)
+                        new_tags_list.append(rules.csv_replacement)
+                    # delete: 추가하지 않음
                 else:
                     new_tags_list.append(tag)
-            
+
             if csv_changes_count > 0:
                 tags = new_tags_list
                 mode_name = "추가" if csv_mode == 'add' else "치환" if csv_mode == 'replace' else "삭제"
                 changes.append(f"CSV처리: {csv_changes_count}개 태그 {mode_name} 완료")
 
         # 2. 태그 삭제
-        if options.get('use_delete') and options.get('delete_tags'):
-            should_delete = True
-            if options.get('use_conditional_delete'):
-                if not check_condition(tags, options.get('condition_delete_tags', '')):
-                    should_delete = False
-            
-            if should_delete:
-                raw_delete_input = options['delete_tags']
-                total_deleted = 0
+        if rules.delete_seqs and (rules.delete_condition is None
+                                  or not rules.delete_condition.isdisjoint(tags)):
+            if rules.delete_one_pass:
+                tags, counts = rules.delete_matcher.replace(tags)
+                deleted_items = [rules.delete_seqs[idx][0] for idx in sorted(counts)]
+            else:
+                # 앞선 삭제로 태그가 붙으면서 새로 생기는 여러 태그짜리 패턴까지 기존 순서 적용과 같게 처리
+                present = rules.delete_matcher.present(tags)
                 deleted_items = []
-                for del_item in raw_delete_input:
-                    del_seq = TagProcessor.parse_tags(del_item)
-                    if not del_seq: continue
-                    tags, count = replace_subsequence(tags, del_seq, None)
-                    if count > 0:
-                        total_deleted += count
-                        deleted_items.append(del_item)
-                if total_deleted > 0:
-                    changes.append(f"삭제: {', '.join(deleted_items)}")
+                changed = False
+                for idx, (del_item, del_seq) in enumerate(rules.delete_seqs):
+                    if idx in present or (changed and len(del_seq) > 1):
+                        tags, count = _replace_subsequence(tags, del_seq, ())
+                        if count > 0:
+                            deleted_items.append(del_item)
+                            changed = True
+            if deleted_items:
+                changes.append(f"삭제: {', '.join(deleted_items)}")
+
+        add_ok = bool(rules.add_tags) and (rules.add_condition is None
+                                           or not rules.add_condition.isdisjoint(tags))
 
         # 3. 태그 이동 및 정렬
-        use_person = options.get('use_move_person', False)
-        use_solo = options.get('use_move_solo', False)
-        use_custom = options.get('use_move_custom', False)
-        
-        person_group = []
-        solo_group = []
-        custom_group = []
-        other_group = []
-        custom_targets = set(options.get('move_custom_tags', [])) if use_custom else set()
-        
-        if use_person or use_solo or use_custom:
+        if program.use_move:
+            person_ids = rules.person_ids if program.move_person else ()
+            solo_id = rules.solo_id if program.move_solo else -1
+            custom_targets = rules.move_custom_tags
+            person_group = []
+            solo_group = []
+            custom_group = []
+            other_group = []
             for tag in tags:
-                if use_person and tag in PERSON_COUNT_TAGS: person_group.append(tag)
-                elif use_solo and tag == 'solo': solo_group.append(tag)
-                elif use_custom and tag in custom_targets: custom_group.append(tag)
+                if tag in person_ids: person_group.append(tag)
+                elif tag == solo_id: solo_group.append(tag)
+                elif tag in custom_targets: custom_group.append(tag)
                 else: other_group.append(tag)
-            
-            person_group.sort()
+
+            person_group.sort(key=vocab.names.__getitem__)
             front_tags = person_group + solo_group + custom_group
-            
+
             # 4. 태그 추가 (이동 옵션 활성화 시)
-            if options.get('use_add') and options.get('add_tags'):
-                should_add = True
-                if options.get('use_conditional_add'):
-                    all_current_tags = person_group + solo_group + custom_group + other_group
-                    if not check_condition(all_current_tags, options.get('condition_add_tags', '')):
-                        should_add = False
-                
-                if should_add:
-                    add_str = options['add_tags']
-                    new_add_tags = TagProcessor.parse_tags(add_str)
-                    if new_add_tags:
-                        front_tags.extend(new_add_tags)
-                        changes.append(f"추가: '{add_str}'")
+            if add_ok:
+                front_tags.extend(rules.add_tags)
+                changes.append(f"추가: '{program.add_str}'")
 
             new_order = front_tags + other_group
             if new_order != tags:
@@ -315,24 +592,14 @@ class TagProcessor:
                     changes.append(f"이동: {', '.join(moved_info)} 앞으로")
 
         # 4. 태그 추가 (이동 옵션 비활성화 시)
-        elif options.get('use_add') and options.get('add_tags'):
-            should_add = True
-            if options.get('use_conditional_add'):
-                if not check_condition(tags, options.get('condition_add_tags', '')):
-                    should_add = False
-            
-            if should_add:
-                add_str = options['add_tags']
-                new_add_tags = TagProcessor.parse_tags(add_str)
-                if new_add_tags:
-                    tags = new_add_tags + tags
-                    changes.append(f"추가: '{add_str}' (맨 앞)")
+        elif add_ok:
+            tags = list(rules.add_tags) + tags
+            changes.append(f"추가: '{program.add_str}' (맨 앞)")
 
-        final_content = TagProcessor.join_tags(tags)
-        return final_content, changes
+        return tags
 
     @staticmethod
-    def process_single_file(file_path: Path, options: Dict) -> Tuple[bool, str, List[str], str]:
+    def process_single_file(file_path: Path, options: Union[Dict, "TagProgram", "TagRuleSet"]) -> Tuple[bool, str, List[str], str]:
         """
         단일 파일 처리 래퍼
         Returns: (is_changed, log_message, changes, original_content)
@@ -353,6 +620,16 @@ class TagProcessor:
         except Exception as e:
             return False, f"오류: {file_path.name} - {str(e)}", [], ""
 
+    @staticmethod
+    def _init_worker(program: Union["TagProgram", "TagRuleSet"]):
+        """작업자 초기화 - 컴파일된 규칙을 작업자당 한 번만 받아 둔다"""
+        global _worker_program
+        _worker_program = program
+
+    @staticmethod
+    def _process_with_worker_program(file_path: Path) -> Tuple[bool, str, List[str], str]:
+        return TagProcessor.process_single_file(file_path, _worker_program)
+
     @staticmethod
     def process_folder(text_files: List[Path], options: Dict, num_cores: int = 1, folder_path: str = "") -> Tuple[int, int, List[str]]:
         """
@@ -362,12 +639,15 @@ class TagProcessor:
         if not text_files:
             return 0, 0, ["처리할 파일이 없습니다."]
         
-        worker = partial(TagProcessor.process_single_file, options=options)
-        
+        # 옵션은 한 번만 컴파일해 작업자마다 한 번씩만 전달 (파일마다 옵션을 다시 파싱/전송하지 않음)
+        # 규칙 파일도 같은 경로로 파일마다 한 번 읽고 한 번 쓰며, 실행 취소 기록은 실행당 하나
+        program = _compile_options(options)
         results = process_with_multicore(
-            worker,
+            TagProcessor._process_with_worker_program,
             text_files,
-            num_cores
+            num_cores,
+            initializer=TagProcessor._init_worker,
+            initargs=(program,),
         )
         
         success = 0
@@ -406,7 +686,7 @@ class TagProcessor:
         return success, fail, logs
     
     @staticmethod
-    def preview_tag_processing(text_files: List[Path], options: Dict, preview_count: int = 10) -> List[str]:
+    def preview_tag_processing(text_files: List[Path], options: Union[Dict, "TagRuleSet"], preview_count: int = 10) -> List[str]:
         """
         미리보기 생성
         """
@@ -414,9 +694,15 @@ class TagProcessor:
             return ["처리할 파일이 없습니다."]
         
         preview = []
+        program = _compile_options(options)
         
         # 옵션 요약
         op_summary = []
+        if isinstance(program, TagRuleSet):
+            op_summary.append(f"[규칙 파일] {program.name} ({len(program.steps)}단계)")
+            options = {}
+        if options.get('use_tag_alias'): op_summary.append("[별칭/함의] " + " / ".join(
+            os.path.basename(p) for p in (options.get('alias_file_path', ''), options.get('implication_file_path', '')) if p))
         if options.get('use_replace'): op_summary.append(f"[치환] {options['replace_find']} -> {options['replace_with']}")
         if options.get('use_delete'): 
             op_summary.append(f"[삭제] {len(options['delete_tags'])}개 태그" + (" (조건부)" if options.get('use_conditional_delete') else ""))
@@ -436,7 +722,7 @@ class TagProcessor:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read().strip()
                 
-                new_content, changes = TagProcessor.process_tags_logic(content, options)
+                new_content, changes = TagProcessor.process_tags_logic(content, program)
                 
                 if changes: # 변경사항이 있는 경우
                     processed_count += 1
@@ -0,0 +1,221 @@
+"""
+태그 규칙 파일 모듈 - 치환/삭제/추가/이동/인접 수정/CSV 처리 단계를 순서대로 적은 JSON 규칙 파일을 읽고 씀
+"""
+import os
+import json
+from typing import List, Dict, Optional, FrozenSet, Union
+
+from tag_processor import TagProcessor, TagRuleSet, RuleStep, compile_tag_program
+from tag_alias import load_tag_alias_map, TagAliasError
+
+# 형식 버전 (구조가 바뀌면 올리고 load_rule_file에서 구버전 처리)
+RULE_FILE_VERSION = 1
+RULE_FILETYPES = [("태그 규칙 (JSON)", "*.json"), ("모든 파일", "*.*")]
+
+# 단계 종류 → 표시 이름
+RULE_OPS = {
+    'fill_person': "인원수 태그 채우기",
+    'alias':       "별칭/함의",
+    'replace':     "치환",
+    'neighbor':    "인접 수정",
+    'csv':         "CSV 처리",
+    'delete':      "삭제",
+    'add':         "추가",
+    'move':        "이동",
+}
+
+
+class RuleFileError(ValueError):
+    """규칙 파일 형식 오류"""
+
+
+def _tag_list(value: Union[str, List[str], None]) -> List[str]:
+    """'a|b' 문자열 또는 리스트 → 태그(또는 태그 시퀀스) 리스트"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split('|')
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _condition(value) -> Optional[FrozenSet[str]]:
+    return frozenset(_tag_list(value)) if value is not None else None
+
+
+def _rule_path(value, base_dir: str) -> str:
+    """규칙 파일 기준 상대 경로 허용"""
+    path = str(value or '').strip()
+    if path and not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    return path
+
+
+def _step_options(op: str, rule: Dict, base_dir: str) -> Dict:
+    """단계 하나 → 그 기능만 켠 옵션 딕셔너리 (compile_tag_program 입력)"""
+    if op == 'fill_person':
+        return {'use_missing_tag': True, 'missing_gender': rule.get('gender', 'girl'),
+                'missing_count': str(rule.get('count', '1'))}
+    if op == 'replace':
+        return {'use_replace': True, 'replace_find': str(rule.get('find', '')),
+                'replace_with': str(rule.get('with', ''))}
+    if op == 'neighbor':
+        return {'use_neighbor_modify': True, 'neighbor_target': str(rule.get('target', '')),
+                'neighbor_pos': rule.get('pos', 'after'), 'neighbor_add_pos': rule.get('add_pos', 'prefix'),
+                'neighbor_text': str(rule.get('text', ''))}
+    if op == 'csv':
+        csv_path = _rule_path(rule.get('file'), base_dir)
+        if not os.path.exists(csv_path):
+            raise RuleFileError(f"CSV 파일을 찾을 수 없습니다: {csv_path}")
+        return {'use_csv_process': True,
+                'csv_tags_set': TagProcessor.load_csv_tags(csv_path, rule.get('category', '0')),
+                'csv_mode': rule.get('mode', 'add'), 'csv_input_text': str(rule.get('text', '')),
+                'csv_add_pos': rule.get('add_pos', 'prefix')}
+    if op == 'alias':
+        alias_path = _rule_path(rule.get('aliases'), base_dir)
+        implication_path = _rule_path(rule.get('implications'), base_dir)
+        if not alias_path and not implication_path:
+            return {}
+        try:
+            # 여기서 한 번 읽어 두면 작업자 프로세스는 디스크 캐시만 읽는다
+            load_tag_alias_map(alias_path, implication_path)
+        except TagAliasError as e:
+            raise RuleFileError(str(e))
+        return {'use_tag_alias': True, 'alias_file_path': alias_path, 'implication_file_path': implication_path}
+    if op == 'delete':
+        return {'use_delete': True, 'delete_tags': _tag_list(rule.get('tags'))}
+    if op == 'add':
+        tags = rule.get('tags', '')
+        return {'use_add': True, 'add_tags': ', '.join(tags) if isinstance(tags, list) else str(tags).strip()}
+    if op == 'move':
+        custom = _tag_list(rule.get('tags'))
+        options = {'use_move_person': bool(rule.get('person', False)), 'use_move_solo': bool(rule.get('solo', False)),
+                   'use_move_custom': bool(custom), 'move_custom_tags': custom}
+        # add: 앞으로 옮긴 태그 바로 뒤에 넣을 태그 (태그 탭에서 이동과 추가를 함께 켠 것과 같음)
+        add = rule.get('add')
+        if add:
+            options.update(use_add=True, add_tags=', '.join(add) if isinstance(add, list) else str(add).strip())
+            if rule.get('add_if') is not None:
+                options.update(use_conditional_add=True, condition_add_tags='|'.join(_tag_list(rule['add_if'])))
+        return options
+    raise RuleFileError(f"알 수 없는 규칙 종류입니다: {op}")
+
+
+def _step_label(op: str, rule: Dict) -> str:
+    detail = {
+        'fill_person': lambda: f"{rule.get('count', '1')}{rule.get('gender', 'girl')}",
+        'alias':       lambda: " / ".join(os.path.basename(str(rule[k])) for k in ('aliases', 'implications') if rule.get(k)),
+        'replace':     lambda: f"{rule.get('find', '')} → {rule.get('with', '')}",
+        'neighbor':    lambda: f"{rule.get('target', '')} {rule.get('pos', 'after')} {rule.get('text', '')}",
+        'csv':         lambda: f"{os.path.basename(str(rule.get('file', '')))} #{rule.get('category', '0')} {rule.get('mode', 'add')}",
+        'delete':      lambda: f"{len(_tag_list(rule.get('tags')))}개",
+        'add':         lambda: str(rule.get('tags', '')),
+        'move':        lambda: ", ".join(
+            [n for n, on in (("인원수", rule.get('person')), ("solo", rule.get('solo'))) if on]
+            + _tag_list(rule.get('tags'))) + (f" + 추가 {rule['add']}" if rule.get('add') else ""),
+    }[op]()
+    label = f"[{RULE_OPS[op]}] {detail}"
+    if rule.get('if') is not None:
+        label += " (조건부)"
+    if rule.get('unless') is not None:
+        label += " (제외 조건)"
+    return label
+
+
+def compile_rules(data: Dict, base_dir: str = "") -> TagRuleSet:
+    """
+    규칙 파일 내용 → TagRuleSet.
+    단계마다 op 외에 if(하나라도 있을 때만 실행)와 unless(하나라도 있으면 건너뜀),
+    enabled(false면 건너뜀)를 둘 수 있다. 조건은 'a|b' 문자열 또는 리스트.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('rules'), list):
+        raise RuleFileError("규칙 파일이 아닙니다. (rules 목록이 없습니다)")
+    version = data.get('tag_rules', RULE_FILE_VERSION)
+    if not isinstance(version, int) or isinstance(version, bool) or version > RULE_FILE_VERSION:
+        raise RuleFileError(f"지원하지 않는 규칙 파일 버전입니다: {version!r}")
+
+    steps = []
+    for no, rule in enumerate(data['rules'], 1):
+        if not isinstance(rule, dict):
+            raise RuleFileError(f"{no}번째 규칙의 형식이 잘못되었습니다.")
+        if not rule.get('enabled', True):
+            continue
+        op = rule.get('op', '')
+        try:
+            program = compile_tag_program(_step_options(op, rule, base_dir))
+        except RuleFileError as e:
+            raise RuleFileError(f"{no}번째 규칙: {e}")
+        if program == compile_tag_program({}):
+            raise RuleFileError(f"{no}번째 규칙({RULE_OPS[op]})의 내용이 비어 있습니다.")
+        steps.append(RuleStep(op, program, _condition(rule.get('if')), _condition(rule.get('unless')),
+                              _step_label(op, rule)))
+    if not steps:
+        raise RuleFileError("적용할 규칙이 없습니다.")
+    return TagRuleSet(str(data.get('name', '')), tuple(steps))
+
+
+def load_rule_file(path: str) -> TagRuleSet:
+    """규칙 파일을 읽어 컴파일. 파일을 읽을 수 없거나 형식이 잘못되면 RuleFileError"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuleFileError(f"규칙 파일을 읽을 수 없습니다: {e}")
+    rule_set = compile_rules(data, os.path.dirname(os.path.abspath(path)))
+    if not rule_set.name:
+        rule_set = TagRuleSet(os.path.splitext(os.path.basename(path))[0], rule_set.steps)
+    return rule_set
+
+
+def rules_from_options(options: Dict) -> List[Dict]:
+    """
+    태그 탭 옵션(get_tag_options) → 규칙 목록 (process_tags_logic의 적용 순서대로).
+    이동과 추가를 함께 켠 경우 태그 탭처럼 추가 태그가 옮긴 태그 바로 뒤에 들어가도록 move 단계의 add로 넣는다.
+    """
+    rules = []
+    if options.get('use_missing_tag'):
+        rules.append({'op': 'fill_person', 'gender': options.get('missing_gender', 'girl'),
+                      'count': options.get('missing_count', '1')})
+    if options.get('use_tag_alias') and (options.get('alias_file_path') or options.get('implication_file_path')):
+        rules.append({'op': 'alias', 'aliases': options.get('alias_file_path', ''),
+                      'implications': options.get('implication_file_path', '')})
+    if options.get('use_replace') and options.get('replace_find'):
+        rules.append({'op': 'replace', 'find': options['replace_find'], 'with': options.get('replace_with', '')})
+    if options.get('use_neighbor_modify') and options.get('neighbor_target', '').strip() and options.get('neighbor_text'):
+        rules.append({'op': 'neighbor', 'target': options['neighbor_target'],
+                      'pos': options.get('neighbor_pos', 'after'), 'add_pos': options.get('neighbor_add_pos', 'prefix'),
+                      'text': options.get('neighbor_text', '')})
+    if options.get('use_csv_process') and options.get('csv_file_path'):
+        rules.append({'op': 'csv', 'file': options['csv_file_path'], 'category': options.get('csv_category', '0'),
+                      'mode': options.get('csv_mode', 'add'), 'text': options.get('csv_input_text', ''),
+                      'add_pos': options.get('csv_add_pos', 'prefix')})
+    if options.get('use_delete') and options.get('delete_tags'):
+        rule = {'op': 'delete', 'tags': list(options['delete_tags'])}
+        if options.get('use_conditional_delete'):
+            rule['if'] = options.get('condition_delete_tags', '')
+        rules.append(rule)
+    use_move = options.get('use_move_person') or options.get('use_move_solo') or options.get('use_move_custom')
+    use_add = options.get('use_add') and options.get('add_tags')
+    if use_move:
+        rule = {'op': 'move', 'person': bool(options.get('use_move_person')),
+                'solo': bool(options.get('use_move_solo')),
+                'tags': list(options.get('move_custom_tags', [])) if options.get('use_move_custom') else []}
+        if use_add:
+            rule['add'] = options['add_tags']
+            if options.get('use_conditional_add'):
+                rule['add_if'] = options.get('condition_add_tags', '')
+        rules.append(rule)
+    elif use_add:
+        rule = {'op': 'add', 'tags': options['add_tags']}
+        if options.get('use_conditional_add'):
+            rule['if'] = options.get('condition_add_tags', '')
+        rules.append(rule)
+    return rules
+
+
+def save_rule_file(path: str, rules: List[Dict], name: str = ""):
+    """규칙 목록을 규칙 파일로 저장 (임시 파일 → os.replace)"""
+    data = {'tag_rules': RULE_FILE_VERSION, 'name': name, 'rules': rules}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,83 @@
+"""
+태그 어휘 모듈 - 서로 다른 태그 문자열마다 정수 id를 부여(interning)해, 태그 비교/집합 연산을 정수로 처리
+"""
+from array import array
+from typing import List, Dict, Iterable, FrozenSet, Optional
+
+
+class TagVocab:
+    """
+    태그 문자열 ↔ 정수 id 대응표 (id는 0부터 등록 순서대로, 한 번 부여하면 바뀌지 않음).
+
+      names - id -> 태그 문자열
+      ids   - 태그 문자열 -> id
+
+    캡션은 array('I') 또는 id 리스트로 보관하고, 파일에 쓸 때만 decode()로 문자열로 되돌린다.
+    id는 이 객체 안에서만 유효하므로 프로세스 사이에는 문자열(또는 names)로 주고받아야 한다.
+    정규화(소문자화 등)는 하지 않으므로 호출하는 쪽에서 정규화한 태그를 넣는다.
+    """
+    __slots__ = ('names', 'ids')
+
+    def __init__(self, names: Optional[Iterable[str]] = None):
+        self.names: List[str] = list(names) if names is not None else []
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self.ids
+
+    def intern(self, tag: str) -> int:
+        """태그 id (처음 보는 태그면 새로 등록)"""
+        tag_id = self.ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.names)
+            self.names.append(tag)
+            self.ids[tag] = tag_id
+        return tag_id
+
+    def get(self, tag: str) -> Optional[int]:
+        """등록된 태그의 id (없으면 None, 등록하지 않음)"""
+        return self.ids.get(tag)
+
+    def name(self, tag_id: int) -> str:
+        return self.names[tag_id]
+
+    def encode_list(self, tags: Iterable[str]) -> List[int]:
+        """태그 목록 → id 리스트 (순서 유지). 모두 등록된 태그면 등록 검사 없이 바로 변환"""
+        ids = self.ids
+        if not isinstance(tags, (list, tuple)):
+            tags = list(tags)
+        try:
+            return [ids[t] for t in tags]
+        except KeyError:
+            intern = self.intern
+            return [intern(t) for t in tags]
+
+    def encode(self, tags: Iterable[str]) -> array:
+        """태그 목록 → array('I') (캡션 보관용, 항목당 4바이트)"""
+        return array('I', self.encode_list(tags))
+
+    def encode_set(self, tags: Iterable[str]) -> FrozenSet[int]:
+        return frozenset(self.encode_list(tags))
+
+    def decode(self, tag_ids: Iterable[int]) -> List[str]:
+        names = self.names
+        return [names[i] for i in tag_ids]
+
+    def join(self, tag_ids: Iterable[int], sep: str = ', ') -> str:
+        """id 목록 → 캡션 문자열 (파일에 쓸 때)"""
+        names = self.names
+        return sep.join([names[i] for i in tag_ids])
+
+
+_shared_vocab: Optional[TagVocab] = None
+
+
+def get_tag_vocab() -> TagVocab:
+    """프로세스 전체에서 공유하는 태그 어휘 (작업자 프로세스는 각자 따로 가짐)"""
+    global _shared_vocab
+    if _shared_vocab is None:
+        _shared_vocab = TagVocab()
+    return _shared_vocab
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 저장소 루트의 모듈을 바로 import (패키지 구조가 아님)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
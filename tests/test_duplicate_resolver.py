@@ -0,0 +1,79 @@
+"""duplicate_resolver - 실행 취소 기록이 처리된 파일을 빠짐없이 담는지, 중지 요청이 바로 반영되는지"""
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+import duplicate_resolver
+from duplicate_resolver import DuplicateResolver
+
+
+def _make_plan(folder, names):
+    for name in names:
+        (folder / f"{name}.png").write_bytes(name.encode())
+        (folder / f"{name}.txt").write_text(name, encoding='utf-8')
+    keep = SimpleNamespace(path=str(folder / "keep.png"))
+    return [(keep, [SimpleNamespace(path=str(folder / f"{name}.png")) for name in names])]
+
+
+def test_caption_failure_keeps_image_in_undo_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(duplicate_resolver, "UNDO_DIR", tmp_path / "undo")
+    plan = _make_plan(tmp_path, ["a", "b"])
+    real_move = shutil.move
+
+    def move(src, dst):
+        if str(src).endswith("b.txt"):
+            raise OSError("locked")
+        return real_move(src, dst)
+
+    monkeypatch.setattr(duplicate_resolver.shutil, "move", move)
+    success, fail, logs, done = DuplicateResolver().execute(plan, 'move', str(tmp_path), str(tmp_path / "out"))
+    assert (success, fail) == (1, 1)
+    assert len(done) == 2
+
+    monkeypatch.setattr(duplicate_resolver.shutil, "move", real_move)
+    restored, failed, _ = DuplicateResolver.undo_last_resolution(str(tmp_path))
+    assert (restored, failed) == (3, 0)
+    assert (tmp_path / "b.png").exists() and (tmp_path / "b.txt").exists()
+
+
+def test_journal_survives_interrupted_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(duplicate_resolver, "UNDO_DIR", tmp_path / "undo")
+    plan = _make_plan(tmp_path, ["a", "b"])
+    real_resolve = duplicate_resolver._resolve_one
+
+    def resolve(src, dst, include_caption):
+        if src.endswith("b.png"):
+            raise KeyboardInterrupt
+        return real_resolve(src, dst, include_caption)
+
+    monkeypatch.setattr(duplicate_resolver, "_resolve_one", resolve)
+    with pytest.raises(KeyboardInterrupt):
+        DuplicateResolver().execute(plan, 'move', str(tmp_path), str(tmp_path / "out"), max_workers=1)
+
+    # 중단 전에 옮긴 a는 기록이 남아 복구됨
+    restored, failed, _ = DuplicateResolver.undo_last_resolution(str(tmp_path))
+    assert (restored, failed) == (2, 0)
+    assert (tmp_path / "a.png").exists() and (tmp_path / "a.txt").exists()
+
+
+def test_stop_skips_unsubmitted_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(duplicate_resolver, "UNDO_DIR", tmp_path / "undo")
+    names = [f"f{i:02d}" for i in range(100)]
+    plan = _make_plan(tmp_path, names)
+    resolver = DuplicateResolver()
+    real_guarded = resolver._guarded_resolve
+    submitted = []
+
+    def guarded(src, dst, include_caption):
+        submitted.append(src)
+        record = real_guarded(src, dst, include_caption)
+        resolver.stop()
+        return record
+
+    monkeypatch.setattr(resolver, "_guarded_resolve", guarded)
+    success, fail, logs, done = resolver.execute(plan, 'move', str(tmp_path), str(tmp_path / "out"), max_workers=1)
+    assert success == len(done) == 1
+    assert len(submitted) < len(names)
+    assert any(line.startswith("중지됨") for line in logs)
@@ -0,0 +1,20 @@
+"""manifest - 매니페스트 헤더 검사"""
+import json
+
+import pytest
+
+from manifest import MANIFEST_VERSION, ManifestError, read_header
+
+
+@pytest.mark.parametrize("version", ["1", None, 1.5, True, MANIFEST_VERSION + 1])
+def test_bad_version_is_manifest_error(tmp_path, version):
+    path = tmp_path / "list.jsonl"
+    path.write_text(json.dumps({'manifest': version}) + "\n", encoding='utf-8')
+    with pytest.raises(ManifestError):
+        read_header(str(path))
+
+
+def test_current_version_is_read(tmp_path):
+    path = tmp_path / "list.jsonl"
+    path.write_text(json.dumps({'manifest': MANIFEST_VERSION, 'root': "x"}) + "\n", encoding='utf-8')
+    assert read_header(str(path))['root'] == "x"
@@ -0,0 +1,30 @@
+"""metadata_index - 메타데이터 FTS 조회"""
+import pytest
+
+import metadata_index
+from metadata_index import MetadataIndex
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(metadata_index, "CACHE_DIR", tmp_path / "cache")
+    with MetadataIndex(str(tmp_path)) as idx:
+        idx._store("a.png", 0.0, {'parameters': {'prompt': 'red hat, smile', 'negative_prompt': 'blurry'}})
+        idx._store("b.png", 0.0, None)
+        yield idx
+
+
+@pytest.mark.parametrize("field,kind,value", [
+    ("prompt", "glob", "*"),
+    ("prompt", "sub", ""),
+    ("negative", "sub", "*"),
+    ("meta", "glob", "**"),
+])
+def test_query_without_terms_matches_nothing(index, field, kind, value):
+    assert index.match_text(field, kind, value) == set()
+
+
+def test_prompt_word_and_prefix(index):
+    assert index.match_text("prompt", "sub", "red") == {"a.png"}
+    assert index.match_text("prompt", "glob", "smi*") == {"a.png"}
+    assert index.match_text("negative", "sub", "red") == set()
@@ -0,0 +1,54 @@
+"""rename_processor - 매니페스트 일부만 이름을 바꿀 때 기존 파일 보호"""
+import rename_processor
+from rename_processor import RenameProcessor
+
+
+def _make_pair(folder, stem, content):
+    img = folder / f"{stem}.png"
+    txt = folder / f"{stem}.txt"
+    img.write_bytes(content.encode())
+    txt.write_text(content, encoding='utf-8')
+    return img, txt
+
+
+def test_manifest_subset_does_not_overwrite_existing_targets(tmp_path, monkeypatch):
+    monkeypatch.setattr(rename_processor, "UNDO_DIR", tmp_path / "undo")
+    folder = tmp_path / "data"
+    folder.mkdir()
+    pairs = [_make_pair(folder, "a", "a"), _make_pair(folder, "b", "b")]
+    _make_pair(folder, "img_0001", "keep1")
+    _make_pair(folder, "img_0002", "keep2")
+
+    success, fail, logs = RenameProcessor.rename_file_pairs(str(folder), "img", 1, 4, paired_files=pairs)
+
+    assert success == 0
+    assert fail == 2
+    assert any("img_0001.png" in line for line in logs)
+    # 기존 파일과 대상 파일 모두 그대로
+    assert (folder / "img_0001.txt").read_text(encoding='utf-8') == "keep1"
+    assert (folder / "img_0002.png").read_bytes() == b"keep2"
+    assert (folder / "a.txt").exists() and (folder / "b.png").exists()
+    assert not list(folder.glob("_temp_*"))
+
+
+def test_temp_name_collision_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(rename_processor, "UNDO_DIR", tmp_path / "undo")
+    pairs = [_make_pair(tmp_path, "a", "a")]
+    (tmp_path / "_temp_1.txt").write_text("other", encoding='utf-8')
+
+    success, fail, logs = RenameProcessor.rename_file_pairs(str(tmp_path), "img", 1, 4, paired_files=pairs)
+
+    assert success == 0
+    assert (tmp_path / "_temp_1.txt").read_text(encoding='utf-8') == "other"
+
+
+def test_renaming_into_names_held_by_other_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(rename_processor, "UNDO_DIR", tmp_path / "undo")
+    # b가 img_0001 이름을 가지고 있어도 b 자신도 대상이므로 정상적으로 서로 바뀜
+    pairs = [_make_pair(tmp_path, "img_0002", "first"), _make_pair(tmp_path, "img_0001", "second")]
+
+    success, fail, _ = RenameProcessor.rename_file_pairs(str(tmp_path), "img", 1, 4, paired_files=pairs)
+
+    assert (success, fail) == (2, 0)
+    assert (tmp_path / "img_0001.txt").read_text(encoding='utf-8') == "first"
+    assert (tmp_path / "img_0002.txt").read_text(encoding='utf-8') == "second"
@@ -0,0 +1,29 @@
+"""search_filter - 폴더 스캔 시 이미지·캡션 짝 맞추기"""
+from search_filter import collect_entries
+
+
+def _pairs(folder):
+    return {(e.image_path.name if e.image_path else None, e.txt_path.name if e.txt_path else None)
+            for e in collect_entries(folder, recursive=False)}
+
+
+def test_caption_pairing_ignores_case(tmp_path):
+    for name in ("a.PNG", "a.txt", "B.jpg", "b.TXT", "c.png", "orphan.Txt"):
+        (tmp_path / name).write_bytes(b"x")
+
+    assert _pairs(tmp_path) == {
+        ("a.PNG", "a.txt"),
+        ("B.jpg", "b.TXT"),
+        ("c.png", None),
+        (None, "orphan.Txt"),
+    }
+
+
+def test_directory_symlink_is_not_followed(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"x")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / "up").symlink_to(tmp_path, target_is_directory=True)
+
+    entries = collect_entries(tmp_path, recursive=True)
+    assert [e.image_path for e in entries] == [tmp_path / "a.png"]
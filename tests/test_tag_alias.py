@@ -0,0 +1,38 @@
+"""tag_alias - 별칭/함의 적용 결과"""
+import pytest
+
+import tag_alias
+from tag_alias import TagAliasMap
+from tag_processor import TagProcessor
+
+
+@pytest.fixture
+def alias_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(tag_alias, "CACHE_DIR", tmp_path / "cache")
+    aliases = tmp_path / "aliases.csv"
+    aliases.write_text("antecedent_name,consequent_name,status\n"
+                       "yellow_hair,blonde,active\nblonde,blonde_hair,active\nold_tag,new_tag,deleted\n",
+                       encoding='utf-8')
+    implications = tmp_path / "implications.csv"
+    implications.write_text("antecedent_name,consequent_name,status\n"
+                            "cat_ears,animal_ears,active\nanimal_ears,ears,active\n", encoding='utf-8')
+    return {'use_tag_alias': True, 'alias_file_path': str(aliases), 'implication_file_path': str(implications)}
+
+
+def test_build_flattens_chains_and_implications():
+    alias_map = TagAliasMap.build(iter([('a', 'b'), ('b', 'c'), ('x', 'y'), ('y', 'x')]), iter([('c', 'd'), ('d', 'e')]))
+    assert alias_map.lookup('a') == ('c', ('d', 'e'))
+    assert alias_map.lookup('b') == ('c', ('d', 'e'))
+    assert alias_map.lookup('x') == ('y', ())
+
+
+def test_alias_and_implication_applied(alias_files):
+    result, _ = TagProcessor.process_tags_logic("1girl, yellow_hair, cat ears, old_tag", alias_files)
+    assert result == "1girl, blonde_hair, cat ears, old_tag, animal ears, ears"
+
+
+def test_duplicates_are_detected_across_underscore_and_space(alias_files):
+    result, _ = TagProcessor.process_tags_logic("cat ears, animal_ears", alias_files)
+    assert result == "cat ears, animal_ears, ears"
+    result, _ = TagProcessor.process_tags_logic("blonde, blonde_hair", alias_files)
+    assert result == "blonde_hair"
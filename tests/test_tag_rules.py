@@ -0,0 +1,79 @@
+"""tag_rules - 태그 탭 옵션을 저장한 규칙 파일이 탭과 같은 결과를 내는지, 잘못된 규칙 파일 처리"""
+import random
+
+import pytest
+
+from tag_processor import TagProcessor
+from tag_rules import RuleFileError, compile_rules, rules_from_options
+
+VOCAB = ['1girl', '2girls', '1boy', 'solo', 'hat', 'red hat', 'x_y', 'a', 'b', 'c', 'long hair', 'smile']
+
+
+def _random_options(rnd, csv_path):
+    pick = lambda k=2: '|'.join(rnd.sample(VOCAB, rnd.randint(1, k)))
+    return {
+        'use_missing_tag': rnd.random() < 0.3,
+        'missing_gender': rnd.choice(['girl', 'boy']),
+        'missing_count': rnd.choice(['1', '2', '6+']),
+        'use_replace': rnd.random() < 0.3,
+        'replace_find': ', '.join(rnd.sample(VOCAB, rnd.randint(1, 2))),
+        'replace_with': rnd.choice(['', 'red hat', 'c, a']),
+        'use_neighbor_modify': rnd.random() < 0.3,
+        'neighbor_target': rnd.choice(VOCAB),
+        'neighbor_pos': rnd.choice(['before', 'after']),
+        'neighbor_add_pos': rnd.choice(['prefix', 'suffix']),
+        'neighbor_text': rnd.choice(['', '@', 'blue ']),
+        'use_csv_process': rnd.random() < 0.2,
+        'csv_file_path': csv_path,
+        'csv_category': '0',
+        'csv_mode': rnd.choice(['add', 'replace', 'delete']),
+        'csv_add_pos': rnd.choice(['prefix', 'suffix']),
+        'csv_input_text': rnd.choice(['', '#']),
+        'csv_tags_set': TagProcessor.load_csv_tags(csv_path, '0'),
+        'use_delete': rnd.random() < 0.4,
+        'delete_tags': [rnd.choice(['a', 'b, c', 'hat', 'x_y'])],
+        'use_conditional_delete': rnd.random() < 0.5,
+        'condition_delete_tags': pick(),
+        'use_add': rnd.random() < 0.5,
+        'add_tags': rnd.choice(['red hat', '2girls, z', 'hat']),
+        'use_conditional_add': rnd.random() < 0.3,
+        'condition_add_tags': pick(),
+        'use_move_person': rnd.random() < 0.5,
+        'use_move_solo': rnd.random() < 0.4,
+        'use_move_custom': rnd.random() < 0.3,
+        'move_custom_tags': rnd.sample(VOCAB, rnd.randint(1, 2)),
+    }
+
+
+def test_rule_file_from_options_matches_tab(tmp_path):
+    csv_path = tmp_path / "tags.csv"
+    csv_path.write_text("long_hair,0\nsmile,0\nhat,1\n", encoding='utf-8')
+    rnd = random.Random(0)
+    checked = 0
+    for _ in range(3000):
+        options = _random_options(rnd, str(csv_path))
+        rules = rules_from_options(options)
+        if not rules:
+            continue
+        rule_set = compile_rules({'rules': rules}, str(tmp_path))
+        for _ in range(5):
+            caption = ', '.join(rnd.choice(VOCAB) for _ in range(rnd.randint(0, 8)))
+            expected = TagProcessor.process_tags_logic(caption, options)[0]
+            assert TagProcessor.process_tags_logic(caption, rule_set)[0] == expected, (caption, options, rules)
+            checked += 1
+    assert checked > 1000
+
+
+def test_move_with_add_keeps_added_tags_after_moved_groups():
+    options = {'use_move_person': True, 'use_add': True, 'add_tags': 'red hat'}
+    rules = rules_from_options(options)
+    assert [r['op'] for r in rules] == ['move']
+    result = TagProcessor.process_tags_logic('1boy, x_y, a, 2girls', compile_rules({'rules': rules}))[0]
+    assert result == TagProcessor.process_tags_logic('1boy, x_y, a, 2girls', options)[0]
+    assert result == '1boy, 2girls, red hat, x_y, a'
+
+
+@pytest.mark.parametrize("version", ["1", None, 1.5, True, 99])
+def test_bad_version_is_rule_file_error(version):
+    with pytest.raises(RuleFileError):
+        compile_rules({'tag_rules': version, 'rules': []})
@@ -0,0 +1,245 @@
+"""
+썸네일 캐시 모듈 - 이미지 내용 지문을 키로 고정 크기 WebP 썸네일을 디스크에 보관하고, 용량 기준 LRU로 정리
+"""
+import os
+import time
+import hashlib
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple, Optional, Callable, Hashable
+
+from PIL import Image, ImageOps
+
+from search_index import CACHE_DIR
+
+# 썸네일 한 변의 최대 크기 (px). 바꾸면 키가 달라져 기존 썸네일은 LRU로 자연히 정리됨
+THUMB_SIZE = 256
+THUMB_QUALITY = 80
+
+# 디스크 캐시 최대 용량. 넘으면 가장 오래 쓰지 않은 썸네일부터 EVICT_RATIO까지 삭제
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+EVICT_RATIO = 0.9
+
+# 내용 지문에 쓰는 파일 앞/뒤 구간 크기
+FINGERPRINT_BYTES = 64 * 1024
+
+# 사용 시각 갱신(utime) 최소 간격 (초). 스크롤할 때마다 쓰기가 생기지 않도록
+TOUCH_INTERVAL = 3600
+
+
+def content_key(path: str, size: int) -> str:
+    """
+    파일 내용 지문 (크기 + 앞/뒤 64KB의 SHA-1).
+    경로나 mtime이 아니라 내용 기준이므로 복사/이동/하드링크된 같은 이미지는 썸네일을 공유한다.
+    """
+    h = hashlib.sha1(f"{THUMB_SIZE}:{size}:".encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES * 2:
+            f.seek(-FINGERPRINT_BYTES, os.SEEK_END)
+            h.update(f.read(FINGERPRINT_BYTES))
+        elif size > FINGERPRINT_BYTES:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def make_thumbnail(path: str, size: int = THUMB_SIZE) -> Image.Image:
+    """
+    원본을 draft 디코딩(JPEG은 1/2~1/8 축소 디코딩)으로 열어 size 이내로 축소한 RGB/RGBA 썸네일.
+    EXIF 방향은 축소 후에 보정한다.
+    """
+    with Image.open(path) as img:
+        img.draft('RGB', (size, size))
+        img.thumbnail((size, size), Image.BILINEAR, reducing_gap=2.0)
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+        img.load()
+        return img
+
+
+class ThumbnailCache:
+    """
+    공용 디스크 썸네일 캐시 (cache/thumbs/<키 앞 2자>/<키>.webp).
+
+    키는 content_key()이며, 경로·크기·mtime → 키 대응은 메모리에만 두어 같은 세션에서는 지문 계산도 건너뛴다.
+    사용 시각은 파일 mtime으로 기록(TOUCH_INTERVAL 간격)하고, 총 용량이 max_bytes를 넘으면
+    mtime이 오래된 순으로 삭제한다. 여러 스레드에서 동시에 get()해도 안전하다.
+    """
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else CACHE_DIR / "thumbs"
+        self.max_bytes = max_bytes
+        self._keys: Dict[Tuple[str, int, int], str] = {}
+        self._usage: Optional[int] = None   # 처음 저장할 때 디렉토리를 훑어 계산
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.webp"
+
+    def key_of(self, path: str) -> str:
+        st = os.stat(path)
+        ident = (path, st.st_size, st.st_mtime_ns)
+        key = self._keys.get(ident)
+        if key is None:
+            key = content_key(path, st.st_size)
+            self._keys[ident] = key
+        return key
+
+    def get(self, path: str) -> Optional[Image.Image]:
+        """썸네일 (캐시에 없으면 만들어 저장). 원본을 읽을 수 없으면 None"""
+        try:
+            key = self.key_of(path)
+        except OSError:
+            return None
+        thumb_path = self.path_for(key)
+        try:
+            with Image.open(thumb_path) as cached:
+                cached.load()
+                thumb = cached.copy()
+            self._touch(thumb_path)
+            return thumb
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"썸네일 캐시 읽기 실패 (다시 생성): {thumb_path} - {e}")
+
+        try:
+            thumb = make_thumbnail(path)
+        except Exception:
+            return None
+        self._store(thumb_path, thumb)
+        return thumb
+
+    def _touch(self, thumb_path: Path):
+        try:
+            if os.path.getmtime(thumb_path) < time.time() - TOUCH_INTERVAL:
+                os.utime(thumb_path)
+        except OSError:
+            pass
+
+    def _store(self, thumb_path: Path, thumb: Image.Image):
+        try:
+            thumb_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = thumb_path.with_name(f"{thumb_path.stem}.{threading.get_ident()}.tmp")
+            thumb.save(tmp_path, 'WEBP', quality=THUMB_QUALITY, method=4)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, thumb_path)
+        except Exception as e:
+            print(f"썸네일 캐시 저장 실패: {e}")
+            return
+        with self._lock:
+            if self._usage is None:
+                self._usage = self._scan_usage()
+            else:
+                self._usage += size
+            if self._usage > self.max_bytes:
+                self._evict()
+
+    def _scan_usage(self) -> int:
+        return sum(size for _, _, size in self._iter_files())
+
+    def _iter_files(self):
+        """(경로, mtime, 크기) 목록"""
+        if not self.root.exists():
+            return
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for item in os.scandir(sub.path):
+                if item.name.endswith('.webp'):
+                    try:
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    yield item.path, st.st_mtime, st.st_size
+
+    def _evict(self):
+        """가장 오래 쓰지 않은 썸네일부터 삭제해 max_bytes * EVICT_RATIO 이하로 줄임 (_lock 안에서 호출)"""
+        files = sorted(self._iter_files(), key=lambda f: f[1])
+        usage = sum(f[2] for f in files)
+        target = self.max_bytes * EVICT_RATIO
+        for path, _, size in files:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+                usage -= size
+            except OSError:
+                pass
+        self._usage = usage
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._iter_files()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._usage = 0
+
+
+_shared_cache: Optional[ThumbnailCache] = None
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """프로그램 전체에서 공유하는 썸네일 캐시"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ThumbnailCache()
+    return _shared_cache
+
+
+class ThumbnailLoader:
+    """
+    썸네일을 백그라운드 스레드 풀에서 만들어 on_ready(token, path, 썸네일 또는 None)로 전달.
+    on_ready는 작업 스레드에서 호출되므로 UI 쪽은 after()로 넘겨 처리해야 한다.
+
+    요청은 나중에 들어온 것부터 처리(LIFO)해 지금 화면에 보이는 썸네일이 먼저 나오며,
+    retain()으로 화면을 벗어난 대기 요청을 버린다.
+    """
+    def __init__(self, on_ready: Callable[[Hashable, str, Optional[Image.Image]], None],
+                 num_workers: int = 4, cache: Optional[ThumbnailCache] = None):
+        self._on_ready = on_ready
+        self._cache = cache or get_thumbnail_cache()
+        self._pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._num_workers = max(1, num_workers)
+        self._running = 0
+        self._closed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._num_workers)
+
+    def request(self, token: Hashable, path: str):
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.pop(token, None)
+            self._pending[token] = path
+            if self._running < self._num_workers:
+                self._running += 1
+                self._executor.submit(self._work)
+
+    def retain(self, tokens):
+        """tokens에 없는 대기 요청 취소"""
+        keep = set(tokens)
+        with self._lock:
+            for token in [t for t in self._pending if t not in keep]:
+                del self._pending[token]
+
+    def _work(self):
+        while True:
+            with self._lock:
+                if self._closed or not self._pending:
+                    self._running -= 1
+                    return
+                token, path = self._pending.popitem(last=True)
+            thumb = self._cache.get(path)
+            if not self._closed:
+                self._on_ready(token, path, thumb)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,328 @@
+"""
+썸네일 격자 창 - 결과 목록을 썸네일 격자로 보여주며, 화면에 보이는 칸만 그리고 썸네일은 백그라운드에서 캐시로부터 불러옴
+"""
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from PIL import ImageTk
+
+from thumbnail_cache import ThumbnailLoader, THUMB_SIZE
+
+# 칸 크기 (썸네일 + 파일명 줄 + 여백)
+CELL_PAD = 8
+LABEL_HEIGHT = 18
+
+# 메모리에 유지할 PhotoImage 수 (화면 몇 장 분량)
+PHOTO_CACHE_SIZE = 600
+
+# 화면 아래로 미리 요청해 둘 행 수
+PREFETCH_ROWS = 2
+
+WHEEL_ROWS = 1
+
+
+class ThumbnailGridWindow:
+    """
+    별도 Toplevel 창의 썸네일 격자.
+
+    row_count   - 현재 결과 수
+    image_path  - idx → 이미지 경로 (없으면 None)
+    label       - idx → 칸 아래 표시할 이름
+    is_checked  - idx → 체크 여부 (격자에 ☑ 표시)
+    on_select   - 칸 클릭 시 idx 전달 (본 목록 선택/미리보기 연동)
+    on_toggle   - 우클릭 / Space 시 idx 전달 (체크 토글)
+    on_open     - 더블클릭 시 idx 전달 (뷰어 창 열기)
+
+    Canvas에는 보이는 행 수 × 열 수만큼의 칸만 두고 스크롤 위치(top 행)가 바뀌면 내용만 바꿔 채우며,
+    스크롤바는 직접 계산한다 (VirtualGrid와 같은 방식). 썸네일은 ThumbnailLoader가 만들고,
+    결과 순서가 바뀌어도 다시 읽지 않도록 PhotoImage는 경로 기준으로 보관한다.
+    """
+    def __init__(self, parent, title: str,
+                 row_count: Callable[[], int],
+                 image_path: Callable[[int], Optional[str]],
+                 label: Callable[[int], str],
+                 is_checked: Callable[[int], bool],
+                 on_select: Optional[Callable[[int], None]] = None,
+                 on_toggle: Optional[Callable[[int], None]] = None,
+                 on_open: Optional[Callable[[int], None]] = None,
+                 num_workers: int = 4):
+        self._row_count = row_count
+        self._image_path = image_path
+        self._label = label
+        self._is_checked = is_checked
+        self._on_select = on_select
+        self._on_toggle = on_toggle
+        self._on_open = on_open
+
+        self._cell_w = THUMB_SIZE + CELL_PAD * 2
+        self._cell_h = THUMB_SIZE + LABEL_HEIGHT + CELL_PAD * 2
+        self._cols = 1
+        self._rows = 1          # 화면에 보이는 행 수
+        self._top = 0           # 맨 위에 보이는 격자 행
+        self._selected: Optional[int] = None
+        self._photos: "OrderedDict[str, ImageTk.PhotoImage]" = OrderedDict()
+        self._failed = set()
+        self._visible_paths = {}  # 경로 → 보이는 idx 목록 (썸네일 도착 시 해당 칸만 갱신)
+        self._closed = False
+
+        self.win = tk.Toplevel(parent)
+        self.win.title(title)
+        self.win.geometry("1100x760")
+        self.win.minsize(400, 300)
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        bar = ttk.Frame(self.win)
+        bar.pack(fill=tk.X, padx=5, pady=3)
+        self._info_var = tk.StringVar(value="")
+        ttk.Label(bar, textvariable=self._info_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            bar,
+            text="[클릭] 목록에서 선택   [우클릭/Space] 체크   [더블클릭] 뷰어   [PgUp/PgDn/Home/End] 이동",
+            foreground="#888888",
+        ).pack(side=tk.RIGHT, padx=8)
+
+        frame = ttk.Frame(self.win)
+        frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self._canvas = tk.Canvas(frame, bg="#2b2b2b", highlightthickness=0, takefocus=1)
+        self._vsb = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self._canvas.grid(row=0, column=0, sticky="nsew")
+        self._vsb.grid(row=0, column=1, sticky="ns")
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        self._canvas.bind("<Configure>", self._on_resize)
+        self._canvas.bind("<MouseWheel>", self._on_wheel)
+        self._canvas.bind("<Button-4>", self._on_wheel)
+        self._canvas.bind("<Button-5>", self._on_wheel)
+        self._canvas.bind("<Button-1>", self._on_click)
+        self._canvas.bind("<Double-Button-1>", self._on_double)
+        self._canvas.bind("<Button-3>", self._on_right_click)
+        for key in ("<Prior>", "<Next>", "<Home>", "<End>", "<Up>", "<Down>", "<Left>", "<Right>"):
+            self._canvas.bind(key, self._on_key)
+        self._canvas.bind("<space>", self._on_space)
+
+        self._loader = ThumbnailLoader(self._on_thumb_ready, num_workers=num_workers)
+        self._canvas.focus_set()
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # 외부 갱신
+    # ------------------------------------------------------------------
+
+    def alive(self) -> bool:
+        return not self._closed
+
+    def reset(self):
+        """결과 목록이 새로 바뀜 (새 검색/정렬). 스크롤을 맨 위로"""
+        self._top = 0
+        self._selected = None
+        self.refresh()
+
+    def refresh(self):
+        """행 수/체크 상태 변경 반영 (스크롤 위치 유지)"""
+        if self._closed:
+            return
+        self._top = max(0, min(self._top, self._max_top()))
+        self._render()
+
+    def select(self, idx: Optional[int]):
+        """본 목록에서 선택된 행을 격자에도 표시하고 보이도록 스크롤"""
+        if self._closed or idx is None:
+            return
+        self._selected = idx
+        row = idx // self._cols
+        if row < self._top:
+            self._top = row
+        elif row >= self._top + self._rows:
+            self._top = row - self._rows + 1
+        self.refresh()
+
+    def close(self):
+        self._closed = True
+        self._loader.close()
+        self._photos.clear()
+        self.win.destroy()
+
+    # ------------------------------------------------------------------
+    # 배치 계산
+    # ------------------------------------------------------------------
+
+    def _total_rows(self) -> int:
+        return (self._row_count() + self._cols - 1) // self._cols
+
+    def _max_top(self) -> int:
+        return max(0, self._total_rows() - self._rows)
+
+    def _on_resize(self, event):
+        cols = max(1, event.width // self._cell_w)
+        rows = max(1, event.height // self._cell_h)
+        if (cols, rows) == (self._cols, self._rows):
+            return
+        # 첫 번째로 보이던 항목이 계속 보이도록 top 행을 다시 계산
+        first = self._top * self._cols
+        self._cols, self._rows = cols, rows
+        self._top = first // cols
+        self.refresh()
+
+    def _index_at(self, x: int, y: int) -> Optional[int]:
+        col, row = x // self._cell_w, y // self._cell_h
+        if col >= self._cols or row >= self._rows:
+            return None
+        idx = (self._top + row) * self._cols + col
+        return idx if idx < self._row_count() else None
+
+    # ------------------------------------------------------------------
+    # 그리기
+    # ------------------------------------------------------------------
+
+    def _render(self):
+        canvas = self._canvas
+        canvas.delete("all")
+        count = self._row_count()
+        first = self._top * self._cols
+        last = min(count, first + self._rows * self._cols)
+        self._visible_paths = {}
+
+        for idx in range(first, last):
+            path = self._image_path(idx)
+            if path:
+                self._visible_paths.setdefault(path, []).append(idx)
+            self._draw_cell(idx)
+
+        # 보이는 칸 + 아래쪽 미리 읽기만 남기고 대기 요청 정리 (나중 요청이 먼저 처리되므로 보이는 칸을 마지막에 요청)
+        wanted = []
+        prefetch_end = min(count, last + PREFETCH_ROWS * self._cols)
+        for idx in list(range(last, prefetch_end))[::-1] + list(range(first, last))[::-1]:
+            path = self._image_path(idx)
+            if path and path not in self._photos and path not in self._failed:
+                wanted.append(path)
+                self._loader.request(path, path)
+        self._loader.retain(wanted)
+
+        total_rows = self._total_rows()
+        if total_rows <= self._rows:
+            self._vsb.set(0.0, 1.0)
+        else:
+            self._vsb.set(self._top / total_rows, (self._top + self._rows) / total_rows)
+        shown = f"{first + 1}–{last}" if last > first else "0"
+        self._info_var.set(f"{shown} / 전체 {count}건")
+
+    def _draw_cell(self, idx: int):
+        canvas = self._canvas
+        slot = idx - self._top * self._cols
+        x0 = (slot % self._cols) * self._cell_w
+        y0 = (slot // self._cols) * self._cell_h
+        tag = f"cell{idx}"
+        canvas.delete(tag)
+
+        if idx == self._selected:
+            canvas.create_rectangle(x0 + 2, y0 + 2, x0 + self._cell_w - 2, y0 + self._cell_h - 2,
+                                    outline="#4a90d9", width=3, tags=tag)
+        cx = x0 + self._cell_w // 2
+        cy = y0 + CELL_PAD + THUMB_SIZE // 2
+        path = self._image_path(idx)
+        photo = self._photos.get(path) if path else None
+        if photo is not None:
+            self._photos.move_to_end(path)
+            canvas.create_image(cx, cy, image=photo, tags=tag)
+        else:
+            text = "이미지 없음" if not path else ("미리보기 실패" if path in self._failed else "…")
+            canvas.create_text(cx, cy, text=text, fill="#777777", tags=tag)
+
+        if self._is_checked(idx):
+            canvas.create_text(x0 + CELL_PAD + 2, y0 + CELL_PAD + 2, text="☑", anchor=tk.NW,
+                               fill="#ffd54f", font=("", 14, "bold"), tags=tag)
+        name = self._label(idx)
+        if len(name) > 34:
+            name = name[:31] + "…"
+        canvas.create_text(cx, y0 + CELL_PAD + THUMB_SIZE + LABEL_HEIGHT // 2 + 2,
+                           text=name, fill="#dddddd", tags=tag)
+
+    def _on_thumb_ready(self, token, path: str, thumb):
+        """작업 스레드에서 호출됨 → UI 스레드로 넘김"""
+        if self._closed:
+            return
+        try:
+            self.win.after(0, lambda: self._apply_thumb(path, thumb))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _apply_thumb(self, path: str, thumb):
+        if self._closed:
+            return
+        if thumb is None:
+            self._failed.add(path)
+        else:
+            self._photos[path] = ImageTk.PhotoImage(thumb)
+            while len(self._photos) > PHOTO_CACHE_SIZE:
+                self._photos.popitem(last=False)
+        for idx in self._visible_paths.get(path, ()):
+            self._draw_cell(idx)
+
+    # ------------------------------------------------------------------
+    # 스크롤 / 입력
+    # ------------------------------------------------------------------
+
+    def _set_top(self, top: int):
+        top = max(0, min(top, self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * self._total_rows()))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self._set_top(self._top + (step * self._rows if args[2] == "pages" else step))
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._set_top(self._top - WHEEL_ROWS)
+        else:
+            self._set_top(self._top + WHEEL_ROWS)
+
+    def _on_key(self, event):
+        count = self._row_count()
+        if not count:
+            return "break"
+        cur = self._selected if self._selected is not None else self._top * self._cols
+        page = self._rows * self._cols
+        moves = {
+            "Prior": cur - page, "Next": cur + page, "Home": 0, "End": count - 1,
+            "Up": cur - self._cols, "Down": cur + self._cols, "Left": cur - 1, "Right": cur + 1,
+        }
+        idx = max(0, min(count - 1, moves.get(event.keysym, cur)))
+        self.select(idx)
+        if self._on_select:
+            self._on_select(idx)
+        return "break"
+
+    def _on_click(self, event):
+        self._canvas.focus_set()
+        idx = self._index_at(event.x, event.y)
+        if idx is None:
+            return
+        self._selected = idx
+        self._render()
+        if self._on_select:
+            self._on_select(idx)
+
+    def _on_double(self, event):
+        idx = self._index_at(event.x, event.y)
+        if idx is not None and self._on_open:
+            self._on_open(idx)
+
+    def _on_right_click(self, event):
+        idx = self._index_at(event.x, event.y)
+        if idx is not None and self._on_toggle:
+            self._on_toggle(idx)
+            self._draw_cell(idx)
+
+    def _on_space(self, event):
+        if self._selected is not None and self._on_toggle:
+            self._on_toggle(self._selected)
+            self._draw_cell(self._selected)
+        return "break"
@@ -3,7 +3,7 @@
 """
 from multiprocessing import Pool
 from pathlib import Path
-from typing import List, Tuple, Callable, Any
+from typing import List, Tuple, Callable, Any, Optional
 
 import tkinter as tk
 from tkinter import ttk
@@ -185,20 +185,25 @@ def get_paired_files(folder_path: Path, recursive: bool = False) -> List[Tuple[P
     return sorted(paired, key=lambda x: str(x[0])) # 전체 경로 기준으로 정렬
 
 
-def process_with_multicore(func: Callable, items: List[Any], num_cores: int) -> List[Any]:
+def process_with_multicore(func: Callable, items: List[Any], num_cores: int,
+                           initializer: Optional[Callable] = None, initargs: tuple = ()) -> List[Any]:
     """
     멀티코어로 작업 처리
     Args:
         func: 처리할 함수
         items: 처리할 아이템 리스트
         num_cores: 사용할 코어 수
+        initializer: 작업자마다 한 번 호출할 초기화 함수 (공용 데이터를 아이템마다 보내지 않고 작업자당 한 번만 전달)
+        initargs: initializer 인자
     Returns:
         처리 결과 리스트
     """
     if num_cores <= 1 or len(items) == 0:
+        if initializer is not None:
+            initializer(*initargs)
         return [func(item) for item in items]
     
-    with Pool(processes=num_cores) as pool:
+    with Pool(processes=num_cores, initializer=initializer, initargs=initargs) as pool:
         results = pool.map(func, items)
     
     return results
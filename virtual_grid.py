@@ -0,0 +1,396 @@
+"""
+가상화 목록 위젯 - 대량 결과를 화면에 보이는 행만 그리고, 체크 상태는 비트셋으로 보관
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import List, Tuple, Callable, Optional, Iterable, Iterator
+
+CHECKED_MARK = "☑"
+UNCHECKED_MARK = "☐"
+
+# 마우스 휠 한 칸에 이동할 행 수
+WHEEL_ROWS = 3
+
+# 행 높이를 아직 잴 수 없을 때 쓰는 기본값 (px)
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADING_HEIGHT = 25
+
+
+class CheckBitset:
+    """
+    행별 체크 상태를 1비트씩 bytearray에 보관.
+    전체 선택/해제는 bytearray를 통째로 채우고, 반전은 플래그만 뒤집으며,
+    선택 수는 변경 시마다 갱신해 두어 모두 행 수와 무관한 시간(또는 C 수준 일괄 연산)으로 처리한다.
+    """
+    def __init__(self, size: int = 0):
+        self._size = size
+        self._bits = bytearray((size + 7) >> 3)
+        self._inverted = False  # True면 저장된 비트의 반대가 실제 값
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def get(self, idx: int) -> bool:
+        return bool((self._bits[idx >> 3] >> (idx & 7)) & 1) != self._inverted
+
+    def set(self, idx: int, value: bool):
+        if self.get(idx) == value:
+            return
+        self._bits[idx >> 3] ^= 1 << (idx & 7)
+        self._count += 1 if value else -1
+
+    def toggle(self, idx: int) -> bool:
+        value = not self.get(idx)
+        self.set(idx, value)
+        return value
+
+    def fill(self, value: bool):
+        """전체 선택(True) / 전체 해제(False)"""
+        nbytes = len(self._bits)
+        self._bits = bytearray(b'\xff') * nbytes if value else bytearray(nbytes)
+        self._inverted = False
+        self._count = self._size if value else 0
+
+    def invert(self):
+        """선택 반전"""
+        self._inverted = not self._inverted
+        self._count = self._size - self._count
+
+    def grow(self, size: int):
+        """행 수를 늘림. 새로 생긴 행은 체크 해제 상태"""
+        if size <= self._size:
+            return
+        old_size = self._size
+        fill_byte = 0xFF if self._inverted else 0x00
+        self._bits.extend(bytes([fill_byte]) * (((size + 7) >> 3) - len(self._bits)))
+        self._size = size
+        # 기존 마지막 바이트의 남는 비트는 이전 상태가 남아 있을 수 있으므로 해제 상태로 맞춤
+        for idx in range(old_size, min(size, ((old_size + 7) >> 3) << 3)):
+            if self.get(idx):
+                self._bits[idx >> 3] ^= 1 << (idx & 7)
+
+    def indices(self) -> Iterator[int]:
+        """체크된 행 번호를 오름차순으로 (비어 있는 바이트는 건너뜀)"""
+        mask = 0xFF if self._inverted else 0x00
+        size = self._size
+        for byte_idx, byte in enumerate(self._bits):
+            value = byte ^ mask
+            if not value:
+                continue
+            base = byte_idx << 3
+            for bit in range(8):
+                if value & (1 << bit):
+                    idx = base + bit
+                    if idx >= size:
+                        return
+                    yield idx
+
+    def permuted(self, order: List[int]) -> "CheckBitset":
+        """new[j] = self[order[j]] 인 새 비트셋 (정렬 후 선택 상태 유지용)"""
+        result = CheckBitset(len(order))
+        if self._count == 0:
+            return result
+        if self._count == self._size:
+            result.fill(True)
+            return result
+        get = self.get
+        for new_idx, old_idx in enumerate(order):
+            if get(old_idx):
+                result.set(new_idx, True)
+        return result
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Treeview 기반 가상화 목록.
+    Treeview에는 화면에 보이는 행 수만큼의 항목만 두고, 스크롤 위치(top)가 바뀌면
+    row_values(idx) 콜백으로 해당 구간의 값만 다시 채운다. 스크롤바는 직접 계산한다.
+
+    columns     - [(col_id, 제목, 너비), ...]. 첫 열이 check_column이면 체크 표시 열로 사용
+    row_values  - idx → 체크 열을 제외한 나머지 열 값 튜플
+    on_select   - 현재 행(하이라이트)이 바뀔 때 idx 전달
+    on_check    - 체크 상태가 바뀔 때 호출 (인자 없음)
+    on_heading  - 열 제목 클릭 시 (col_id, additive) 전달. additive는 Shift를 누른 채 클릭했는지 여부
+    """
+    def __init__(self, parent, columns: List[Tuple[str, str, int]],
+                 row_values: Callable[[int], Tuple],
+                 check_column: Optional[str] = "check",
+                 centered: Iterable[str] = (),
+                 on_select: Optional[Callable[[int], None]] = None,
+                 on_check: Optional[Callable[[], None]] = None,
+                 on_heading: Optional[Callable[[str, bool], None]] = None,
+                 **kwargs):
+        super().__init__(parent, **kwargs)
+        self._row_values = row_values
+        self._check_column = check_column if columns and columns[0][0] == check_column else None
+        self._on_select = on_select
+        self._on_check = on_check
+
+        self.checks = CheckBitset()
+        self.selected: Optional[int] = None
+        self._row_count = 0
+        self._top = 0
+        self._visible = 20
+        self._iids: List[str] = []
+        self._rendering = False
+        self._labels = {c[0]: c[1] for c in columns}
+        self._shift_click = False   # 마지막 클릭 시 Shift 상태 (제목 클릭 명령은 버튼을 뗄 때 실행됨)
+
+        col_ids = [c[0] for c in columns]
+        centered = set(centered)
+        self.tree = ttk.Treeview(self, columns=col_ids, show="headings",
+                                 selectmode="browse", height=10)
+        for col_id, col_label, col_width in columns:
+            if on_heading:
+                self.tree.heading(col_id, text=col_label,
+                                  command=lambda c=col_id: on_heading(c, self._shift_click))
+            else:
+                self.tree.heading(col_id, text=col_label)
+            anchor = tk.CENTER if col_id in centered else tk.W
+            self.tree.column(col_id, width=col_width, anchor=anchor, minwidth=20)
+
+        self._vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        hsb = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self._vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)   # Linux ↑
+        self.tree.bind("<Button-5>", self._on_wheel)   # Linux ↓
+        self.tree.bind("<Button-1>", self._on_press)
+        self.tree.bind("<ButtonRelease-1>", self._on_click)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        for key in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(key, self._on_key)
+        self.tree.bind("<space>", self._on_space)
+
+    # ------------------------------------------------------------------
+    # 데이터 갱신
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def set_row_count(self, count: int):
+        """행 수를 새로 지정하고 체크/선택 상태 초기화 (새 검색 결과 등)"""
+        self._row_count = count
+        self.checks = CheckBitset(count)
+        self.selected = None
+        self._top = 0
+        self._render()
+
+    def append_rows(self, count: int):
+        """행 수를 늘림 (기존 체크/스크롤 유지). 보이는 구간이 바뀔 때만 다시 그림"""
+        old = self._row_count
+        self._row_count = count
+        self.checks.grow(count)
+        if old < self._top + self._visible:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def apply_order(self, order: List[int]):
+        """행 순서가 order(new → old)로 바뀌었을 때 체크 상태를 따라 옮기고 다시 그림"""
+        self.checks = self.checks.permuted(order)
+        self.selected = None
+        self._render()
+
+    def refresh(self):
+        self._render()
+
+    def set_sort_marks(self, keys: List[Tuple[str, bool]]):
+        """열 제목에 정렬 방향(▲/▼)과 우선순위(2개 이상일 때) 표시. keys: [(col_id, 내림차순 여부), ...]"""
+        marks = {}
+        for rank, (col_id, reverse) in enumerate(keys, 1):
+            arrow = "▼" if reverse else "▲"
+            marks[col_id] = f" {arrow}{rank}" if len(keys) > 1 else f" {arrow}"
+        for col_id, label in self._labels.items():
+            self.tree.heading(col_id, text=label + marks.get(col_id, ""))
+
+    # ------------------------------------------------------------------
+    # 체크 상태
+    # ------------------------------------------------------------------
+
+    def select_all(self):
+        self.checks.fill(True)
+        self._checks_changed()
+
+    def deselect_all(self):
+        self.checks.fill(False)
+        self._checks_changed()
+
+    def invert_checks(self):
+        self.checks.invert()
+        self._checks_changed()
+
+    def toggle(self, idx: int):
+        self.checks.toggle(idx)
+        self._checks_changed()
+
+    def checked_indices(self) -> Iterator[int]:
+        return self.checks.indices()
+
+    def _checks_changed(self):
+        self._render()
+        if self._on_check:
+            self._on_check()
+
+    # ------------------------------------------------------------------
+    # 렌더링
+    # ------------------------------------------------------------------
+
+    def _render(self):
+        """보이는 구간 [top, top + visible)만 Treeview 항목에 채움 (항목은 재사용)"""
+        self._rendering = True
+        try:
+            self._top = max(0, min(self._top, self._row_count - self._visible))
+            count = max(0, min(self._visible, self._row_count - self._top))
+            while len(self._iids) < count:
+                self._iids.append(self.tree.insert("", tk.END))
+            while len(self._iids) > count:
+                self.tree.delete(self._iids.pop())
+
+            checks = self.checks
+            for pos, iid in enumerate(self._iids):
+                idx = self._top + pos
+                values = tuple(self._row_values(idx))
+                if self._check_column:
+                    values = (CHECKED_MARK if checks.get(idx) else UNCHECKED_MARK,) + values
+                self.tree.item(iid, values=values)
+
+            sel = self.selected
+            if sel is not None and self._top <= sel < self._top + count:
+                self.tree.selection_set(self._iids[sel - self._top])
+            elif self.tree.selection():
+                self.tree.selection_remove(*self.tree.selection())
+            self.tree.yview_moveto(0)
+        finally:
+            self._rendering = False
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        n = self._row_count
+        if n <= 0:
+            self._vsb.set(0.0, 1.0)
+            return
+        self._vsb.set(self._top / n, min(1.0, (self._top + self._visible) / n))
+
+    def _set_top(self, top: int):
+        top = max(0, min(top, self._row_count - self._visible))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def scroll_to(self, idx: int):
+        """idx 행이 보이도록 스크롤"""
+        if idx < self._top:
+            self._set_top(idx)
+        elif idx >= self._top + self._visible:
+            self._set_top(idx - self._visible + 1)
+
+    # ------------------------------------------------------------------
+    # 이벤트
+    # ------------------------------------------------------------------
+
+    def _on_resize(self, event):
+        y0, row_h = DEFAULT_HEADING_HEIGHT, DEFAULT_ROW_HEIGHT
+        if self._iids:
+            bbox = self.tree.bbox(self._iids[0])
+            if bbox:
+                y0, row_h = bbox[1], max(1, bbox[3])
+        visible = max(1, (event.height - y0) // row_h)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * self._row_count))
+        elif args[0] == "scroll":
+            step = self._visible if args[2] == "pages" else 1
+            self._set_top(self._top + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        # 윈도우에서는 event.delta가 120 단위, Linux는 num으로 구분
+        if event.num == 4:
+            delta = -WHEEL_ROWS
+        elif event.num == 5:
+            delta = WHEEL_ROWS
+        else:
+            delta = -WHEEL_ROWS * int(event.delta / 120)
+        self._set_top(self._top + delta)
+        return "break"
+
+    def index_of(self, iid: str) -> Optional[int]:
+        try:
+            return self._top + self._iids.index(iid)
+        except ValueError:
+            return None
+
+    def _on_press(self, event):
+        self._shift_click = bool(event.state & 0x0001)
+
+    def _on_click(self, event):
+        """check 열 클릭 → 체크 토글"""
+        if not self._check_column:
+            return
+        region = self.tree.identify_region(event.x, event.y)
+        col = self.tree.identify_column(event.x)
+        if region == "cell" and col == "#1":
+            idx = self.index_of(self.tree.identify_row(event.y))
+            if idx is not None:
+                self.toggle(idx)
+
+    def _on_tree_select(self, event):
+        if self._rendering:
+            return
+        selection = self.tree.selection()
+        if not selection:
+            return
+        idx = self.index_of(selection[0])
+        if idx is None or idx == self.selected:
+            return
+        self.selected = idx
+        if self._on_select:
+            self._on_select(idx)
+
+    def _on_key(self, event):
+        if self._row_count == 0:
+            return "break"
+        cur = self.selected if self.selected is not None else self._top
+        step = {"Up": -1, "Down": 1, "Prior": -self._visible, "Next": self._visible}
+        if event.keysym == "Home":
+            idx = 0
+        elif event.keysym == "End":
+            idx = self._row_count - 1
+        else:
+            idx = cur + step.get(event.keysym, 0)
+        self.select_row(max(0, min(idx, self._row_count - 1)))
+        return "break"
+
+    def _on_space(self, event):
+        if self.selected is not None and self._check_column:
+            self.toggle(self.selected)
+        return "break"
+
+    def select_row(self, idx: int):
+        """idx 행을 현재 행으로 지정하고 보이도록 스크롤"""
+        changed = idx != self.selected
+        self.selected = idx
+        self.scroll_to(idx)
+        self._render()
+        if changed and self._on_select:
+            self._on_select(idx)
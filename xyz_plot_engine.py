@@ -59,6 +59,7 @@ NO_IMAGE_TEXT = "NO IMAGE"
 class FolderEntry:
     folder_path: str
     label: str = ""
+    images: Optional[list[Path]] = None   # 매니페스트 등에서 받은 이미지 목록 (None이면 폴더 스캔)
 
 
 @dataclass
@@ -124,6 +125,18 @@ def _collect_images(folder: str, sort_order: str) -> list[Path]:
     if not p.is_dir():
         return []
     files = [f for f in p.iterdir() if f.is_file() and f.suffix.lower() in IMAGE_EXTS]
+    return _sort_images(files, sort_order)
+
+
+def _entry_images(entry: FolderEntry, sort_order: str) -> list[Path]:
+    """행/열 하나의 이미지 목록. entry.images가 있으면 폴더를 스캔하지 않고 그 목록을 정렬"""
+    if entry.images is not None:
+        return _sort_images([Path(f) for f in entry.images if Path(f).suffix.lower() in IMAGE_EXTS],
+                            sort_order)
+    return _collect_images(entry.folder_path, sort_order)
+
+
+def _sort_images(files: list[Path], sort_order: str) -> list[Path]:
     rev = sort_order.endswith("_desc")
     if "name" in sort_order:
         files.sort(key=lambda f: f.name.lower(), reverse=rev)
@@ -276,10 +289,15 @@ def collect_images(folder_path: str, sort_order: str) -> list:
     return _collect_images(folder_path, sort_order)
 
 
+def collect_entry_images(entry: FolderEntry, sort_order: str) -> list:
+    """FolderEntry 하나의 이미지 Path 목록 (매니페스트 목록이 있으면 스캔하지 않음)"""
+    return _entry_images(entry, sort_order)
+
+
 def collect_folder_images(entries, sort_order):
     result = []
     for entry in entries:
-        paths = _collect_images(entry.folder_path, sort_order)
+        paths = _entry_images(entry, sort_order)
         images = []
         for p in paths:
             try:
@@ -24,8 +24,9 @@ from xyz_plot_engine import (
     RESIZE_CUSTOM, RESIZE_LARGEST, RESIZE_SMALLEST,
     BuildResult, FolderEntry, XYPlotConfig,
     build_plot, build_preview, save_image, save_preview_image,
-    collect_images,
+    collect_entry_images,
 )
+from manifest import ManifestError, MANIFEST_FILETYPES, manifest_folders
 
 GRID_CELL = 60
 GRID_MAX  = 12
@@ -63,6 +64,7 @@ class XYPlotGUI:
 
         self.mode_var          = sv("folder")
         self.parent_folder     = sv("")
+        self.manifest_var      = sv("")       # 매니페스트 모드: 이미지의 폴더별로 행/열 구성
         self.fill_mode_var     = sv("grid")   # grid | data
         self.axis_var          = sv(AXIS_ROW)
         self.grid_rows_var     = iv(3)
@@ -138,6 +140,8 @@ class XYPlotGUI:
                         value="manual", command=self._on_mode_change).pack(side=tk.LEFT)
         ttk.Radiobutton(mode_f, text="폴더 자동 감지", variable=self.mode_var,
                         value="folder", command=self._on_mode_change).pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Radiobutton(mode_f, text="매니페스트", variable=self.mode_var,
+                        value="manifest", command=self._on_mode_change).pack(side=tk.LEFT, padx=(8, 0))
 
         # 셀프선택 영역
         self._manual_frame = ttk.LabelFrame(grp, text="폴더 목록", padding="5")
@@ -157,6 +161,13 @@ class XYPlotGUI:
         ttk.Entry(af, textvariable=self.parent_folder).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 4))
         ttk.Button(af, text="선택", width=5, command=self._browse_parent_folder).pack(side=tk.LEFT)
 
+        # 매니페스트 영역 (폴더를 스캔하지 않고 매니페스트의 이미지를 폴더별로 묶어 사용)
+        self._manifest_frame = ttk.LabelFrame(grp, text="매니페스트 (폴더별로 한 줄)", padding="5")
+        mf = ttk.Frame(self._manifest_frame)
+        mf.pack(fill=tk.X)
+        ttk.Entry(mf, textvariable=self.manifest_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 4))
+        ttk.Button(mf, text="선택", width=5, command=self._browse_manifest).pack(side=tk.LEFT)
+
         self._on_mode_change()
 
     def _build_fill_mode_group(self, parent):
@@ -446,24 +457,30 @@ class XYPlotGUI:
 
         # 폴더 목록 수집
         if self.mode_var.get() == "manual":
-            folder_paths = [pv.get().strip() for pv, _ in self._folder_entries if pv.get().strip()]
+            entries = [FolderEntry(folder_path=pv.get().strip())
+                       for pv, _ in self._folder_entries if pv.get().strip()]
+        elif self.mode_var.get() == "manifest":
+            entries = self._manifest_entries()
+            if entries is None:
+                return
         else:
             parent_p = self.parent_folder.get().strip()
             if not parent_p or not os.path.isdir(parent_p):
                 messagebox.showerror("오류", "유효한 상위 폴더를 지정해주세요.")
                 return
-            folder_paths = sorted(
-                [str(d) for d in Path(parent_p).iterdir() if d.is_dir()],
-                key=lambda d: d.lower(),
-            )
+            entries = [
+                FolderEntry(folder_path=str(d))
+                for d in sorted((d for d in Path(parent_p).iterdir() if d.is_dir()),
+                                key=lambda d: str(d).lower())
+            ]
 
-        if not folder_paths:
+        if not entries:
             messagebox.showerror("오류", "폴더가 지정되지 않았습니다.")
             return
 
-        n_folders = len(folder_paths)
+        n_folders = len(entries)
         max_images = max(
-            (len(collect_images(fp, sort_order)) for fp in folder_paths),
+            (len(collect_entry_images(e, sort_order)) for e in entries),
             default=0,
         )
         if max_images == 0:
@@ -513,12 +530,17 @@ class XYPlotGUI:
                 var.set(col_lbls[r - 1] if (r - 1) < len(col_lbls) else "")
 
     def _on_mode_change(self):
-        if self.mode_var.get() == "manual":
-            self._manual_frame.pack(fill=tk.X, pady=(5, 0))
-            self._auto_frame.pack_forget()
-        else:
-            self._auto_frame.pack(fill=tk.X, pady=(5, 0))
-            self._manual_frame.pack_forget()
+        frames = {
+            "manual":   self._manual_frame,
+            "folder":   self._auto_frame,
+            "manifest": self._manifest_frame,
+        }
+        current = frames.get(self.mode_var.get(), self._auto_frame)
+        for frame in frames.values():
+            if frame is current:
+                frame.pack(fill=tk.X, pady=(5, 0))
+            else:
+                frame.pack_forget()
 
     def _toggle_custom_resize(self):
         state = tk.NORMAL if self.resize_base_var.get() == RESIZE_CUSTOM else tk.DISABLED
@@ -593,6 +615,25 @@ class XYPlotGUI:
         if d:
             self.parent_folder.set(d)
 
+    def _browse_manifest(self):
+        path = filedialog.askopenfilename(title="매니페스트 선택", filetypes=MANIFEST_FILETYPES)
+        if path:
+            self.manifest_var.set(path)
+
+    def _manifest_entries(self) -> Optional[list[FolderEntry]]:
+        """매니페스트의 이미지를 폴더별로 묶은 행/열 목록 (폴더 스캔 없음). 오류 시 None"""
+        path = self.manifest_var.get().strip()
+        if not path or not os.path.isfile(path):
+            messagebox.showerror("오류", "유효한 매니페스트 파일을 지정해주세요.")
+            return None
+        try:
+            folders = manifest_folders(path)
+        except ManifestError as e:
+            messagebox.showerror("매니페스트 오류", str(e))
+            return None
+        return [FolderEntry(folder_path=folder, label=Path(folder).name, images=images)
+                for folder, images in folders.items()]
+
     def _browse_save_path(self):
         fmt = self.save_fmt_var.get()
         ext = {"png": ".png", "webp": ".webp", "jpg": ".jpg"}.get(fmt, ".png")
@@ -616,6 +657,10 @@ class XYPlotGUI:
                     for pv, lv in self._folder_entries
                     if pv.get().strip()
                 ]
+            elif self.mode_var.get() == "manifest":
+                entries = self._manifest_entries()
+                if entries is None:
+                    return None
             else:
                 parent_p = self.parent_folder.get().strip()
                 if not parent_p or not os.path.isdir(parent_p):
@@ -761,6 +806,7 @@ class XYPlotGUI:
         return {
             "xy_mode":           self.mode_var.get(),
             "xy_parent_folder":  self.parent_folder.get(),
+            "xy_manifest":       self.manifest_var.get(),
             "xy_folders":        folders,
             "xy_grid_rows":      self.grid_rows_var.get(),
             "xy_grid_cols":      self.grid_cols_var.get(),
@@ -803,6 +849,7 @@ class XYPlotGUI:
 
         _s(self.mode_var,          "xy_mode",          "folder")
         _s(self.parent_folder,     "xy_parent_folder", "")
+        _s(self.manifest_var,      "xy_manifest",      "")
         _s(self.fill_mode_var,     "xy_fill_mode",     "grid")
         _s(self.axis_var,          "xy_axis",          AXIS_ROW)
         _s(self.sort_key_var,      "xy_sort_key",      "name")